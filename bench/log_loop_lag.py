@@ -0,0 +1,115 @@
+"""
+Event loop lag under logging load: python bench/log_loop_lag.py [--threads N]
+
+THREADS accounts log in a loop while a sampler measures how late the event
+loop wakes up. The log target is a slow stream (a terminal or disk taking
+WRITE_DELAY per write). The run is repeated with the synchronous loguru sink
+and with QueuedSink, the writer thread of LOGS.ASYNC_LOGGING. Exits with 1
+when the p99 lag of the queued sink is over the budget.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from loguru import logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils.log_queue import QueuedSink  # noqa: E402
+
+
+THREADS = 100
+DURATION = 3.0
+# Один write медленного терминала
+WRITE_DELAY = 0.0005
+SAMPLE_INTERVAL = 0.01
+LAG_BUDGET = 0.05
+
+
+class SlowStream:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, message: str) -> None:
+        time.sleep(self.delay)
+        self.lines += 1
+
+    def flush(self) -> None:
+        pass
+
+
+async def account(index: int, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        logger.info(f"{index} | Task step finished")
+        await asyncio.sleep(0.01)
+
+
+async def sample_lag(stop: asyncio.Event) -> list[float]:
+    lags = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(SAMPLE_INTERVAL)
+        lags.append(time.perf_counter() - started - SAMPLE_INTERVAL)
+    return lags
+
+
+async def measure(threads: int, duration: float) -> list[float]:
+    stop = asyncio.Event()
+    accounts = [asyncio.create_task(account(i, stop)) for i in range(threads)]
+    sampler = asyncio.create_task(sample_lag(stop))
+    await asyncio.sleep(duration)
+    stop.set()
+    await asyncio.gather(*accounts)
+    return await sampler
+
+
+def percentile(values: list[float], share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run(name: str, sink, threads: int, duration: float) -> float:
+    logger.remove()
+    logger.add(sink, format="{time:HH:mm:ss} | {level: <8} | {message}")
+    started = time.perf_counter()
+    lags = asyncio.run(measure(threads, duration))
+    elapsed = time.perf_counter() - started
+    logger.remove()  # QueuedSink дописывает очередь здесь
+
+    p99 = percentile(lags, 0.99)
+    print(
+        f"{name:<8} lag p50 {percentile(lags, 0.5) * 1000:7.1f} ms | "
+        f"p99 {p99 * 1000:7.1f} ms | max {max(lags) * 1000:7.1f} ms | "
+        f"{len(lags)} samples in {elapsed:.1f}s"
+        + (f" | {sink.dropped} dropped" if isinstance(sink, QueuedSink) else "")
+    )
+    return p99
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=THREADS)
+    parser.add_argument("--duration", type=float, default=DURATION)
+    args = parser.parse_args()
+
+    print(f"THREADS={args.threads}, {WRITE_DELAY * 1000:.1f} ms per log write")
+    run("sync", SlowStream(WRITE_DELAY), args.threads, args.duration)
+    queued_p99 = run(
+        "queued",
+        QueuedSink(SlowStream(WRITE_DELAY), drop_policy="drop_oldest"),
+        args.threads,
+        args.duration,
+    )
+
+    if queued_p99 > LAG_BUDGET:
+        print(f"Queued sink p99 lag is over {LAG_BUDGET * 1000:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
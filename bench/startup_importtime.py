@@ -0,0 +1,73 @@
+"""
+Startup import budget: python bench/startup_importtime.py [--budget MS]
+
+Runs `python -X importtime main.py --help` and sums the cumulative import
+time of the modules main.py pulls in on top of a bare interpreter. Heavy
+subsystems (pandas, Flask, aiogram, rich, web3, project modules) are
+imported lazily, so this stays well under the time the menu may take to
+show up. Exits with 1 when the budget is exceeded.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Меню должно появляться быстрее, чем за 300 мс
+STARTUP_BUDGET_MS = 300
+REPEATS = 3
+
+
+def import_times(args: list[str]) -> dict[str, int]:
+    """Top level module -> cumulative import time in microseconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{result.stderr[-2000:]}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|", 2)
+        # Вложенные импорты отступают на два пробела, считаем только верхний уровень
+        name = name[1:]
+        if name.startswith(" ") or not cumulative.strip().isdigit():
+            continue
+        times[name] = int(cumulative)
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS, help="budget in ms")
+    args = parser.parse_args()
+
+    baseline = set(import_times(["-c", "pass"]))
+    runs = []
+    for _ in range(REPEATS):
+        times = import_times(["main.py", "--help"])
+        runs.append({name: us for name, us in times.items() if name not in baseline})
+
+    # Лучший из прогонов: первый может включать компиляцию .pyc
+    best = min(runs, key=lambda times: sum(times.values()))
+    total_ms = sum(best.values()) / 1000
+
+    print(f"main.py --help imports: {total_ms:.1f} ms (budget {args.budget:.0f} ms)")
+    for name, us in sorted(best.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    if total_ms > args.budget:
+        print("Startup import budget exceeded")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
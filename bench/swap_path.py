@@ -0,0 +1,163 @@
+"""
+Swap path benchmark: python bench/swap_path.py [--swaps N] [--accounts N]
+
+Runs SwapEngine.swap over a stubbed Web3Custom: the router contract and the
+calldata encoding are real web3, RPC calls (estimate, send, approve) are
+counted and take RPC_LATENCY. Prints the local CPU time and the number of
+RPC calls per swap for token→token and token→native (multicall with
+unwrap) routes, then the wall time of concurrent accounts. Exits with 1
+when the CPU time per swap is over the budget.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+from eth_account import Account
+from loguru import logger
+from web3 import AsyncHTTPProvider, AsyncWeb3
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.model.onchain.constants import Balance  # noqa: E402
+from src.model.onchain.swaps import Route, SwapEngine, SwapRouter, Token  # noqa: E402
+
+
+SWAPS = 1000
+ACCOUNTS = 100
+RPC_LATENCY = 0.05
+# Локальная работа движка на один swap, без ожидания RPC
+CPU_BUDGET_MS = 5.0
+
+ROUTER = SwapRouter(
+    address=AsyncWeb3.to_checksum_address("0x" + "e9" * 20),
+    chain_id=50312,
+    wrapped_native=Token(AsyncWeb3.to_checksum_address("0x" + "4a" * 20), "WSTT"),
+    deadline=True,
+)
+USDC = Token(AsyncWeb3.to_checksum_address("0x" + "e1" * 20), "USDC", 6)
+WETH = Token(AsyncWeb3.to_checksum_address("0x" + "d2" * 20), "WETH")
+ROUTES = {
+    "token->token": Route(USDC, WETH, (500, 3000)),
+    "token->native": Route(WETH, None, (3000,)),
+}
+
+
+class StubWeb3Custom:
+    """The part of Web3Custom SwapEngine uses, RPC calls are only counted"""
+
+    def __init__(self, latency: float):
+        self.account_index = 1
+        self.latency = latency
+        self.calls = Counter()
+        self._approved: set[str] = set()
+        # Настоящий AsyncWeb3: контракт и кодирование calldata как в боте
+        w3 = AsyncWeb3(AsyncHTTPProvider("http://127.0.0.1:1"))
+        self.web3 = SimpleNamespace(
+            eth=SimpleNamespace(contract=w3.eth.contract, estimate_gas=self._estimate_gas),
+            to_checksum_address=w3.to_checksum_address,
+        )
+
+    async def _rpc(self, method: str) -> None:
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    async def _estimate_gas(self, tx: dict) -> int:
+        await self._rpc("eth_estimateGas")
+        return 150_000
+
+    async def approve_token(self, token_address: str, **kwargs) -> bool:
+        if token_address not in self._approved:
+            # allowance из сети и approve, дальше лимит берется из кэша
+            await self._rpc("eth_call")
+            await self._rpc("eth_sendRawTransaction")
+            self._approved.add(token_address)
+        return True
+
+    async def execute_transaction(self, tx_data: dict, **kwargs) -> str:
+        # nonce, gas price, отправка и receipt
+        for method in (
+            "eth_getTransactionCount",
+            "eth_gasPrice",
+            "eth_sendRawTransaction",
+            "eth_getTransactionReceipt",
+        ):
+            await self._rpc(method)
+        return "0x" + "00" * 32
+
+    async def get_token_balance(self, *args, **kwargs) -> Balance:
+        await self._rpc("eth_call")
+        return Balance.from_wei(10**18)
+
+    async def get_balance(self, address: str) -> Balance:
+        await self._rpc("eth_getBalance")
+        return Balance.from_wei(10**18)
+
+    async def spend_allowance(self, *args) -> None:
+        pass
+
+    async def forget_allowance(self, *args) -> None:
+        pass
+
+
+async def cpu_per_swap(route: Route, swaps: int) -> tuple[float, float]:
+    web3 = StubWeb3Custom(latency=0)
+    engine = SwapEngine(web3, Account.create(), ROUTER)
+    await engine.swap(route, 10**6)  # прогрев: approve и привязка контракта
+    web3.calls.clear()
+
+    started = time.process_time()
+    for _ in range(swaps):
+        await engine.snapshot([route.token_in] if route.token_in else [])
+        assert await engine.swap(route, 10**6)
+    cpu = time.process_time() - started
+    return cpu / swaps * 1000, sum(web3.calls.values()) / swaps
+
+
+async def concurrent_accounts(accounts: int) -> float:
+    async def account() -> None:
+        engine = SwapEngine(StubWeb3Custom(RPC_LATENCY), Account.create(), ROUTER)
+        for route in ROUTES.values():
+            await engine.snapshot([route.token_in])
+            await engine.swap(route, 10**6)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[account() for _ in range(accounts)])
+    return time.perf_counter() - started
+
+
+async def run(args) -> int:
+    over_budget = False
+    for name, route in ROUTES.items():
+        cpu_ms, rpc_calls = await cpu_per_swap(route, args.swaps)
+        print(f"{name:<14} {cpu_ms:6.2f} ms CPU | {rpc_calls:.1f} RPC calls per swap round")
+        over_budget |= cpu_ms > CPU_BUDGET_MS
+
+    elapsed = await concurrent_accounts(args.accounts)
+    print(
+        f"{args.accounts} accounts x {len(ROUTES)} swaps with {RPC_LATENCY * 1000:.0f} ms "
+        f"RPC latency: {elapsed:.2f}s"
+    )
+
+    if over_budget:
+        print(f"Swap path is over {CPU_BUDGET_MS} ms CPU per swap")
+        return 1
+    return 0
+
+
+def main() -> int:
+    # Строки об успешных свапах не должны попадать в замер
+    logger.disable("src")
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--swaps", type=int, default=SWAPS)
+    parser.add_argument("--accounts", type=int, default=ACCOUNTS)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
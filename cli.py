@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import sys
+
+from loguru import logger
+
+import src.utils
+
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1  # command finished, but some accounts/actions failed
+EXIT_ERROR = 2  # command could not be executed
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command line arguments for headless runs"""
+    parser = argparse.ArgumentParser(
+        prog="main.py",
+        description="Somnia bot. Run without arguments for the interactive menu.",
+    )
+    parser.add_argument(
+        "--config", default="config.yaml", help="path to config.yaml"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="print a JSON summary to stdout (logs go to stderr)",
+    )
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="start farming")
+    _add_overrides(run_parser)
+    run_parser.add_argument(
+        "--shards", type=int, help="override SETTINGS.SHARDS (worker processes)"
+    )
+
+    coordinator_parser = subparsers.add_parser(
+        "coordinator", help="serve accounts to workers on other hosts"
+    )
+    _add_overrides(coordinator_parser)
+    coordinator_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="interface to listen on, use 0.0.0.0 to accept workers from the network",
+    )
+    coordinator_parser.add_argument("--port", type=int, default=8765)
+    coordinator_parser.add_argument(
+        "--lease-timeout",
+        type=int,
+        default=120,
+        help="seconds without heartbeat after which an account is requeued",
+    )
+    _add_token(coordinator_parser)
+
+    worker_parser = subparsers.add_parser(
+        "worker", help="process accounts leased from a coordinator"
+    )
+    worker_parser.add_argument(
+        "--url", required=True, help="coordinator url, e.g. http://10.0.0.2:8765"
+    )
+    worker_parser.add_argument(
+        "--threads", type=int, help="override SETTINGS.THREADS"
+    )
+    _add_token(worker_parser)
+
+    db_parser = subparsers.add_parser("db", help="database actions")
+    db_subparsers = db_parser.add_subparsers(dest="db_command", required=True)
+    db_subparsers.add_parser("reset", help="create/reset the database")
+    regen_parser = db_subparsers.add_parser(
+        "regen", help="regenerate tasks for all wallets"
+    )
+    regen_parser.add_argument(
+        "--completed-only",
+        action="store_true",
+        help="regenerate tasks only for completed wallets",
+    )
+    db_subparsers.add_parser("add", help="add new wallets from data/private_keys.txt")
+
+    subparsers.add_parser("stats", help="show database progress")
+
+    scan_parser = subparsers.add_parser(
+        "scan", help="read balances and tx counts of all wallets without login"
+    )
+    _add_overrides(scan_parser)
+
+    return parser.parse_args(argv)
+
+
+def _add_token(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--token",
+        default=os.environ.get("SOMNIA_QUEUE_TOKEN"),
+        help="shared secret of coordinator and workers (or SOMNIA_QUEUE_TOKEN). "
+        "Private keys are sent to workers, use it only inside a trusted network",
+    )
+
+
+def _add_overrides(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--threads", type=int, help="override SETTINGS.THREADS")
+    parser.add_argument("--attempts", type=int, help="override SETTINGS.ATTEMPTS")
+    parser.add_argument(
+        "--accounts-range",
+        type=int,
+        nargs=2,
+        metavar=("START", "END"),
+        help="override SETTINGS.ACCOUNTS_RANGE",
+    )
+    parser.add_argument(
+        "--accounts",
+        type=int,
+        nargs="+",
+        metavar="N",
+        help="override SETTINGS.EXACT_ACCOUNTS_TO_USE (sets ACCOUNTS_RANGE to [0, 0])",
+    )
+    parser.add_argument(
+        "--shuffle",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="override SETTINGS.SHUFFLE_WALLETS",
+    )
+    parser.add_argument(
+        "--skip-failed-tasks",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="override FLOW.SKIP_FAILED_TASKS",
+    )
+    parser.add_argument(
+        "--telegram",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="override SETTINGS.SEND_TELEGRAM_LOGS",
+    )
+
+
+def apply_overrides(config, args: argparse.Namespace) -> None:
+    """Apply command line overrides on top of config.yaml values"""
+    overrides = vars(args)
+
+    if overrides.get("threads") is not None:
+        config.SETTINGS.THREADS = args.threads
+    if overrides.get("shards") is not None:
+        config.SETTINGS.SHARDS = args.shards
+    if overrides.get("attempts") is not None:
+        config.SETTINGS.ATTEMPTS = args.attempts
+    if overrides.get("accounts_range") is not None:
+        config.SETTINGS.ACCOUNTS_RANGE = tuple(args.accounts_range)
+    if overrides.get("accounts") is not None:
+        config.SETTINGS.ACCOUNTS_RANGE = (0, 0)
+        config.SETTINGS.EXACT_ACCOUNTS_TO_USE = args.accounts
+    if overrides.get("shuffle") is not None:
+        config.SETTINGS.SHUFFLE_WALLETS = args.shuffle
+    if overrides.get("skip_failed_tasks") is not None:
+        config.FLOW.SKIP_FAILED_TASKS = args.skip_failed_tasks
+    if overrides.get("telegram") is not None:
+        config.SETTINGS.SEND_TELEGRAM_LOGS = args.telegram
+
+
+async def _run(args: argparse.Namespace) -> tuple[int, dict]:
+    from process import run_accounts
+
+    config = src.utils.get_config(args.config)
+    apply_overrides(config, args)
+
+    summary = await run_accounts(config)
+    if summary is None:
+        return EXIT_ERROR, {}
+
+    return (EXIT_FAILED if summary["failed"] else EXIT_OK), summary
+
+
+async def _coordinator(args: argparse.Namespace) -> tuple[int, dict]:
+    from distributed import run_coordinator
+
+    if not args.token:
+        logger.error("Coordinator requires --token or SOMNIA_QUEUE_TOKEN")
+        return EXIT_ERROR, {}
+
+    config = src.utils.get_config(args.config)
+    apply_overrides(config, args)
+
+    summary = await run_coordinator(
+        config, args.host, args.port, args.token, args.lease_timeout
+    )
+    if summary is None:
+        return EXIT_ERROR, {}
+
+    return (EXIT_FAILED if summary["failed"] else EXIT_OK), summary
+
+
+async def _worker(args: argparse.Namespace) -> tuple[int, dict]:
+    from distributed import run_worker
+
+    if not args.token:
+        logger.error("Worker requires --token or SOMNIA_QUEUE_TOKEN")
+        return EXIT_ERROR, {}
+
+    config = src.utils.get_config(args.config)
+    apply_overrides(config, args)
+
+    processed = await run_worker(config, args.url, args.token)
+    return EXIT_OK, {"processed_accounts": processed}
+
+
+async def _db(args: argparse.Namespace) -> tuple[int, dict]:
+    from src.model.database import db_manager
+
+    src.utils.get_config(args.config)
+
+    if args.db_command == "reset":
+        ok = await db_manager.reset_database(confirm=False)
+        return (EXIT_OK if ok else EXIT_ERROR), {}
+
+    if args.db_command == "regen":
+        if args.completed_only:
+            count = await db_manager.regenerate_tasks_for_completed(confirm=False)
+        else:
+            count = await db_manager.regenerate_tasks_for_all(confirm=False)
+        if count is None:
+            return EXIT_ERROR, {}
+        return EXIT_OK, {"regenerated_wallets": count}
+
+    count = await db_manager.add_new_wallets(confirm=False)
+    if count is None:
+        return EXIT_ERROR, {}
+    return EXIT_OK, {"added_wallets": count}
+
+
+async def _stats(args: argparse.Namespace) -> tuple[int, dict]:
+    from src.model.database import db_manager
+
+    if not args.json:
+        await db_manager.show_database_contents()
+    return EXIT_OK, await db_manager.get_database_stats()
+
+
+async def _scan(args: argparse.Namespace) -> tuple[int, dict]:
+    from scanner import run_scan
+
+    config = src.utils.get_config(args.config)
+    apply_overrides(config, args)
+
+    summary = await run_scan(config)
+    if summary is None:
+        return EXIT_ERROR, {}
+
+    return (EXIT_FAILED if summary["failed"] else EXIT_OK), summary
+
+
+async def run_cli(args: argparse.Namespace) -> int:
+    """Execute a parsed command and return the process exit code"""
+    handlers = {
+        "run": _run,
+        "coordinator": _coordinator,
+        "worker": _worker,
+        "db": _db,
+        "stats": _stats,
+        "scan": _scan,
+    }
+
+    try:
+        exit_code, summary = await handlers[args.command](args)
+    except Exception as e:
+        logger.error(f"Command {args.command} failed: {e}")
+        exit_code, summary = EXIT_ERROR, {"error": str(e)}
+
+    if args.json:
+        command = args.command
+        if command == "db":
+            command = f"db {args.db_command}"
+        print(
+            json.dumps(
+                {"command": command, "exit_code": exit_code, **summary},
+                ensure_ascii=False,
+            ),
+            file=sys.stdout,
+        )
+
+    return exit_code
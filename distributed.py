@@ -0,0 +1,408 @@
+import asyncio
+import dataclasses
+import secrets
+import socket
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from loguru import logger
+
+from src.utils.config import Config, WalletInfo
+from src.utils.logs import create_progress_tracker
+from src.utils.stats_collector import stats_collector
+from src.utils.task_plan import check_task_plan
+from src.utils.telegram_logger import start_telegram_notifier
+from src.utils.tracing import tracer
+
+
+# How often the coordinator looks for expired leases
+REAPER_INTERVAL = 5
+# Consecutive failed lease requests after which a worker slot gives up
+MAX_CONNECTION_FAILURES = 5
+
+
+@dataclass
+class Lease:
+    lease_id: str
+    worker_id: str
+    position: int
+    account: tuple
+    expires_at: float
+
+
+class Coordinator:
+    """
+    Hands out accounts to workers on other hosts and collects their results.
+
+    Each account is leased to one worker at a time. Workers must heartbeat
+    before the lease expires, otherwise the account goes back to the queue.
+    Task statuses are read from and written to the coordinator's database.
+    """
+
+    def __init__(
+        self, config: Config, accounts: list, token: str, lease_timeout: int = 120
+    ):
+        from src.model.database.instance import Database
+
+        self.config = config
+        self.accounts = accounts
+        self.token = token
+        self.lease_timeout = lease_timeout
+
+        # Positions in self.accounts waiting for a worker
+        self.pending: deque[int] = deque(range(len(accounts)))
+        self.leases: dict[str, Lease] = {}
+        self.results: dict[int, bool] = {}
+        self.database = Database()
+        self.finished = asyncio.Event()
+        if not self.accounts:
+            self.finished.set()
+
+    def _is_done(self) -> bool:
+        return not self.pending and not self.leases
+
+    def _get_lease(self, data: dict) -> Lease | None:
+        lease = self.leases.get(data.get("lease_id"))
+        if lease is None or lease.expires_at < time.monotonic():
+            return None
+        return lease
+
+    def _requeue_expired(self) -> None:
+        now = time.monotonic()
+        for lease in [l for l in self.leases.values() if l.expires_at < now]:
+            del self.leases[lease.lease_id]
+            self.pending.appendleft(lease.position)
+            logger.warning(
+                f"{lease.account[0]} | Lease of worker {lease.worker_id} expired, account requeued"
+            )
+
+    async def _reaper(self) -> None:
+        while not self.finished.is_set():
+            await asyncio.sleep(REAPER_INTERVAL)
+            self._requeue_expired()
+
+    async def serve(self, host: str, port: int) -> list[bool]:
+        """Runs the coordinator until every account has a result"""
+        from aiohttp import web
+
+        progress_tracker = await create_progress_tracker(
+            total=len(self.accounts), description="Accounts completed"
+        )
+
+        @web.middleware
+        async def auth(request, handler):
+            # Сравнение за постоянное время, токен не подбирается по времени ответа
+            authorization = request.headers.get("Authorization", "")
+            if not secrets.compare_digest(authorization.encode(), f"Bearer {self.token}".encode()):
+                return web.json_response({"error": "unauthorized"}, status=401)
+            return await handler(request)
+
+        async def lease(request):
+            data = await request.json()
+            self._requeue_expired()
+            if self._is_done():
+                return web.json_response({"done": True}, status=410)
+            if not self.pending:
+                return web.Response(status=204)
+
+            position = self.pending.popleft()
+            new_lease = Lease(
+                lease_id=secrets.token_hex(16),
+                worker_id=data.get("worker_id", "unknown"),
+                position=position,
+                account=self.accounts[position],
+                expires_at=time.monotonic() + self.lease_timeout,
+            )
+            self.leases[new_lease.lease_id] = new_lease
+            logger.info(
+                f"{new_lease.account[0]} | Leased to worker {new_lease.worker_id}"
+            )
+            return web.json_response(
+                {
+                    "lease_id": new_lease.lease_id,
+                    "account": list(new_lease.account),
+                    "lease_timeout": self.lease_timeout,
+                }
+            )
+
+        async def heartbeat(request):
+            lease = self._get_lease(await request.json())
+            if lease is None:
+                return web.json_response({"error": "lease expired"}, status=404)
+            lease.expires_at = time.monotonic() + self.lease_timeout
+            return web.json_response({"ok": True})
+
+        async def pending_tasks(request):
+            lease = self._get_lease(await request.json())
+            if lease is None:
+                return web.json_response({"error": "lease expired"}, status=404)
+            tasks = await self.database.get_wallet_pending_tasks(lease.account[2])
+            return web.json_response({"tasks": tasks})
+
+        async def update_task(request):
+            data = await request.json()
+            lease = self._get_lease(data)
+            if lease is None:
+                return web.json_response({"error": "lease expired"}, status=404)
+            await self.database.update_task_status(
+                lease.account[2], data["task_name"], data["status"]
+            )
+            return web.json_response({"ok": True})
+
+        async def complete(request):
+            data = await request.json()
+            lease = self.leases.pop(data.get("lease_id"), None)
+            if lease is None:
+                return web.json_response({"error": "lease expired"}, status=404)
+
+            self.results[lease.position] = bool(data.get("ok"))
+            if data.get("wallet"):
+                stats_collector.record(WalletInfo(**data["wallet"]))
+            await progress_tracker.increment(1, ok=bool(data.get("ok")))
+
+            if self._is_done():
+                self.finished.set()
+            return web.json_response({"ok": True})
+
+        app = web.Application(middlewares=[auth])
+        app.add_routes(
+            [
+                web.post("/lease", lease),
+                web.post("/heartbeat", heartbeat),
+                web.post("/tasks/pending", pending_tasks),
+                web.post("/tasks/update", update_task),
+                web.post("/complete", complete),
+            ]
+        )
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        logger.info(
+            f"Coordinator listening on {host}:{port} with {len(self.accounts)} accounts"
+        )
+
+        reaper = asyncio.create_task(self._reaper())
+        try:
+            await self.finished.wait()
+            # Let workers receive the final "done" answer before shutting down
+            await asyncio.sleep(1)
+        finally:
+            reaper.cancel()
+            await runner.cleanup()
+            await progress_tracker.stop()
+
+        return [self.results.get(pos, False) for pos in range(len(self.accounts))]
+
+
+async def run_coordinator(
+    config: Config, host: str, port: int, token: str, lease_timeout: int = 120
+) -> dict | None:
+    """
+    Serves the selected accounts to remote workers and prints the final statistics.
+
+    Returns:
+        Run summary in the same format as process.run_accounts.
+    """
+    from process import load_accounts
+    from src.utils.statistics import print_wallets_stats
+
+    started_at = time.monotonic()
+
+    # Неизвестные задачи в tasks.py - до того, как воркеры разберут аккаунты
+    if not check_task_plan(config.FLOW.PLAN):
+        return None
+
+    accounts = load_accounts(config)
+    if accounts is None:
+        return None
+
+    coordinator = Coordinator(config, accounts, token, lease_timeout)
+    stats_collector.start(config.STATS.QUEUE_SIZE, config.STATS.FLUSH_INTERVAL)
+    try:
+        results = await coordinator.serve(host, port)
+    finally:
+        await stats_collector.stop()
+
+    print_wallets_stats(config)
+
+    account_numbers = [account[0] for account in accounts]
+    return {
+        "accounts": len(account_numbers),
+        "succeeded": sorted(n for n, ok in zip(account_numbers, results) if ok),
+        "failed": sorted(n for n, ok in zip(account_numbers, results) if not ok),
+        "duration_seconds": round(time.monotonic() - started_at, 2),
+    }
+
+
+class LeaseExpired(Exception):
+    """Raised when the coordinator no longer knows the lease"""
+
+
+class QueueClient:
+    """HTTP client of the coordinator API"""
+
+    def __init__(self, session, url: str):
+        self.session = session
+        self.url = url.rstrip("/")
+
+    async def post(self, path: str, payload: dict) -> tuple[int, dict]:
+        async with self.session.post(f"{self.url}{path}", json=payload) as response:
+            if response.status == 204:
+                return response.status, {}
+            data = await response.json(content_type=None)
+            if response.status == 404:
+                raise LeaseExpired(data.get("error", "lease expired"))
+            if response.status >= 400 and response.status != 410:
+                raise Exception(f"Coordinator error {response.status}: {data}")
+            return response.status, data
+
+
+class RemoteTaskStore:
+    """
+    Drop-in replacement for Database inside Start.flow: reads and updates
+    task statuses in the coordinator's database under the current lease.
+    """
+
+    def __init__(self, client: QueueClient, lease_id: str):
+        self.client = client
+        self.lease_id = lease_id
+
+    async def get_wallet_pending_tasks(self, private_key: str) -> list[dict]:
+        _, data = await self.client.post(
+            "/tasks/pending", {"lease_id": self.lease_id}
+        )
+        return data["tasks"]
+
+    async def update_task_status(
+        self, private_key: str, task_name: str, new_status: str
+    ) -> None:
+        await self.client.post(
+            "/tasks/update",
+            {"lease_id": self.lease_id, "task_name": task_name, "status": new_status},
+        )
+
+
+class _NoopProgress:
+    """Progress is tracked by the coordinator, workers don't need their own"""
+
+    async def increment(
+        self, amount: int = 1, message: str | None = None, ok: bool | None = None
+    ):
+        pass
+
+
+async def _heartbeat(client: QueueClient, lease_id: str, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await client.post("/heartbeat", {"lease_id": lease_id})
+        except LeaseExpired:
+            logger.warning(f"Lease {lease_id[:8]} expired on the coordinator")
+            return
+        except Exception as e:
+            logger.warning(f"Heartbeat failed: {e}")
+
+
+async def _worker_slot(
+    client: QueueClient, config: Config, worker_id: str, poll_interval: float
+) -> int:
+    from process import account_flow
+
+    processed = 0
+    failures = 0
+    while True:
+        try:
+            status, data = await client.post("/lease", {"worker_id": worker_id})
+            failures = 0
+        except Exception as e:
+            failures += 1
+            if failures >= MAX_CONNECTION_FAILURES:
+                logger.error(f"Coordinator unreachable, stopping worker slot: {e}")
+                return processed
+            logger.warning(f"Failed to get a lease: {e}")
+            await asyncio.sleep(poll_interval)
+            continue
+
+        if status == 410:
+            return processed
+        if status == 204:
+            # Everything is leased, wait in case a lease expires
+            await asyncio.sleep(poll_interval)
+            continue
+
+        lease_id = data["lease_id"]
+        account_index, proxy, private_key, discord_token, twitter_token = data[
+            "account"
+        ]
+        heartbeat = asyncio.create_task(
+            _heartbeat(client, lease_id, data["lease_timeout"] / 3)
+        )
+        try:
+            ok = await account_flow(
+                account_index,
+                proxy,
+                private_key,
+                discord_token,
+                twitter_token,
+                config,
+                _NoopProgress(),
+                database=RemoteTaskStore(client, lease_id),
+            )
+        finally:
+            heartbeat.cancel()
+
+        wallet = stats_collector.store.get(account_index)
+        try:
+            await client.post(
+                "/complete",
+                {
+                    "lease_id": lease_id,
+                    "ok": ok,
+                    "wallet": dataclasses.asdict(wallet) if wallet else None,
+                },
+            )
+        except Exception as e:
+            logger.error(f"{account_index} | Failed to report result: {e}")
+        processed += 1
+
+
+async def run_worker(
+    config: Config, url: str, token: str, poll_interval: float = 5
+) -> int:
+    """
+    Leases accounts from the coordinator with SETTINGS.THREADS concurrency
+    until the coordinator reports that the queue is drained.
+
+    Returns:
+        Number of accounts processed by this worker.
+    """
+    import aiohttp
+
+    tracer.configure(config.TRACING)
+    worker_id = f"{socket.gethostname()}-{secrets.token_hex(3)}"
+    logger.info(f"Worker {worker_id} connecting to {url}")
+
+    async with aiohttp.ClientSession(
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=aiohttp.ClientTimeout(total=60),
+    ) as session:
+        client = QueueClient(session, url)
+        notifier = await start_telegram_notifier(config)
+        try:
+            processed = await asyncio.gather(
+                *[
+                    _worker_slot(client, config, worker_id, poll_interval)
+                    for _ in range(config.SETTINGS.THREADS)
+                ]
+            )
+        finally:
+            if notifier:
+                await notifier.stop()
+
+    logger.success(f"Worker {worker_id} finished, processed {sum(processed)} accounts")
+    if tracer.enabled:
+        tracer.save()
+    return sum(processed)
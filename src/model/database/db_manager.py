@@ -1,12 +1,12 @@
 import asyncio
 import json
-import random
 from typing import List
 from tabulate import tabulate
 from loguru import logger
 
 from src.model.database.instance import Database
 from src.utils.config import get_config
+from src.utils.task_plan import check_task_plan
 from src.utils.reader import read_private_keys
 from src.utils.proxy_parser import Proxy  # Добавляем импорт
 
@@ -46,25 +46,30 @@ async def show_database_menu():
             await asyncio.sleep(1)
 
 
-async def reset_database():
+async def reset_database(confirm: bool = True) -> bool:
     """Создание новой или сброс существующей базы данных"""
-    print("\n⚠️ WARNING: This will delete all existing data.")
-    print("[1] Yes")
-    print("[2] No")
+    if confirm:
+        print("\n⚠️ WARNING: This will delete all existing data.")
+        print("[1] Yes")
+        print("[2] No")
 
-    confirmation = input("\nEnter your choice (1-2): ").strip()
+        confirmation = input("\nEnter your choice (1-2): ").strip()
 
-    if confirmation != "1":
-        logger.info("Database reset cancelled")
-        return
+        if confirmation != "1":
+            logger.info("Database reset cancelled")
+            return False
 
     try:
+        # tasks.py проверяется до очистки базы
+        config = get_config()
+        if not check_task_plan(config.FLOW.PLAN):
+            return False
+
         db = Database()
         await db.clear_database()
         await db.init_db()
 
         # Генерируем задачи для новой базы данных
-        config = get_config()
         private_keys = read_private_keys("data/private_keys.txt")
 
         # Читаем прокси
@@ -73,10 +78,10 @@ async def reset_database():
             proxies = [proxy.get_default_format() for proxy in proxy_objects]
             if len(proxies) == 0:
                 logger.error("No proxies found in data/proxies.txt")
-                return
+                return False
         except Exception as e:
             logger.error(f"Failed to load proxies: {e}")
-            return
+            return False
 
         # Добавляем кошельки с прокси и задачами
         for i, private_key in enumerate(private_keys):
@@ -100,45 +105,28 @@ async def reset_database():
         logger.success(
             f"Database has been reset and initialized with {len(private_keys)} wallets!"
         )
+        return True
 
     except Exception as e:
         logger.error(f"Error resetting database: {e}")
+        return False
 
 
 def generate_tasks_from_config(config) -> List[str]:
-    """Генерация списка задач из конфига в том же формате, что и в start.py"""
-    planned_tasks = []
-
-    # Получаем список задач из конфига
-    for task_name in config.FLOW.TASKS:
-        # Импортируем tasks.py для получения конкретного списка задач
-        import tasks
-
-        # Получаем список подзадач для текущей задачи
-        task_list = getattr(tasks, task_name)
-
-        # Обрабатываем каждую подзадачу
-        for task_item in task_list:
-            if isinstance(task_item, list):
-                # Для задач в [], выбираем случайную
-                selected_task = random.choice(task_item)
-                planned_tasks.append(selected_task)
-            elif isinstance(task_item, tuple):
-                # Для задач в (), перемешиваем все
-                shuffled_tasks = list(task_item)
-                random.shuffle(shuffled_tasks)
-                # Добавляем все задачи из кортежа
-                planned_tasks.extend(shuffled_tasks)
-            else:
-                # Обычная задача
-                planned_tasks.append(task_item)
+    """Генерация списка задач по плану, скомпилированному из tasks.py при загрузке конфига"""
+    # Неизвестные задачи не должны попасть в базу; проверка выполняется один раз
+    config.FLOW.PLAN.check()
 
+    planned_tasks = config.FLOW.PLAN.generate()
     logger.info(f"Generated tasks sequence: {planned_tasks}")
     return planned_tasks
 
 
-async def regenerate_tasks_for_completed():
-    """Генерация новых задач для завершенных кошельков"""
+async def regenerate_tasks_for_completed(confirm: bool = True) -> int | None:
+    """Генерация новых задач для завершенных кошельков.
+
+    Returns the number of regenerated wallets or None on error/cancel.
+    """
     try:
         db = Database()
         config = get_config()
@@ -148,17 +136,18 @@ async def regenerate_tasks_for_completed():
 
         if not completed_wallets:
             logger.info("No completed wallets found")
-            return
+            return 0
 
-        print("\n[1] Yes")
-        print("[2] No")
-        confirmation = input(
-            "\nThis will replace all tasks for completed wallets. Continue? (1-2): "
-        ).strip()
+        if confirm:
+            print("\n[1] Yes")
+            print("[2] No")
+            confirmation = input(
+                "\nThis will replace all tasks for completed wallets. Continue? (1-2): "
+            ).strip()
 
-        if confirmation != "1":
-            logger.info("Task regeneration cancelled")
-            return
+            if confirmation != "1":
+                logger.info("Task regeneration cancelled")
+                return None
 
         # Для каждого завершенного кошелька генерируем новые задачи
         for wallet in completed_wallets:
@@ -172,13 +161,18 @@ async def regenerate_tasks_for_completed():
         logger.success(
             f"Generated new tasks for {len(completed_wallets)} completed wallets"
         )
+        return len(completed_wallets)
 
     except Exception as e:
         logger.error(f"Error regenerating tasks: {e}")
+        return None
+
 
+async def regenerate_tasks_for_all(confirm: bool = True) -> int | None:
+    """Генерация новых задач для всех кошельков.
 
-async def regenerate_tasks_for_all():
-    """Генерация новых задач для всех кошельков"""
+    Returns the number of regenerated wallets or None on error/cancel.
+    """
     try:
         db = Database()
         config = get_config()
@@ -190,17 +184,18 @@ async def regenerate_tasks_for_all():
 
         if not all_wallets:
             logger.info("No wallets found in database")
-            return
+            return 0
 
-        print("\n[1] Yes")
-        print("[2] No")
-        confirmation = input(
-            "\nThis will replace all tasks for ALL wallets. Continue? (1-2): "
-        ).strip()
+        if confirm:
+            print("\n[1] Yes")
+            print("[2] No")
+            confirmation = input(
+                "\nThis will replace all tasks for ALL wallets. Continue? (1-2): "
+            ).strip()
 
-        if confirmation != "1":
-            logger.info("Task regeneration cancelled")
-            return
+            if confirmation != "1":
+                logger.info("Task regeneration cancelled")
+                return None
 
         # Для каждого кошелька генерируем новые задачи
         for wallet in all_wallets:
@@ -212,9 +207,24 @@ async def regenerate_tasks_for_all():
             await db.add_tasks_to_wallet(wallet["private_key"], new_tasks)
 
         logger.success(f"Generated new tasks for all {len(all_wallets)} wallets")
+        return len(all_wallets)
 
     except Exception as e:
         logger.error(f"Error regenerating tasks for all wallets: {e}")
+        return None
+
+
+async def get_database_stats() -> dict:
+    """Сводка по кошелькам в базе данных без вывода таблицы"""
+    db = Database()
+    total = await db.get_total_wallets_count()
+    completed = await db.get_completed_wallets_count()
+
+    return {
+        "total_wallets": total,
+        "completed_wallets": completed,
+        "pending_wallets": total - completed,
+    }
 
 
 async def show_database_contents():
@@ -294,8 +304,11 @@ async def show_database_contents():
         logger.error(f"Error showing database contents: {e}")
 
 
-async def add_new_wallets():
-    """Добавление новых кошельков из файла в базу данных"""
+async def add_new_wallets(confirm: bool = True) -> int | None:
+    """Добавление новых кошельков из файла в базу данных.
+
+    Returns the number of added wallets or None on error/cancel.
+    """
     try:
         db = Database()
         config = get_config()
@@ -309,10 +322,10 @@ async def add_new_wallets():
             proxies = [proxy.get_default_format() for proxy in proxy_objects]
             if len(proxies) == 0:
                 logger.error("No proxies found in data/proxies.txt")
-                return
+                return None
         except Exception as e:
             logger.error(f"Failed to load proxies: {e}")
-            return
+            return None
 
         # Получаем существующие кошельки из базы
         completed_wallets = await db.get_completed_wallets()
@@ -326,16 +339,17 @@ async def add_new_wallets():
 
         if not new_wallets:
             logger.info("No new wallets found to add")
-            return
+            return 0
 
-        print(f"\nFound {len(new_wallets)} new wallets to add to database")
-        print("\n[1] Yes")
-        print("[2] No")
-        confirmation = input("\nDo you want to add these wallets? (1-2): ").strip()
+        if confirm:
+            print(f"\nFound {len(new_wallets)} new wallets to add to database")
+            print("\n[1] Yes")
+            print("[2] No")
+            confirmation = input("\nDo you want to add these wallets? (1-2): ").strip()
 
-        if confirmation != "1":
-            logger.info("Adding new wallets cancelled")
-            return
+            if confirmation != "1":
+                logger.info("Adding new wallets cancelled")
+                return None
 
         # Добавляем новые кошельки
         added_count = 0
@@ -357,6 +371,8 @@ async def add_new_wallets():
             added_count += 1
 
         logger.success(f"Successfully added {added_count} new wallets to database!")
+        return added_count
 
     except Exception as e:
         logger.error(f"Error adding new wallets: {e}")
+        return None
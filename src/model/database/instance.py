@@ -1,6 +1,6 @@
 import json
 from typing import Optional, List, Dict
-from sqlalchemy import create_engine, Column, Integer, String
+from sqlalchemy import create_engine, event, Column, Float, Integer, String, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -8,6 +8,9 @@ from loguru import logger
 
 Base = declarative_base()
 
+# Строк в одном INSERT статистики: 5 параметров на строку, лимит SQLite 999
+WALLET_STATS_CHUNK = 150
+
 
 class Wallet(Base):
     __tablename__ = "wallets"
@@ -18,12 +21,42 @@ class Wallet(Base):
     tasks = Column(String)  # JSON строка с задачами
 
 
+class Allowance(Base):
+    __tablename__ = "allowances"
+    __table_args__ = (UniqueConstraint("wallet", "token", "spender"),)
+    id = Column(Integer, primary_key=True)
+    wallet = Column(String, index=True)
+    token = Column(String)
+    spender = Column(String)
+    amount = Column(String)  # uint256 не помещается в INTEGER SQLite
+
+
+class WalletStat(Base):
+    # Только нативный баланс и число транзакций, балансы токенов не хранятся
+    __tablename__ = "wallet_stats"
+    address = Column(String, primary_key=True)
+    account_index = Column(Integer)
+    balance = Column(Float)
+    transactions = Column(Integer)
+    updated_at = Column(Float)  # unix time
+
+
+def _enable_wal(dbapi_connection, connection_record):
+    """WAL lets readers from other processes proceed while one of them writes"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.close()
+
+
 class Database:
     def __init__(self):
         self.engine = create_async_engine(
             "sqlite+aiosqlite:///data/accounts.db",  # Изменен путь и название БД
             echo=False,
+            # Shard processes share the file: wait for the write lock instead of failing
+            connect_args={"timeout": 30},
         )
+        event.listen(self.engine.sync_engine, "connect", _enable_wal)
         self.session = sessionmaker(
             bind=self.engine, class_=AsyncSession, expire_on_commit=False
         )
@@ -34,6 +67,12 @@ class Database:
             await conn.run_sync(Base.metadata.create_all)
         logger.success("Database initialized successfully")
 
+    async def init_tables(self, *models):
+        """Создание таблиц, добавленных после создания базы"""
+        async with self.engine.begin() as conn:
+            for model in models:
+                await conn.run_sync(model.__table__.create, checkfirst=True)
+
     async def clear_database(self):
         """Полная очистка базы данных"""
         async with self.engine.begin() as conn:
@@ -41,6 +80,92 @@ class Database:
             await conn.run_sync(Base.metadata.create_all)
         logger.success("Database cleared successfully")
 
+    async def get_allowances(self, wallet: str) -> Dict[tuple, int]:
+        """
+        Сохраненные allowance кошелька
+
+        :param wallet: Адрес кошелька
+        :return: {(token, spender): amount}
+        """
+        async with self.session() as session:
+            from sqlalchemy import select
+
+            result = await session.execute(select(Allowance).filter_by(wallet=wallet))
+            return {
+                (row.token, row.spender): int(row.amount)
+                for row in result.scalars().all()
+            }
+
+    async def set_allowance(
+        self, wallet: str, token: str, spender: str, amount: Optional[int]
+    ) -> None:
+        """
+        Сохранение allowance, None удаляет запись
+
+        :param wallet: Адрес кошелька
+        :param token: Адрес токена
+        :param spender: Адрес контракта, которому выдан approve
+        :param amount: Оставшийся allowance в wei
+        """
+        async with self.session() as session:
+            from sqlalchemy import select
+
+            result = await session.execute(
+                select(Allowance).filter_by(wallet=wallet, token=token, spender=spender)
+            )
+            row = result.scalar_one_or_none()
+            if amount is None:
+                if row is not None:
+                    await session.delete(row)
+            elif row is None:
+                session.add(
+                    Allowance(
+                        wallet=wallet, token=token, spender=spender, amount=str(amount)
+                    )
+                )
+            else:
+                row.amount = str(amount)
+            await session.commit()
+
+    async def save_wallet_stats(self, wallets: list, updated_at: float) -> None:
+        """
+        Сохранение статистики кошельков, одна строка на адрес.
+        Пишется пачками по WALLET_STATS_CHUNK строк в одной транзакции,
+        чтобы не упираться в лимит переменных SQLite (999 в старых версиях)
+
+        :param wallets: Список WalletInfo
+        :param updated_at: Время сбора статистики (unix time)
+        """
+        from sqlalchemy.dialects.sqlite import insert
+
+        if not wallets:
+            return
+        async with self.session() as session:
+            for start in range(0, len(wallets), WALLET_STATS_CHUNK):
+                statement = insert(WalletStat).values(
+                    [
+                        {
+                            "address": wallet.address,
+                            "account_index": wallet.account_index,
+                            "balance": wallet.balance,
+                            "transactions": wallet.transactions,
+                            "updated_at": updated_at,
+                        }
+                        for wallet in wallets[start : start + WALLET_STATS_CHUNK]
+                    ]
+                )
+                statement = statement.on_conflict_do_update(
+                    index_elements=[WalletStat.address],
+                    set_={
+                        "account_index": statement.excluded.account_index,
+                        "balance": statement.excluded.balance,
+                        "transactions": statement.excluded.transactions,
+                        "updated_at": statement.excluded.updated_at,
+                    },
+                )
+                await session.execute(statement)
+            await session.commit()
+
     async def add_wallet(
         self,
         private_key: str,
@@ -7,6 +7,7 @@ import time
 from loguru import logger
 from curl_cffi.requests import AsyncSession, Response
 from src.utils.config import Config
+from src.utils.circuit_breaker import error_pause
 
 
 class DiscordInviter:
@@ -49,7 +50,7 @@ class DiscordInviter:
                 logger.error(
                     f"{self.account_index} | Error: {e}. Retrying in {random_sleep} seconds..."
                 )
-                await asyncio.sleep(random_sleep)
+                await error_pause(random_sleep)
         return False
 
     async def send_invite_request(
@@ -127,7 +128,7 @@ class DiscordInviter:
                 logger.error(
                     f"{self.account_index} | Send invite error: {e}. Retrying in {random_sleep} seconds..."
                 )
-                await asyncio.sleep(random_sleep)
+                await error_pause(random_sleep)
 
         return False
 
@@ -1,19 +1,9 @@
 from eth_account import Account
 from typing import Optional, Tuple
-from dataclasses import dataclass
-from threading import Lock
 from loguru import logger
-from src.utils.config import Config
+from src.utils.config import Config, WalletInfo
 from src.model.onchain.web3_custom import Web3Custom
-
-
-@dataclass
-class WalletInfo:
-    account_index: int
-    private_key: str
-    address: str
-    balance: float
-    transactions: int
+from src.utils.stats_collector import stats_collector
 
 
 class WalletStats:
@@ -21,13 +11,12 @@ class WalletStats:
         # Используем публичную RPC ноду Base
         self.w3 = web3
         self.config = config
-        self._lock = Lock()
 
     async def get_wallet_stats(
         self, private_key: str, account_index: int
     ) -> Optional[bool]:
         """
-        Получает статистику кошелька и сохраняет в конфиг
+        Получает статистику кошелька и передает ее в stats_collector
 
         Args:
             private_key: Приватный ключ кошелька
@@ -56,8 +45,8 @@ class WalletStats:
                 transactions=tx_count,
             )
 
-            with self._lock:
-                self.config.WALLETS.wallets.append(wallet_info)
+            # Повторный сбор того же аккаунта заменяет его строку
+            await stats_collector.submit(wallet_info)
 
             logger.info(
                 f"{account_index} | {address} | "
@@ -1,5 +1,15 @@
-from .web3_custom import Web3Custom
-from .constants import Balance
-
 __all__ = ["Web3Custom", "Balance"]
 
+
+def __getattr__(name: str):
+    # web3 is only imported once something needs it, so allowances and
+    # the other helpers of the package can be used without it.
+    if name == "Web3Custom":
+        from .web3_custom import Web3Custom
+
+        return Web3Custom
+    if name == "Balance":
+        from .constants import Balance
+
+        return Balance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,80 @@
+from loguru import logger
+
+from src.model.database.instance import Allowance, Database
+
+
+MAX_UINT256 = 2**256 - 1
+
+
+class AllowanceCache:
+    """
+    Allowance of (wallet, token, spender) remembered across runs in the
+    accounts database, so a swap doesn't read allowance() from chain each time.
+
+    approve_token stores the allowance it read or approved, and a
+    successful swap subtracts what it spent with spend(). After a failed
+    swap the entry is forgotten, in case it overestimates. With APPROVE_MAX
+    the cached allowance covers every next swap, so neither allowance() nor
+    approve are sent again; without it each swap still needs an approve.
+    """
+
+    def __init__(self):
+        self._db: Database | None = None
+        self._persistent = True
+        self._wallets: dict[str, dict[tuple[str, str], int]] = {}
+
+    async def _database(self) -> Database | None:
+        if self._persistent and self._db is None:
+            try:
+                db = Database()
+                await db.init_tables(Allowance)
+                self._db = db
+            except Exception as e:
+                # Без базы кэш работает только в памяти процесса
+                logger.warning(f"Allowance cache is not persisted: {e}")
+                self._persistent = False
+        return self._db
+
+    async def _load(self, wallet: str) -> dict[tuple[str, str], int]:
+        if wallet not in self._wallets:
+            allowances = {}
+            db = await self._database()
+            if db is not None:
+                try:
+                    allowances = await db.get_allowances(wallet)
+                except Exception as e:
+                    logger.warning(f"Failed to load allowances of {wallet}: {e}")
+            self._wallets[wallet] = allowances
+        return self._wallets[wallet]
+
+    async def get(self, wallet: str, token: str, spender: str) -> int | None:
+        return (await self._load(wallet)).get((token, spender))
+
+    async def set(
+        self, wallet: str, token: str, spender: str, amount: int | None
+    ) -> None:
+        """Remember the remaining allowance, None forgets it"""
+        allowances = await self._load(wallet)
+        if amount is None:
+            if allowances.pop((token, spender), None) is None:
+                return
+        else:
+            allowances[(token, spender)] = amount
+
+        db = await self._database()
+        if db is not None:
+            try:
+                await db.set_allowance(wallet, token, spender, amount)
+            except Exception as e:
+                logger.warning(f"Failed to save allowance of {wallet}: {e}")
+
+    async def spend(self, wallet: str, token: str, spender: str, amount: int) -> None:
+        current = await self.get(wallet, token, spender)
+        if current is not None:
+            await self.set(wallet, token, spender, max(current - amount, 0))
+
+    async def forget(self, wallet: str, token: str, spender: str) -> None:
+        await self.set(wallet, token, spender, None)
+
+
+allowances = AllowanceCache()
@@ -0,0 +1,222 @@
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+from web3 import AsyncWeb3, Web3
+
+
+# keccak("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+# Как часто проверяется номер блока, секунды
+BLOCK_POLL_INTERVAL = 1.0
+
+BALANCE_OF_ABI = [
+    {
+        "inputs": [{"internalType": "address", "name": "owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+
+def _address_topic(address: str) -> str:
+    return "0x" + "0" * 24 + address[2:].lower()
+
+
+@dataclass(slots=True)
+class _Waiter:
+    address: str
+    token: Optional[str]
+    initial: int
+    future: asyncio.Future
+    # Token waiters read balanceOf once, then only look at Transfer logs
+    checked: bool = field(default=False)
+
+    def resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class BalanceWatcher:
+    """
+    Resolves "wait until the balance goes up" for every waiting wallet of a
+    chain with one shared request round per block instead of a polling loop
+    per wallet:
+
+    - native balances: eth_getBalance of all waiting wallets in one batch
+    - token balances: balanceOf once on registration (in the same batch),
+      then eth_getLogs for Transfer events to the waiting wallets
+
+    The watcher reads through its own provider, so it doesn't depend on the
+    lifetime of any account's web3 client. It goes through the same proxy
+    as the accounts it serves, wallets behind different proxies get
+    different watchers. A failed tick switches to the next RPC url.
+    """
+
+    def __init__(
+        self,
+        rpc_urls: list[str],
+        proxy: str | None = None,
+        ssl: bool = False,
+        poll_interval: float = BLOCK_POLL_INTERVAL,
+    ):
+        self.poll_interval = poll_interval
+        self.proxy = proxy
+        self.ssl = ssl
+        self._rpc_urls = itertools.cycle(rpc_urls)
+        self._waiters: list[_Waiter] = []
+        self._web3: AsyncWeb3 | None = None
+        self._task: asyncio.Task | None = None
+        self._last_block: int | None = None
+        self._batching = True
+
+    def _connect(self) -> AsyncWeb3:
+        from src.model.onchain.web3_custom import Web3Custom
+
+        if self._web3 is None:
+            self._web3 = AsyncWeb3(
+                Web3Custom.create_provider(next(self._rpc_urls), self.proxy, self.ssl)
+            )
+            self._batching = True
+        return self._web3
+
+    async def _disconnect(self) -> None:
+        web3, self._web3 = self._web3, None
+        if web3 is not None:
+            try:
+                await web3.provider.disconnect()
+            except Exception as e:
+                logger.debug(f"Balance watcher provider disconnect failed: {e}")
+
+    async def wait(
+        self,
+        address: str,
+        initial: int,
+        token: Optional[str] = None,
+        timeout: float = 60,
+    ) -> bool:
+        """True once the balance is above `initial` (wei), False after timeout"""
+        waiter = _Waiter(
+            address=Web3.to_checksum_address(address),
+            token=Web3.to_checksum_address(token) if token else None,
+            initial=initial,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._waiters.remove(waiter)
+
+    async def _run(self) -> None:
+        try:
+            while self._waiters:
+                try:
+                    await self._tick()
+                except Exception as e:
+                    logger.warning(f"Balance watcher tick failed, switching RPC: {e}")
+                    await self._disconnect()
+                await asyncio.sleep(self.poll_interval)
+        finally:
+            # Следующий запуск начнет с текущего блока
+            self._last_block = None
+            await self._disconnect()
+
+    async def _tick(self) -> None:
+        web3 = self._connect()
+        block = await web3.eth.block_number
+        if self._last_block is not None and block <= self._last_block:
+            return
+
+        waiters = [waiter for waiter in self._waiters if not waiter.future.done()]
+        balance_waiters = [w for w in waiters if w.token is None or not w.checked]
+        log_waiters = [w for w in waiters if w.token is not None and w.checked]
+
+        if balance_waiters:
+            balances = await self._balances(web3, balance_waiters, block)
+            for waiter, balance in zip(balance_waiters, balances):
+                waiter.checked = True
+                if balance is not None and balance > waiter.initial:
+                    waiter.resolve()
+
+        if log_waiters and self._last_block is not None:
+            await self._check_transfers(web3, log_waiters, self._last_block + 1, block)
+
+        self._last_block = block
+
+    async def _balances(self, web3, waiters: list[_Waiter], block: int) -> list[Optional[int]]:
+        def request(waiter: _Waiter):
+            if waiter.token is None:
+                return web3.eth.get_balance(waiter.address, block)
+            contract = web3.eth.contract(address=waiter.token, abi=BALANCE_OF_ABI)
+            return contract.functions.balanceOf(waiter.address)
+
+        if self._batching:
+            try:
+                async with web3.batch_requests() as batch:
+                    for waiter in waiters:
+                        batch.add(request(waiter))
+                    return list(await batch.async_execute())
+            except Exception as e:
+                # RPC без поддержки batch - дальше обычные запросы
+                logger.debug(f"Batch requests are not available, falling back: {e}")
+                self._batching = False
+
+        async def single(waiter: _Waiter) -> Optional[int]:
+            try:
+                if waiter.token is None:
+                    return await request(waiter)
+                return await request(waiter).call(block_identifier=block)
+            except Exception:
+                return None
+
+        return await asyncio.gather(*[single(waiter) for waiter in waiters])
+
+    async def _check_transfers(
+        self, web3, waiters: list[_Waiter], from_block: int, to_block: int
+    ) -> None:
+        logs = await web3.eth.get_logs(
+            {
+                "fromBlock": from_block,
+                "toBlock": to_block,
+                "address": list({waiter.token for waiter in waiters}),
+                "topics": [
+                    TRANSFER_TOPIC,
+                    None,
+                    list({_address_topic(waiter.address) for waiter in waiters}),
+                ],
+            }
+        )
+
+        received = set()
+        for log in logs:
+            if int.from_bytes(bytes(log["data"]), "big") == 0:
+                continue
+            recipient = Web3.to_checksum_address(bytes(log["topics"][2])[-20:])
+            received.add((Web3.to_checksum_address(log["address"]), recipient))
+
+        for waiter in waiters:
+            if (waiter.token, waiter.address) in received:
+                waiter.resolve()
+
+
+_watchers: dict[tuple[tuple[str, ...], str | None], BalanceWatcher] = {}
+
+
+def get_balance_watcher(
+    rpc_urls: list[str], proxy: str | None = None, ssl: bool = False
+) -> BalanceWatcher:
+    """One watcher per chain (identified by its RPC list) and proxy per process"""
+    key = (tuple(rpc_urls), proxy)
+    if key not in _watchers:
+        _watchers[key] = BalanceWatcher(rpc_urls, proxy, ssl)
+    return _watchers[key]
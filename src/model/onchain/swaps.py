@@ -0,0 +1,305 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from eth_account.signers.local import LocalAccount
+from loguru import logger
+
+from src.model.onchain.constants import Balance
+from src.model.onchain.web3_custom import Web3Custom
+
+
+# Сколько секунд действителен swap для роутеров с deadline
+DEADLINE_SECONDS = 1200
+# Запас к оценке газа
+GAS_BUFFER = 1.2
+
+ERC20_ABI = [
+    {
+        "inputs": [{"internalType": "address", "name": "owner", "type": "address"}],
+        "name": "balanceOf",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [
+            {"internalType": "address", "name": "spender", "type": "address"},
+            {"internalType": "uint256", "name": "amount", "type": "uint256"},
+        ],
+        "name": "approve",
+        "outputs": [{"internalType": "bool", "name": "", "type": "bool"}],
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+    {
+        "inputs": [
+            {"internalType": "address", "name": "owner", "type": "address"},
+            {"internalType": "address", "name": "spender", "type": "address"},
+        ],
+        "name": "allowance",
+        "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+
+def _router_abi(deadline: bool) -> list:
+    """ABI of a Uniswap V3 style router, exactInputSingle with or without deadline"""
+    components = [
+        ("address", "tokenIn"),
+        ("address", "tokenOut"),
+        ("uint24", "fee"),
+        ("address", "recipient"),
+        *([("uint256", "deadline")] if deadline else []),
+        ("uint256", "amountIn"),
+        ("uint256", "amountOutMinimum"),
+        ("uint160", "sqrtPriceLimitX96"),
+    ]
+    return [
+        {
+            "inputs": [
+                {
+                    "components": [
+                        {"internalType": kind, "name": name, "type": kind}
+                        for kind, name in components
+                    ],
+                    "internalType": "struct ISwapRouter.ExactInputSingleParams",
+                    "name": "params",
+                    "type": "tuple",
+                }
+            ],
+            "name": "exactInputSingle",
+            "outputs": [{"internalType": "uint256", "name": "amountOut", "type": "uint256"}],
+            "stateMutability": "payable",
+            "type": "function",
+        },
+        {
+            "inputs": [{"internalType": "bytes[]", "name": "data", "type": "bytes[]"}],
+            "name": "multicall",
+            "outputs": [{"internalType": "bytes[]", "name": "results", "type": "bytes[]"}],
+            "stateMutability": "payable",
+            "type": "function",
+        },
+        {
+            "inputs": [
+                {"internalType": "uint256", "name": "amountMinimum", "type": "uint256"},
+                {"internalType": "address", "name": "recipient", "type": "address"},
+            ],
+            "name": "unwrapWETH9",
+            "outputs": [],
+            "stateMutability": "payable",
+            "type": "function",
+        },
+    ]
+
+
+ROUTER_ABIS = {deadline: _router_abi(deadline) for deadline in (False, True)}
+
+
+@dataclass(frozen=True, slots=True)
+class Token:
+    address: str
+    symbol: str
+    decimals: int = 18
+
+
+@dataclass(frozen=True, slots=True)
+class SwapRouter:
+    """Where and how swaps are sent"""
+
+    address: str
+    chain_id: int
+    # Needed only for routes with the native coin
+    wrapped_native: Optional[Token] = None
+    explorer_url: Optional[str] = None
+    # exactInputSingle params include deadline
+    deadline: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """
+    One swap. None for token_in/token_out means the native coin: it is
+    sent as value and wrapped by the router, or unwrapped by the router
+    in the same multicall.
+    """
+
+    token_in: Optional[Token]
+    token_out: Optional[Token]
+    # Fee tiers to try in order until gas estimation passes
+    fees: Sequence[int]
+
+    @property
+    def native_in(self) -> bool:
+        return self.token_in is None
+
+    @property
+    def native_out(self) -> bool:
+        return self.token_out is None
+
+    def describe(self, native_symbol: str) -> str:
+        token_in = self.token_in.symbol if self.token_in else native_symbol
+        token_out = self.token_out.symbol if self.token_out else native_symbol
+        return f"{token_in} to {token_out}"
+
+
+@dataclass(slots=True)
+class BalanceSnapshot:
+    native: Optional[Balance]
+    tokens: dict[str, Balance]
+
+    def of(self, token: Optional[Token]) -> Balance:
+        return self.native if token is None else self.tokens[token.address]
+
+
+class SwapEngine:
+    """
+    approve → encode → estimate → execute for swaps through one router.
+
+    Contract bindings are created once per engine, the calldata is encoded
+    locally, and execute_transaction fills nonce and gas price, so a swap
+    costs estimate + send + receipt on top of approve.
+    """
+
+    __slots__ = ("web3", "wallet", "account_index", "router", "native_symbol", "_contracts")
+
+    def __init__(
+        self,
+        web3: Web3Custom,
+        wallet: LocalAccount,
+        router: SwapRouter,
+        native_symbol: str = "STT",
+    ):
+        self.web3 = web3
+        self.wallet = wallet
+        self.account_index = web3.account_index
+        self.router = router
+        self.native_symbol = native_symbol
+        self._contracts: dict[tuple[str, bool], object] = {}
+
+    def _router_contract(self):
+        key = (self.router.address, self.router.deadline)
+        if key not in self._contracts:
+            self._contracts[key] = self.web3.web3.eth.contract(
+                address=self.router.address, abi=ROUTER_ABIS[self.router.deadline]
+            )
+        return self._contracts[key]
+
+    async def snapshot(
+        self, tokens: Sequence[Token], native: bool = True
+    ) -> BalanceSnapshot:
+        """Token balances (and the native one) read concurrently, once per swap round"""
+        address = self.wallet.address
+        requests = [
+            self.web3.get_token_balance(
+                address, token.address, ERC20_ABI, decimals=token.decimals, symbol=token.symbol
+            )
+            for token in tokens
+        ]
+        if native:
+            requests.append(self.web3.get_balance(address))
+
+        balances = await asyncio.gather(*requests)
+        if any(balance is None for balance in balances):
+            raise Exception("Failed to get balances")
+        return BalanceSnapshot(
+            native=balances[-1] if native else None,
+            tokens={token.address: balance for token, balance in zip(tokens, balances)},
+        )
+
+    def _encode(self, route: Route, fee: int, amount_in: int, deadline: int) -> dict:
+        router = self.router
+        contract = self._router_contract()
+        token_in = route.token_in or router.wrapped_native
+        token_out = route.token_out or router.wrapped_native
+
+        params = [
+            token_in.address,
+            token_out.address,
+            fee,
+            # Wrapped native остается у роутера и разворачивается в том же multicall
+            router.address if route.native_out else self.wallet.address,
+        ]
+        if router.deadline:
+            params.append(deadline)
+        params += [amount_in, 0, 0]  # amountOutMinimum, sqrtPriceLimitX96
+
+        data = contract.encode_abi("exactInputSingle", args=[tuple(params)])
+        if route.native_out:
+            unwrap = contract.encode_abi("unwrapWETH9", args=[0, self.wallet.address])
+            data = contract.encode_abi("multicall", args=[[data, unwrap]])
+
+        return {
+            "to": router.address,
+            "data": data,
+            "value": amount_in if route.native_in else 0,
+        }
+
+    async def swap(self, route: Route, amount_in: int) -> bool:
+        router = self.router
+        name = route.describe(self.native_symbol)
+        if (route.native_in or route.native_out) and router.wrapped_native is None:
+            raise ValueError(f"Router {router.address} has no wrapped native token")
+
+        if not route.native_in:
+            approved = await self.web3.approve_token(
+                token_address=route.token_in.address,
+                spender_address=router.address,
+                amount=amount_in,
+                wallet=self.wallet,
+                chain_id=router.chain_id,
+                token_abi=ERC20_ABI,
+                explorer_url=router.explorer_url,
+            )
+            if not approved:
+                logger.error(f"{self.account_index} | Failed to approve {route.token_in.symbol}")
+                return False
+
+        # Локальное время вместо get_block("latest"): 20 минут покрывают любое расхождение
+        deadline = int(time.time()) + DEADLINE_SECONDS
+
+        for fee in route.fees:
+            tx_data = self._encode(route, fee, amount_in, deadline)
+            try:
+                gas_estimate = await self.web3.web3.eth.estimate_gas(
+                    {"from": self.wallet.address, **tx_data}
+                )
+            except Exception as e:
+                logger.error(
+                    f"{self.account_index} | Gas estimation failed with {fee / 10000}% fee: {e}"
+                )
+                continue
+            tx_data["gas"] = int(gas_estimate * GAS_BUFFER)
+
+            try:
+                tx_hash = await self.web3.execute_transaction(
+                    tx_data,
+                    wallet=self.wallet,
+                    chain_id=router.chain_id,
+                    explorer_url=router.explorer_url,
+                )
+            except Exception as e:
+                logger.error(f"{self.account_index} | Failed to swap {name}: {e}")
+                break
+
+            if tx_hash:
+                if not route.native_in:
+                    await self.web3.spend_allowance(
+                        self.wallet.address, route.token_in.address, router.address, amount_in
+                    )
+                logger.success(
+                    f"{self.account_index} | Successfully swapped {name}. "
+                    f"TX: {router.explorer_url or ''}{tx_hash}"
+                )
+                return True
+
+        logger.error(f"{self.account_index} | Swap {name} failed")
+        if not route.native_in:
+            # The cached allowance may be wrong, read it from chain next time
+            await self.web3.forget_allowance(
+                self.wallet.address, route.token_in.address, router.address
+            )
+        return False
@@ -5,12 +5,21 @@ from web3 import AsyncWeb3
 from eth_account.signers.local import LocalAccount
 from src.utils.decorators import retry_async
 from src.model.onchain.constants import Balance
+from src.utils.metrics import current_task, metrics
+from src.utils.tracing import tracer
+from src.utils.circuit_breaker import CircuitOpenError, get_breaker
+from src.utils.config import get_config
+from src.model.onchain.allowances import MAX_UINT256, allowances
+from src.model.onchain.balance_watcher import get_balance_watcher
 import asyncio
+import time
 import traceback
 from eth_account.messages import encode_defunct
 
 
 class Web3Custom:
+    __slots__ = ("account_index", "RPC_URLS", "use_proxy", "proxy", "ssl", "web3")
+
     def __init__(
         self,
         account_index: int,
@@ -34,25 +43,18 @@ class Web3Custom:
         for rpc_url in self.RPC_URLS:
             for attempt in range(3):
                 try:
-                    proxy_settings = (
-                        (f"http://{self.proxy}")
-                        if (self.use_proxy and self.proxy)
-                        else None
-                    )
                     self.web3 = AsyncWeb3(
-                        AsyncWeb3.AsyncHTTPProvider(
-                            rpc_url,
-                            request_kwargs={
-                                "proxy": proxy_settings,
-                                "ssl": self.ssl,
-                            },
-                        )
+                        self.create_provider(rpc_url, self.rpc_proxy, self.ssl)
                     )
 
                     # Test connection
                     await self.web3.eth.chain_id
                     return
 
+                except CircuitOpenError as e:
+                    # RPC недоступна для всех аккаунтов - сразу пробуем следующую
+                    logger.warning(f"{self.account_index} | {e}")
+                    break
                 except Exception as e:
                     logger.warning(
                         f"{self.account_index} | Attempt {attempt + 1}/3 failed for {rpc_url}: {str(e)}"
@@ -63,6 +65,72 @@ class Web3Custom:
 
         raise Exception("Failed to connect to any RPC URL")
 
+    @property
+    def rpc_proxy(self) -> str | None:
+        """Proxy url for RPC requests, None if USE_PROXY_FOR_RPC is off"""
+        return f"http://{self.proxy}" if (self.use_proxy and self.proxy) else None
+
+    @classmethod
+    def create_provider(cls, rpc_url: str, proxy: str | None, ssl: bool = False):
+        """HTTP provider whose requests are counted, traced and circuit-broken"""
+        provider = AsyncWeb3.AsyncHTTPProvider(
+            rpc_url,
+            request_kwargs={
+                "proxy": proxy,
+                "ssl": ssl,
+            },
+        )
+        provider.make_request = cls._count_rpc_calls(provider.make_request, rpc_url)
+        provider.make_batch_request = cls._count_rpc_batches(
+            provider.make_batch_request, rpc_url
+        )
+        return provider
+
+    @staticmethod
+    def _count_rpc_calls(make_request, rpc_url: str):
+        """
+        Wrap provider.make_request to count and trace JSON-RPC calls per task
+        and to stop calling the RPC while its circuit breaker is open.
+        """
+        breaker = get_breaker(f"rpc {rpc_url}")
+
+        async def counted_make_request(method, params):
+            # Отклоненные брейкером считает circuit_rejections_total
+            breaker.check()
+            metrics.inc("rpc_calls_total", method=str(method), task=current_task.get())
+            try:
+                with tracer.span(str(method), "rpc"):
+                    response = await make_request(method, params)
+            except Exception:
+                breaker.record_failure()
+                raise
+            # JSON-RPC errors (reverts etc.) mean the node itself is fine
+            breaker.record_success()
+            return response
+
+        return counted_make_request
+
+    @staticmethod
+    def _count_rpc_batches(make_batch_request, rpc_url: str):
+        """The same for provider.make_batch_request, one call per batch element"""
+        breaker = get_breaker(f"rpc {rpc_url}")
+
+        async def counted_make_batch_request(requests):
+            breaker.check()
+            task = current_task.get()
+            for method, _ in requests:
+                metrics.inc("rpc_calls_total", method=str(method), task=task)
+            try:
+                with tracer.span("batch", "rpc", calls=len(requests)):
+                    response = await make_batch_request(requests)
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+            return response
+
+        return counted_make_batch_request
+
     @retry_async(attempts=3, delay=3.0, default_value=None)
     async def get_balance(self, address: str) -> Balance:
         """
@@ -189,6 +257,7 @@ class Web3Custom:
             tx_hash = await self.web3.eth.send_raw_transaction(
                 signed_txn.raw_transaction
             )
+            sent_at = time.monotonic()
 
             logger.info(
                 f"{self.account_index} | Waiting for transaction confirmation..."
@@ -196,6 +265,11 @@ class Web3Custom:
             receipt = await self.web3.eth.wait_for_transaction_receipt(
                 tx_hash, poll_latency=2
             )
+            task = current_task.get()
+            metrics.observe(
+                "tx_confirmation_seconds", time.monotonic() - sent_at, task=task
+            )
+            metrics.inc("gas_used_total", receipt.get("gasUsed", 0), task=task)
 
             if receipt["status"] == 1:
                 tx_hex = tx_hash.hex()
@@ -205,7 +279,7 @@ class Web3Custom:
                 logger.success(success_msg)
                 return tx_hex
             else:
-                raise Exception("Transaction failed")
+                raise Exception("Transaction failed: transaction reverted")
         except Exception as e:
             logger.error(
                 f"{self.account_index} | Transaction execution failed: {str(e)}"
@@ -222,10 +296,15 @@ class Web3Custom:
         chain_id: int,
         token_abi: list = None,
         explorer_url: Optional[str] = None,
-    ) -> Optional[str]:
+    ) -> Optional[Union[str, bool]]:
         """
         Approve token spending for any contract.
 
+        The remaining allowance is kept in the allowance cache, so allowance()
+        is read from chain only when the cache says it is insufficient. The
+        caller subtracts what it spent with spend_allowance.
+        Returns the approve tx hash, True if no approve was needed, None on failure.
+
         Args:
             token_address: Address of the token contract
             spender_address: Address of the contract to approve spending for
@@ -236,6 +315,18 @@ class Web3Custom:
             explorer_url: Explorer URL for logging (optional)
         """
         try:
+            token_address = self.web3.to_checksum_address(token_address)
+            spender_address = self.web3.to_checksum_address(spender_address)
+
+            cached_allowance = await allowances.get(
+                wallet.address, token_address, spender_address
+            )
+            if cached_allowance is not None and cached_allowance >= amount:
+                logger.info(
+                    f"{self.account_index} | Allowance sufficient for token {token_address} (cached)"
+                )
+                return True
+
             if token_abi is None:
                 # Use minimal ERC20 ABI if none provided
                 token_abi = [
@@ -262,7 +353,7 @@ class Web3Custom:
                 ]
 
             token_contract = self.web3.eth.contract(
-                address=self.web3.to_checksum_address(token_address), abi=token_abi
+                address=token_address, abi=token_abi
             )
 
             current_allowance = await token_contract.functions.allowance(
@@ -270,17 +361,23 @@ class Web3Custom:
             ).call()
 
             if current_allowance >= amount:
+                await allowances.set(
+                    wallet.address, token_address, spender_address, current_allowance
+                )
                 logger.info(
                     f"{self.account_index} | Allowance sufficient for token {token_address}"
                 )
-                return None
+                return True
 
             gas_params = await self.get_gas_params()
             if gas_params is None:
                 raise Exception("Failed to get gas parameters")
 
+            # Approve max once, next swaps of the token skip approve entirely
+            approve_amount = MAX_UINT256 if get_config().SETTINGS.APPROVE_MAX else amount
+
             approve_tx = await token_contract.functions.approve(
-                spender_address, amount
+                spender_address, approve_amount
             ).build_transaction(
                 {
                     "from": wallet.address,
@@ -290,9 +387,14 @@ class Web3Custom:
                 }
             )
 
-            return await self.execute_transaction(
+            tx_hash = await self.execute_transaction(
                 approve_tx, wallet=wallet, chain_id=chain_id, explorer_url=explorer_url
             )
+            if tx_hash:
+                await allowances.set(
+                    wallet.address, token_address, spender_address, approve_amount
+                )
+            return tx_hash
 
         except Exception as e:
             logger.error(
@@ -300,64 +402,65 @@ class Web3Custom:
             )
             raise
 
-    @retry_async(attempts=3, delay=5.0, default_value=None)
+    async def spend_allowance(
+        self, wallet_address: str, token_address: str, spender_address: str, amount: int
+    ) -> None:
+        """Subtract what a successful swap spent from the cached allowance"""
+        await allowances.spend(
+            wallet_address,
+            self.web3.to_checksum_address(token_address),
+            self.web3.to_checksum_address(spender_address),
+            amount,
+        )
+
+    async def forget_allowance(
+        self, wallet_address: str, token_address: str, spender_address: str
+    ) -> None:
+        """Drop the cached allowance after a failed swap, next approve reads it from chain"""
+        await allowances.forget(
+            wallet_address,
+            self.web3.to_checksum_address(token_address),
+            self.web3.to_checksum_address(spender_address),
+        )
+
     async def wait_for_balance_increase(
         self,
         wallet_address: str,
-        initial_balance: float,
+        initial_balance: Union[Balance, int],
         token_address: Optional[str] = None,
-        token_abi: Optional[list] = None,
         timeout: int = 60,
-        check_interval: int = 5,
-        log_interval: int = 15,
-        account_index: Optional[int] = None,
     ) -> bool:
         """
         Wait for balance to increase (works for both native coin and tokens).
 
+        Waiting wallets of the process share one balance watcher per chain
+        and RPC proxy, which checks them all once per block: a batched eth_getBalance for
+        native balances and eth_getLogs of Transfer events for tokens.
+
         Args:
             wallet_address: Address to check balance for
-            initial_balance: Initial balance to compare against
+            initial_balance: Initial balance to compare against (Balance or wei)
             token_address: Token address (if waiting for token balance)
-            token_abi: Token ABI (optional, for tokens)
             timeout: Maximum time to wait in seconds
-            check_interval: How often to check balance in seconds
-            log_interval: How often to log progress in seconds
-            account_index: Optional account index for logging
         """
+        initial_wei = (
+            initial_balance.wei if isinstance(initial_balance, Balance) else int(initial_balance)
+        )
 
         logger.info(
             f"{self.account_index} | Waiting for balance to increase (max wait time: {timeout} seconds)..."
         )
-        start_time = asyncio.get_event_loop().time()
-
-        while asyncio.get_event_loop().time() - start_time < timeout:
-            # Get current balance (either native coin or token)
-            if token_address:
-                current_balance = await self.get_token_balance(
-                    wallet_address, token_address, token_abi
-                )
-            else:
-                current_balance = await self.get_balance(wallet_address)
-
-            if current_balance > initial_balance:
-                logger.success(
-                    f"{self.account_index} | Balance increased from {initial_balance} to {current_balance}"
-                )
-                return True
-
-            elapsed = int(asyncio.get_event_loop().time() - start_time)
-            if elapsed % log_interval == 0:
-                logger.info(
-                    f"{self.account_index} | Still waiting for balance to increase... ({elapsed}/{timeout} seconds)"
-                )
-
-            await asyncio.sleep(check_interval)
-
-        logger.error(
-            f"{self.account_index} | Balance didn't increase after {timeout} seconds"
+        increased = await get_balance_watcher(self.RPC_URLS, self.rpc_proxy, self.ssl).wait(
+            wallet_address, initial_wei, token_address, timeout
         )
-        return False
+
+        if increased:
+            logger.success(f"{self.account_index} | Balance increased")
+        else:
+            logger.error(
+                f"{self.account_index} | Balance didn't increase after {timeout} seconds"
+            )
+        return increased
 
     @retry_async(attempts=3, delay=10.0, default_value=None)
     async def estimate_gas(self, transaction: dict) -> int:
@@ -4,6 +4,7 @@ from loguru import logger
 from web3 import Web3
 from src.model.somnia_network.constants import SomniaProtocol
 from src.utils.decorators import retry_async
+from src.utils.circuit_breaker import error_pause
 from src.utils.constants import EXPLORER_URL_SOMNIA
 from eth_account import Account
 from src.model.onchain.web3_custom import Web3Custom
@@ -66,5 +67,5 @@ class Mintair:
             logger.error(
                 f"{self.account_index} | Error deploying Mintair: {e}. Sleeping for {random_sleep} seconds..."
             )
-            await asyncio.sleep(random_sleep)
+            await error_pause(random_sleep)
             return False
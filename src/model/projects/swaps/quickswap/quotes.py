@@ -0,0 +1,206 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+from web3 import Web3
+
+from src.model.projects.swaps.quickswap.constants import FEE_TIERS, ROUTER_ADDRESS
+from src.utils.single_flight import SingleFlight
+
+
+Q96 = 2**96
+
+# Состояние пула считается актуальным столько блоков
+MAX_BLOCK_AGE = 5
+# Номер последнего блока запрашивается не чаще, чем раз в BLOCK_TTL секунд
+BLOCK_TTL = 1.0
+
+ROUTER_FACTORY_ABI = [
+    {
+        "inputs": [],
+        "name": "factory",
+        "outputs": [{"internalType": "address", "name": "", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+FACTORY_ABI = [
+    {
+        "inputs": [
+            {"internalType": "address", "name": "tokenA", "type": "address"},
+            {"internalType": "address", "name": "tokenB", "type": "address"},
+            {"internalType": "uint24", "name": "fee", "type": "uint24"},
+        ],
+        "name": "getPool",
+        "outputs": [{"internalType": "address", "name": "pool", "type": "address"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+POOL_ABI = [
+    {
+        "inputs": [],
+        "name": "slot0",
+        "outputs": [
+            {"internalType": "uint160", "name": "sqrtPriceX96", "type": "uint160"},
+            {"internalType": "int24", "name": "tick", "type": "int24"},
+            {"internalType": "uint16", "name": "observationIndex", "type": "uint16"},
+            {"internalType": "uint16", "name": "observationCardinality", "type": "uint16"},
+            {"internalType": "uint16", "name": "observationCardinalityNext", "type": "uint16"},
+            {"internalType": "uint8", "name": "feeProtocol", "type": "uint8"},
+            {"internalType": "bool", "name": "unlocked", "type": "bool"},
+        ],
+        "stateMutability": "view",
+        "type": "function",
+    },
+    {
+        "inputs": [],
+        "name": "liquidity",
+        "outputs": [{"internalType": "uint128", "name": "", "type": "uint128"}],
+        "stateMutability": "view",
+        "type": "function",
+    },
+]
+
+
+@dataclass(frozen=True, slots=True)
+class PoolState:
+    fee: int
+    sqrt_price_x96: int
+    liquidity: int
+    tick: int
+    block: int
+
+
+def sort_tokens(token_a: str, token_b: str) -> tuple[str, str]:
+    """Uniswap V3 pools order tokens by address"""
+    return (token_a, token_b) if int(token_a, 16) < int(token_b, 16) else (token_b, token_a)
+
+
+def quote_exact_input(state: PoolState, amount_in: int, zero_for_one: bool) -> int:
+    """
+    Expected output of exactInputSingle computed from slot0/liquidity.
+    Assumes the swap stays inside the active tick range, which holds for the
+    small amounts the bot swaps; crossing ticks would only lower the result.
+    """
+    if not state.liquidity or not state.sqrt_price_x96 or amount_in <= 0:
+        return 0
+
+    amount_less_fee = amount_in * (1_000_000 - state.fee) // 1_000_000
+    liquidity = state.liquidity
+    sqrt_price = state.sqrt_price_x96
+
+    if zero_for_one:
+        # token0 in, price goes down; the pool rounds the new price up
+        numerator = liquidity * Q96 * sqrt_price
+        denominator = liquidity * Q96 + amount_less_fee * sqrt_price
+        sqrt_price_next = -(-numerator // denominator)
+        return liquidity * (sqrt_price - sqrt_price_next) // Q96
+
+    # token1 in, price goes up
+    sqrt_price_next = sqrt_price + amount_less_fee * Q96 // liquidity
+    return liquidity * Q96 * (sqrt_price_next - sqrt_price) // (sqrt_price_next * sqrt_price)
+
+
+class PoolStateCache:
+    """
+    slot0/liquidity of Quickswap pools shared by all accounts of the process.
+
+    A state is reused while it is at most MAX_BLOCK_AGE blocks old, the
+    latest block number itself is cached for BLOCK_TTL seconds, and
+    concurrent requests for the same pool wait for a single RPC read.
+    Pool addresses never change and are cached forever.
+    """
+
+    def __init__(self, max_block_age: int = MAX_BLOCK_AGE, block_ttl: float = BLOCK_TTL):
+        self.max_block_age = max_block_age
+        self.block_ttl = block_ttl
+
+        self._factory: str | None = None
+        self._pools: dict[tuple[str, str, int], str] = {}
+        self._states: dict[str, PoolState] = {}
+        self._inflight = SingleFlight()
+        self._block = 0
+        self._block_checked_at = 0.0
+
+    async def _latest_block(self, web3) -> int:
+        if time.monotonic() - self._block_checked_at > self.block_ttl:
+            self._block = await web3.eth.block_number
+            self._block_checked_at = time.monotonic()
+        return self._block
+
+    async def _pool_address(self, web3, token0: str, token1: str, fee: int) -> str:
+        key = (token0, token1, fee)
+        if key not in self._pools:
+            if self._factory is None:
+                router = web3.eth.contract(
+                    address=Web3.to_checksum_address(ROUTER_ADDRESS),
+                    abi=ROUTER_FACTORY_ABI,
+                )
+                self._factory = await router.functions.factory().call()
+            factory = web3.eth.contract(address=self._factory, abi=FACTORY_ABI)
+            self._pools[key] = await factory.functions.getPool(token0, token1, fee).call()
+        return self._pools[key]
+
+    async def _read_state(self, web3, pool_address: str, fee: int, block: int) -> PoolState:
+        pool = web3.eth.contract(address=pool_address, abi=POOL_ABI)
+        slot0, liquidity = await asyncio.gather(
+            pool.functions.slot0().call(block_identifier=block),
+            pool.functions.liquidity().call(block_identifier=block),
+        )
+        return PoolState(
+            fee=fee,
+            sqrt_price_x96=slot0[0],
+            liquidity=liquidity,
+            tick=slot0[1],
+            block=block,
+        )
+
+    async def get_state(self, web3, token_a: str, token_b: str, fee: int) -> PoolState | None:
+        """Pool state for the pair and fee tier, None if the pool doesn't exist"""
+        token0, token1 = sort_tokens(token_a, token_b)
+        pool_address = await self._pool_address(web3, token0, token1, fee)
+        if int(pool_address, 16) == 0:
+            return None
+
+        block = await self._latest_block(web3)
+        state = self._states.get(pool_address)
+        if state is not None and block - state.block <= self.max_block_age:
+            return state
+
+        async def fetch() -> PoolState:
+            state = await self._read_state(web3, pool_address, fee, block)
+            self._states[pool_address] = state
+            return state
+
+        return await self._inflight.run(pool_address, fetch)
+
+    async def best_fee_tiers(
+        self, web3, token_in: str, token_out: str, amount_in: int
+    ) -> list[int]:
+        """
+        Fee tiers with an existing pool ordered by expected output, best first.
+        Falls back to FEE_TIERS if the pools can't be read.
+        """
+        try:
+            states = await asyncio.gather(
+                *[self.get_state(web3, token_in, token_out, fee) for fee in FEE_TIERS]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to read Quickswap pools, trying all fee tiers: {e}")
+            return list(FEE_TIERS)
+
+        token0, _ = sort_tokens(token_in, token_out)
+        zero_for_one = token_in == token0
+        quotes = [
+            (quote_exact_input(state, amount_in, zero_for_one), state.fee)
+            for state in states
+            if state is not None
+        ]
+        return [fee for amount_out, fee in sorted(quotes, reverse=True) if amount_out > 0]
+
+
+pool_states = PoolStateCache()
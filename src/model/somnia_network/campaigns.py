@@ -1,6 +1,8 @@
 import random
 import asyncio
 import secrets
+import time
+from typing import Awaitable, Callable
 from loguru import logger
 
 from src.model.help.discord import DiscordInviter
@@ -8,6 +10,8 @@ from src.model.help.twitter import Twitter
 from src.model.somnia_network.constants import SomniaProtocol
 from src.model.somnia_network.connect_socials import ConnectSocials
 from src.utils.decorators import retry_async
+from src.utils.circuit_breaker import error_pause
+from src.utils.scheduling import planned_pause
 
 
 SKIP_CAMPAIGNS_IDS = [
@@ -17,6 +21,58 @@ SKIP_CAMPAIGNS_IDS = [
     12,
 ]
 
+# Список кампаний и их квесты обновляются не чаще, чем раз в CATALOGUE_TTL секунд
+CATALOGUE_TTL = 600
+
+
+class CampaignCatalogue:
+    """
+    Campaign list and campaign definitions of quest.somnia.network shared
+    by all accounts of the process. They are the same for every wallet, so
+    each key is fetched once per CATALOGUE_TTL with the token of whichever
+    account asks first; concurrent requests for a key wait for that fetch.
+
+    Quests in a cached definition carry the isParticipated flag of the
+    account that fetched it, it must not be used for other accounts.
+    """
+
+    def __init__(self, ttl: float = CATALOGUE_TTL):
+        self.ttl = ttl
+        self._entries: dict[object, tuple[float, object]] = {}
+        self._inflight: dict[object, asyncio.Future] = {}
+
+    async def get(self, key, fetch: Callable[[], Awaitable[object]]):
+        """Cached value of the key, fetch() on a miss. None results are not cached"""
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+            if value is not None:
+                self._entries[key] = (time.monotonic(), value)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Don't leave "exception was never retrieved" if nobody waited
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+
+campaign_catalogue = CampaignCatalogue()
+
 
 class Campaigns:
     def __init__(self, somnia_instance: SomniaProtocol):
@@ -30,7 +86,36 @@ class Campaigns:
                 f"{self.somnia.account_index} | Starting campaigns completion..."
             )
 
-            campaigns = await self._get_all_campaigns()
+            campaigns = await campaign_catalogue.get("campaigns", self._get_all_campaigns)
+            if campaigns is None:
+                raise Exception("Failed to get campaigns")
+
+            # Пропущенные кампании отбрасываются до любых запросов по ним
+            campaign_ids = [
+                campaign["id"]
+                for campaign in campaigns
+                if campaign["id"] not in SKIP_CAMPAIGNS_IDS
+            ]
+
+            # Кампании с открытыми квестами - по общим описаниям, без запросов аккаунта
+            open_campaigns = []
+            own_info = {}
+            for campaign_id in campaign_ids:
+                definition = await campaign_catalogue.get(
+                    ("campaign", campaign_id),
+                    lambda campaign_id=campaign_id: self._fetch_own_info(campaign_id, own_info),
+                )
+                if definition is None:
+                    logger.error(
+                        f"{self.somnia.account_index} | Failed to get campaign {campaign_id}. Skipping."
+                    )
+                    continue
+                if any(quest["status"] == "OPEN" for quest in definition["quests"]):
+                    open_campaigns.append(campaign_id)
+
+            if not open_campaigns:
+                logger.info(f"{self.somnia.account_index} | No open campaigns to complete")
+                return True
 
             while True:
                 # TWITTER INSTANCE
@@ -55,12 +140,17 @@ class Campaigns:
                         continue
                 break
 
-            for campaign in campaigns:
-                if campaign["id"] in SKIP_CAMPAIGNS_IDS:
+            for campaign_id in open_campaigns:
+                # isParticipated зависит от аккаунта - запрашиваем его версию кампании
+                campaign_info = own_info.get(campaign_id) or await self._get_campaign_info(
+                    campaign_id
+                )
+                if campaign_info is None:
+                    logger.error(
+                        f"{self.somnia.account_index} | Failed to get campaign {campaign_id}. Skipping."
+                    )
                     continue
 
-                campaign_info = await self._get_campaign_info(campaign["id"])
-
                 logger.info(
                     f"{self.somnia.account_index} | Completing campaign {campaign_info['name']}..."
                 )
@@ -175,14 +265,14 @@ class Campaigns:
                 logger.error(
                     f"{self.somnia.account_index} | Twitter error. Try again later."
                 )
-                await asyncio.sleep(random_pause)
+                await error_pause(random_pause)
                 return False
 
             logger.error(
                 f"{self.somnia.account_index} | Complete quest error: {e}. Sleeping {random_pause} seconds..."
             )
 
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     @retry_async(default_value=False)
@@ -195,7 +285,7 @@ class Campaigns:
             logger.info(
                 f"{self.somnia.account_index} | Waiting for {random_pause} seconds before verifying quest completion..."
             )
-            await asyncio.sleep(random_pause)
+            await planned_pause(random_pause, "pause between actions")
 
             headers = {
                 "accept": "*/*",
@@ -246,9 +336,16 @@ class Campaigns:
             logger.error(
                 f"{self.somnia.account_index} | Verify quest completion error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise e
 
+    async def _fetch_own_info(self, campaign_id: int, own_info: dict):
+        """Catalogue fetch that also keeps the result as this account's own info"""
+        campaign_info = await self._get_campaign_info(campaign_id)
+        if campaign_info is not None:
+            own_info[campaign_id] = campaign_info
+        return campaign_info
+
     @retry_async(default_value=None)
     async def _get_campaign_info(self, campaign_id: int):
         try:
@@ -286,7 +383,7 @@ class Campaigns:
             logger.error(
                 f"{self.somnia.account_index} | Get campaign info error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     @retry_async(default_value=None)
@@ -325,7 +422,7 @@ class Campaigns:
             logger.error(
                 f"{self.somnia.account_index} | Get all campaigns error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     
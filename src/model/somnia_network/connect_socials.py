@@ -5,9 +5,12 @@ from loguru import logger
 
 from src.model.somnia_network.constants import SomniaProtocol
 from src.utils.decorators import retry_async
+from src.utils.circuit_breaker import error_pause
 
 
 class ConnectSocials:
+    __slots__ = ("somnia",)
+
     def __init__(self, somnia_instance: SomniaProtocol):
         self.somnia = somnia_instance
 
@@ -64,7 +67,7 @@ class ConnectSocials:
             logger.error(
                 f"{self.somnia.account_index} | Connect socials error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             return False
 
     @retry_async(default_value=False)
@@ -162,7 +165,7 @@ class ConnectSocials:
             logger.error(
                 f"{self.somnia.account_index} | Connect twitter error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     @retry_async(default_value=False)
@@ -294,5 +297,5 @@ class ConnectSocials:
             logger.error(
                 f"{self.somnia.account_index} | Connect discord error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
@@ -7,12 +7,16 @@ from src.model.onchain.web3_custom import Web3Custom
 import primp
 
 from src.utils.decorators import retry_async
+from src.utils.circuit_breaker import error_pause
+from src.utils.scheduling import planned_pause
 from src.utils.config import Config
 from src.model.somnia_network.constants import SomniaProtocol
 from src.utils.constants import EXPLORER_URL_SOMNIA
 
 
 class FaucetService:
+    __slots__ = ("somnia",)
+
     def __init__(self, somnia_instance: SomniaProtocol):
         self.somnia = somnia_instance
 
@@ -32,6 +36,11 @@ class FaucetService:
                 "address": self.somnia.wallet.address,
             }
 
+            # Баланс до запроса - чтобы дождаться прихода STT от крана
+            initial_balance = await self.somnia.web3.get_balance(
+                self.somnia.wallet.address
+            )
+
             response = await self.somnia.session.post(
                 "https://testnet.somnia.network/api/faucet",
                 headers=headers,
@@ -51,6 +60,11 @@ class FaucetService:
                 logger.success(
                     f"{self.somnia.account_index} | Successfully requested faucet"
                 )
+                # Следующим задачам нужны эти STT; кран отправляет их не сразу
+                if initial_balance is not None:
+                    await self.somnia.web3.wait_for_balance_increase(
+                        self.somnia.wallet.address, initial_balance
+                    )
                 return True
             elif "Please wait 24 hours between requests" in response.text:
                 logger.success(
@@ -70,7 +84,7 @@ class FaucetService:
             logger.error(
                 f"{self.somnia.account_index} | Faucet error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             return False
 
     async def request_ping_pong_faucet(self):
@@ -92,7 +106,7 @@ class FaucetService:
                 self.somnia.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
                 self.somnia.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
             )
-            await asyncio.sleep(random_pause)
+            await planned_pause(random_pause, "pause between actions")
 
             # Then mint PONG token
             pong_address = "0x9beaa0016c22b646ac311ab171270b0ecf23098f"
@@ -113,7 +127,7 @@ class FaucetService:
             logger.error(
                 f"{self.somnia.account_index} | PING/PONG Faucet error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             return False
 
     @retry_async(default_value=False)
@@ -12,15 +12,30 @@ from src.model.somnia_network.send_random_tokens import RandomTokenSender
 from src.model.somnia_network.connect_socials import ConnectSocials
 from src.model.onchain.web3_custom import Web3Custom
 from src.utils.decorators import retry_async
+from src.utils.circuit_breaker import error_pause
 from src.utils.config import Config
+from src.utils.client import build_client
 from src.model.somnia_network.faucet import FaucetService
 
 
 class Somnia:
+    __slots__ = (
+        "account_index",
+        "_session",
+        "web3",
+        "config",
+        "wallet",
+        "discord_token",
+        "twitter_token",
+        "proxy",
+        "somnia_login_token",
+        "_services",
+    )
+
     def __init__(
         self,
         account_index: int,
-        session: primp.AsyncClient,
+        session: primp.AsyncClient | None,
         web3: Web3Custom,
         config: Config,
         wallet: Account,
@@ -29,15 +44,37 @@ class Somnia:
         proxy: str,
     ):
         self.account_index = account_index
-        self.session = session
+        # Создается при первом запросе к API, ончейн задачам сессия не нужна
+        self._session = session
         self.web3 = web3
         self.config = config
         self.wallet = wallet
         self.discord_token = discord_token
         self.twitter_token = twitter_token
         self.proxy = proxy
-        # Инициализируем сервисы
         self.somnia_login_token: str = ""
+        # Сервисы создаются один раз на аккаунт
+        self._services: dict[type, object] = {}
+
+    @property
+    def session(self) -> primp.AsyncClient:
+        if self._session is None:
+            self._session = build_client(
+                self.proxy, self.config.OTHERS.SKIP_SSL_VERIFICATION
+            )
+        return self._session
+
+    def _service(self, service_class):
+        service = self._services.get(service_class)
+        if service is None:
+            service = self._services[service_class] = service_class(self)
+        return service
+
+    async def ensure_logged_in(self) -> bool:
+        """Login to the quest API once, only tasks that use it call this"""
+        if self.somnia_login_token:
+            return True
+        return await self.login()
 
     @retry_async(default_value=False)
     async def login(self) -> bool:
@@ -79,7 +116,7 @@ class Somnia:
             logger.error(
                 f"{self.account_index} | Login error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     @retry_async(default_value=None)
@@ -130,7 +167,7 @@ class Somnia:
             logger.error(
                 f"{self.account_index} | Get account info error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     @retry_async(default_value=None)
@@ -176,7 +213,7 @@ class Somnia:
             logger.error(
                 f"{self.account_index} | Get account info error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     @retry_async(default_value=None)
@@ -225,7 +262,7 @@ class Somnia:
             logger.error(
                 f"{self.account_index} | Get account info error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
     @retry_async(default_value=False)
@@ -297,29 +334,24 @@ class Somnia:
             logger.error(
                 f"{self.account_index} | Set username error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             return False
 
     # Удобный метод-прокси для faucet, если нужен
     async def request_faucet(self):
-        self.faucet_service = FaucetService(self)
-        return await self.faucet_service.request_faucet()
+        return await self._service(FaucetService).request_faucet()
 
     async def mint_ping_pong(self):
-        self.faucet_service = FaucetService(self)
-        return await self.faucet_service.request_ping_pong_faucet()
+        return await self._service(FaucetService).request_ping_pong_faucet()
 
     async def swaps_ping_pong(self):
-        self.ping_pong_swaps_service = PingPongSwaps(self)
-        return await self.ping_pong_swaps_service.swaps()
+        return await self._service(PingPongSwaps).swaps()
 
     async def connect_socials(self):
-        self.connect_socials_service = ConnectSocials(self)
-        return await self.connect_socials_service.connect_socials()
+        return await self._service(ConnectSocials).connect_socials()
 
     async def send_tokens_task(self):
-        self.send_tokens_service = RandomTokenSender(self)
-        return await self.send_tokens_service.send_tokens()
+        return await self._service(RandomTokenSender).send_tokens()
 
     async def show_account_info(self):
         try:
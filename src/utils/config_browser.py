@@ -55,11 +55,27 @@ def load_config():
         return {}
 
 
+def merge_config(current, changes):
+    """
+    Значения из формы поверх загруженного конфига: секции и ключи, которых
+    нет в форме (METRICS, TRACING, STATS, ...), остаются как были
+    """
+    if not isinstance(current, dict) or not isinstance(changes, dict):
+        return changes
+    merged = dict(current)
+    for key, value in changes.items():
+        merged[key] = merge_config(current.get(key), value)
+    return merged
+
+
 def save_config(config):
     """Сохранение конфигурации в YAML файл"""
     try:
-        with open(CONFIG_PATH, "w") as file:
+        # Запись через временный файл: HOT_RELOAD не прочитает файл наполовину
+        temp_path = CONFIG_PATH + ".tmp"
+        with open(temp_path, "w") as file:
             yaml.dump(config, file, default_flow_style=False, sort_keys=False)
+        os.replace(temp_path, CONFIG_PATH)
     except Exception as e:
         logger.error(f"Error saving config: {str(e)}")
         logger.error(traceback.format_exc())
@@ -98,7 +114,7 @@ def update_config():
     try:
         new_config = request.get_json()
         logger.info(f"Saving new configuration: {json.dumps(new_config, indent=2)}")
-        save_config(new_config)
+        save_config(merge_config(load_config(), new_config))
         return jsonify({"status": "success"})
     except Exception as e:
         logger.error(f"Error saving config: {str(e)}")
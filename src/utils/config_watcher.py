@@ -0,0 +1,81 @@
+import asyncio
+import os
+
+from loguru import logger
+
+from src.utils.config import Config
+
+
+# Настройки, которые можно менять во время работы
+RELOADABLE_SETTINGS = (
+    "THREADS",
+    "PAUSE_BETWEEN_ATTEMPTS",
+    "PAUSE_BETWEEN_SWAPS",
+    "RANDOM_PAUSE_BETWEEN_ACCOUNTS",
+    "RANDOM_PAUSE_BETWEEN_ACTIONS",
+    "RANDOM_INITIALIZATION_PAUSE",
+)
+
+
+class ConfigWatcher:
+    """
+    Polls the config file and copies pause and concurrency settings of a
+    changed, valid file into the running config. Everything else needs a
+    restart; a file that fails to load or validate is ignored.
+    """
+
+    def __init__(self, config: Config, interval: float = 5):
+        self.config = config
+        self.interval = interval
+        self._mtime = self._stat()
+        self._task: asyncio.Task | None = None
+
+    def _stat(self) -> float | None:
+        try:
+            return os.stat(self.config.path).st_mtime
+        except OSError:
+            return None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            mtime = self._stat()
+            if mtime is not None and mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+
+    def reload(self) -> None:
+        try:
+            loaded = Config.load(self.config.path)
+        except Exception as e:
+            logger.warning(f"Config change ignored: {e}")
+            return
+
+        settings = self.config.SETTINGS
+        for name in RELOADABLE_SETTINGS:
+            value = getattr(loaded.SETTINGS, name)
+            if getattr(settings, name) != value:
+                logger.info(f"Config reloaded: SETTINGS.{name} = {value}")
+                setattr(settings, name, value)
+
+
+async def start_config_watcher(config: Config) -> ConfigWatcher | None:
+    if not config.HOT_RELOAD.ENABLED:
+        return None
+    if config.SETTINGS.SHARDS > 1:
+        # Процессы шардов получают копию конфига при запуске
+        logger.warning("HOT_RELOAD is not applied to shard processes, restart to change settings")
+        return None
+    watcher = ConfigWatcher(config, config.HOT_RELOAD.INTERVAL)
+    watcher.start()
+    logger.info(f"Watching {config.path} for pause and THREADS changes")
+    return watcher
@@ -1,8 +1,13 @@
 from functools import wraps
 import asyncio
+import random
+import time
 from typing import TypeVar, Callable, Any, Optional
 from loguru import logger
 from src.utils.config import get_config
+from src.utils.metrics import current_task, metrics
+from src.utils.tracing import current_account, tracer
+from src.utils.circuit_breaker import CircuitOpenError, task_is_parked
 
 T = TypeVar("T")
 
@@ -21,6 +26,86 @@ T = TypeVar("T")
 # async def some_function():
 #     ...
 
+# Ошибки, которые не исправятся повтором: реверт, нехватка средств, дубликат транзакции
+FATAL_ERRORS = (
+    "execution reverted",
+    "transaction reverted",
+    "insufficient funds",
+    "insufficient balance",
+    "already known",
+)
+# Сервер просит притормозить или не успел ответить - ждем дольше обычного
+THROTTLE_ERRORS = (
+    "429",
+    "too many requests",
+    "rate limit",
+    "timeout",
+    "timed out",
+)
+MAX_DELAY = 60.0
+
+
+def classify_error(error: Exception) -> str:
+    """
+    Returns "fatal" (don't retry), "throttled" (retry with longer backoff)
+    or "retryable".
+    """
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return "throttled"
+
+    message = str(error).lower()
+    if any(pattern in message for pattern in FATAL_ERRORS):
+        return "fatal"
+    if any(pattern in message for pattern in THROTTLE_ERRORS):
+        return "throttled"
+    return "retryable"
+
+
+class RetryBudget:
+    """
+    Caps retries so an outage doesn't multiply load:
+    ACCOUNT_BUDGET retries per account for the whole run and a global token
+    bucket of GLOBAL_BUDGET_PER_MINUTE retries per process. 0 disables a limit.
+    """
+
+    def __init__(self, account_budget: int, global_per_minute: int):
+        self.account_budget = account_budget
+        self.global_per_minute = global_per_minute
+        self.used: dict[int, int] = {}
+        self._tokens = float(global_per_minute)
+        self._updated_at = time.monotonic()
+
+    def try_acquire(self, account_index: int) -> str | None:
+        """Takes one retry from the budgets, returns the exhausted budget name otherwise"""
+        if self.account_budget and self.used.get(account_index, 0) >= self.account_budget:
+            return "account"
+
+        if self.global_per_minute:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.global_per_minute),
+                self._tokens + (now - self._updated_at) * self.global_per_minute / 60,
+            )
+            self._updated_at = now
+            if self._tokens < 1:
+                return "global"
+            self._tokens -= 1
+
+        self.used[account_index] = self.used.get(account_index, 0) + 1
+        return None
+
+
+_budget: RetryBudget | None = None
+
+
+def get_retry_budget() -> RetryBudget:
+    global _budget
+    if _budget is None:
+        retries = get_config().RETRIES
+        _budget = RetryBudget(retries.ACCOUNT_BUDGET, retries.GLOBAL_BUDGET_PER_MINUTE)
+    return _budget
+
+
 def retry_async(
     attempts: int = None,  # Make attempts optional
     delay: float = 1.0,
@@ -28,8 +113,13 @@ def retry_async(
     default_value: Any = None,
 ):
     """
-    Async retry decorator with exponential backoff.
+    Async retry decorator with exponential backoff and jitter.
     If attempts is not provided, uses SETTINGS.ATTEMPTS from config.
+
+    Reverts, insufficient funds and "already known" are raised right away,
+    429/timeouts back off twice as fast. Errors that a nested retry_async
+    already retried are not retried again, and every retry is taken from
+    the per-account and global budgets (RETRIES in config).
     """
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
@@ -42,18 +132,62 @@ def retry_async(
                 try:
                     return await func(*args, **kwargs)
                 except Exception as e:
-                    if attempt < retry_attempts - 1:  # Don't sleep on the last attempt
+                    kind = classify_error(e)
+                    task = current_task.get()
+
+                    skip_reason = None
+                    if kind == "fatal":
+                        skip_reason = "fatal"
+                    elif isinstance(e, CircuitOpenError) or task_is_parked():
+                        # Эндпоинт закрыт для всех аккаунтов, задачу паркует Start.flow
+                        skip_reason = "circuit_open"
+                    elif getattr(e, "_retries_exhausted", False):
+                        # Вложенный retry_async уже повторял эту ошибку
+                        skip_reason = "exhausted"
+                    elif attempt < retry_attempts - 1:
+                        exhausted_budget = get_retry_budget().try_acquire(
+                            current_account.get()
+                        )
+                        if exhausted_budget:
+                            skip_reason = f"{exhausted_budget}_budget"
+
+                    if attempt < retry_attempts - 1 and skip_reason is None:
+                        metrics.inc(
+                            "retries_total",
+                            function=func.__name__,
+                            task=task,
+                            reason=kind,
+                        )
+                        pause = min(current_delay, MAX_DELAY) * random.uniform(0.5, 1.5)
                         logger.warning(
                             f"Attempt {attempt + 1}/{retry_attempts} failed for {func.__name__}: {str(e)}. "
-                            f"Retrying in {current_delay:.1f} seconds..."
+                            f"Retrying in {pause:.1f} seconds..."
                         )
-                        await asyncio.sleep(current_delay)
-                        current_delay *= backoff
-                    else:
-                        logger.error(
-                            f"All {retry_attempts} attempts failed for {func.__name__}: {str(e)}"
+                        await tracer.sleep(pause, f"retry {func.__name__}")
+                        current_delay *= backoff * 2 if kind == "throttled" else backoff
+                        continue
+
+                    if skip_reason:
+                        metrics.inc(
+                            "retries_skipped_total",
+                            function=func.__name__,
+                            task=task,
+                            reason=skip_reason,
                         )
-                        raise e  # Re-raise the last exception
+                    if skip_reason == "exhausted":
+                        raise
+
+                    logger.error(
+                        f"All {attempt + 1}/{retry_attempts} attempts failed for {func.__name__}"
+                        + (f" ({skip_reason}, not retried)" if skip_reason else "")
+                        + f": {str(e)}"
+                    )
+                    if retry_attempts > 1:
+                        try:
+                            e._retries_exhausted = True
+                        except AttributeError:
+                            pass
+                    raise e  # Re-raise the last exception
 
             return default_value
 
@@ -0,0 +1,133 @@
+import os
+import queue
+import sys
+import threading
+
+
+DROP_POLICIES = ("block", "drop_new", "drop_oldest")
+
+
+class CurrentStream:
+    """
+    Writes to whatever sys.stdout/sys.stderr is at the moment of writing,
+    so a rich Live dashboard that redirects them can print logs above itself.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def write(self, message: str) -> None:
+        getattr(sys, self.name).write(message)
+
+    def flush(self) -> None:
+        getattr(sys, self.name).flush()
+
+
+class RotatingFileWriter:
+    """Minimal size-based rotating file, written only from the log writer thread"""
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._size = 0
+
+    def write(self, message: str) -> None:
+        data_size = len(message.encode("utf-8"))
+        if self._size and self._size + data_size > self.max_bytes:
+            self._rotate()
+        self._file.write(message)
+        self._size += data_size
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class QueuedSink:
+    """
+    Loguru stream sink that hands formatted messages to a dedicated writer
+    thread through a bounded queue, so slow terminals or disks never block
+    the event loop.
+
+    drop_policy:
+        block - wait for free space (bounded memory, backpressure on callers)
+        drop_new - discard the incoming message when the queue is full
+        drop_oldest - discard the oldest queued message to make room
+    """
+
+    def __init__(self, target, max_size: int = 10000, drop_policy: str = "drop_oldest"):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(
+                f"Unknown drop policy {drop_policy!r}, expected one of {DROP_POLICIES}"
+            )
+
+        self.target = target
+        self.drop_policy = drop_policy
+        self.dropped = 0
+        self._reported_dropped = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._thread = threading.Thread(
+            target=self._writer, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        if self.drop_policy == "block":
+            self._queue.put(message)
+            return
+
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return
+            except queue.Full:
+                self.dropped += 1
+                if self.drop_policy == "drop_new":
+                    return
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def _writer(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is None:
+                break
+
+            if self.dropped != self._reported_dropped:
+                lost = self.dropped - self._reported_dropped
+                self._reported_dropped = self.dropped
+                self.target.write(f"[log-writer] {lost} log messages dropped\n")
+
+            self.target.write(message)
+            if self._queue.empty():
+                self.target.flush()
+
+        self.target.flush()
+
+    def stop(self) -> None:
+        """Called by loguru on logger.remove(): drain the queue and stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=10)
+        if isinstance(self.target, RotatingFileWriter):
+            self.target.close()
@@ -1,59 +1,243 @@
-import os
-from typing import Dict, Any, Optional
-from asyncio import Lock
-from tqdm import tqdm
-from dataclasses import dataclass
+import sys
+import time
+from collections import deque
+from typing import Optional
 import asyncio
 import random
 from loguru import logger
 
+from src.utils.metrics import metrics
+
+
+# Окно для расчета скорости и ETA, секунды
+RATE_WINDOW = 300
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes:02d}m"
+    if minutes:
+        return f"{minutes}m {seconds:02d}s"
+    return f"{seconds}s"
+
 
-@dataclass
 class ProgressTracker:
-    total: int
-    current: int = 0
-    description: str = "Progress"
-    _lock: Lock = Lock()
-    bar_length: int = 30  # Длина прогресс-бара в символах
+    """
+    Counts finished accounts and renders progress at a fixed refresh rate
+    instead of on every account: a live rich dashboard in a terminal, a
+    compact log line every `refresh_interval` seconds otherwise.
+
+    All updates happen on the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        total: int,
+        description: str = "Progress",
+        refresh_interval: float = 10,
+        dashboard: bool = False,
+        bar_length: int = 30,  # Длина прогресс-бара в символах
+    ):
+        self.total = total
+        self.description = description
+        self.refresh_interval = refresh_interval
+        self.dashboard = dashboard
+        self.bar_length = bar_length
+
+        self.current = 0
+        self.succeeded = 0
+        self.failed = 0
+        # Tasks finished in other processes (shards), local ones come from metrics
+        self.external_tasks = 0
+
+        self.started_at = time.monotonic()
+        self._tasks_baseline = metrics.total("tasks_total")
+        self._samples: deque[tuple[float, int, int]] = deque()
+        self._sample()
+
+        self._live = None
+        self._renderer: asyncio.Task | None = None
+        self._finished = asyncio.Event()
+
+    # ------------------------------------------------------------------ state
+
+    @property
+    def tasks_done(self) -> int:
+        return int(metrics.total("tasks_total") - self._tasks_baseline) + self.external_tasks
+
+    def _sample(self) -> None:
+        now = time.monotonic()
+        self._samples.append((now, self.current, self.tasks_done))
+        while len(self._samples) > 2 and now - self._samples[0][0] > RATE_WINDOW:
+            self._samples.popleft()
+
+    def rates(self) -> tuple[float, float]:
+        """Accounts and tasks per minute over the last RATE_WINDOW seconds"""
+        now = time.monotonic()
+        since, accounts, tasks = self._samples[0]
+        elapsed = now - since
+        if elapsed <= 0:
+            return 0.0, 0.0
+        return (
+            (self.current - accounts) * 60 / elapsed,
+            (self.tasks_done - tasks) * 60 / elapsed,
+        )
 
-    def __post_init__(self):
-        pass
+    def eta(self) -> float | None:
+        accounts_per_minute, _ = self.rates()
+        if not accounts_per_minute:
+            return None
+        return (self.total - self.current) * 60 / accounts_per_minute
+
+    async def increment(
+        self, amount: int = 1, message: Optional[str] = None, ok: bool | None = None
+    ):
+        self.current += amount
+        if ok is True:
+            self.succeeded += amount
+        elif ok is False:
+            self.failed += amount
+
+        if self.current >= self.total:
+            await self.stop()
+
+    async def set_total(self, total: int):
+        self.total = total
+
+    # -------------------------------------------------------------- rendering
 
     def _create_progress_bar(self, percentage: float) -> str:
         filled_length = int(self.bar_length * percentage / 100)
         bar = "█" * filled_length + "░" * (self.bar_length - filled_length)
         return bar
 
-    async def increment(self, amount: int = 1, message: Optional[str] = None):
-        async with self._lock:
-            self.current += amount
-            percentage = (self.current / self.total) * 100
-            bar = self._create_progress_bar(percentage)
+    def _percentage(self) -> float:
+        return (self.current / self.total) * 100 if self.total else 100.0
 
-            # Добавляем эмодзи в зависимости от прогресса
-            emoji = "⏳"
-            if percentage >= 100:
-                emoji = "✅"
-            elif percentage >= 50:
-                emoji = "🔄"
+    def _summary(self) -> str:
+        accounts_per_minute, tasks_per_minute = self.rates()
+        finished = self.succeeded + self.failed
+        success_rate = f"{self.succeeded / finished * 100:.1f}%" if finished else "-"
+        eta = self.eta()
+        return (
+            f"ok {self.succeeded} | failed {self.failed} | success {success_rate} | "
+            f"{accounts_per_minute:.1f} acc/min | {tasks_per_minute:.1f} tasks/min | "
+            f"ETA {_format_duration(eta) if eta is not None else '-'} | "
+            f"elapsed {_format_duration(time.monotonic() - self.started_at)}"
+        )
 
-            progress_msg = f"{emoji} [{self.description}] [{bar}] {self.current}/{self.total} ({percentage:.1f}%)"
-            # if message:
-            #     progress_msg += f"\n    ├─ {message}"
-            logger.info(progress_msg)
+    def render_line(self) -> str:
+        percentage = self._percentage()
+        # Добавляем эмодзи в зависимости от прогресса
+        emoji = "⏳"
+        if percentage >= 100:
+            emoji = "✅"
+        elif percentage >= 50:
+            emoji = "🔄"
+        return (
+            f"{emoji} [{self.description}] [{self._create_progress_bar(percentage)}] "
+            f"{self.current}/{self.total} ({percentage:.1f}%) | {self._summary()}"
+        )
 
-    async def set_total(self, total: int):
-        async with self._lock:
-            self.total = total
+    def _render_dashboard(self):
+        from rich.panel import Panel
+        from rich.progress_bar import ProgressBar
+        from rich.table import Table
+
+        accounts_per_minute, tasks_per_minute = self.rates()
+        finished = self.succeeded + self.failed
+        eta = self.eta()
 
-    def __del__(self):
-        pass  # Убираем закрытие tqdm
+        table = Table.grid(padding=(0, 2))
+        table.add_column(style="bold cyan")
+        table.add_column()
+        table.add_row(
+            "Accounts",
+            f"{self.current}/{self.total} ({self._percentage():.1f}%)",
+        )
+        table.add_row(
+            "",
+            ProgressBar(total=max(self.total, 1), completed=self.current, width=40),
+        )
+        table.add_row(
+            "Result",
+            f"[green]{self.succeeded} ok[/green]  [red]{self.failed} failed[/red]  "
+            + (f"({self.succeeded / finished * 100:.1f}% success)" if finished else ""),
+        )
+        table.add_row(
+            "Speed",
+            f"{accounts_per_minute:.1f} accounts/min  {tasks_per_minute:.1f} tasks/min",
+        )
+        table.add_row(
+            "Time",
+            f"elapsed {_format_duration(time.monotonic() - self.started_at)}  "
+            f"ETA {_format_duration(eta) if eta is not None else '-'}",
+        )
+        return Panel(table, title=self.description, expand=False)
+
+    def _render(self) -> None:
+        self._sample()
+        if self._live is not None:
+            self._live.update(self._render_dashboard(), refresh=True)
+        else:
+            logger.info(self.render_line())
+
+    async def _render_loop(self) -> None:
+        while not self._finished.is_set():
+            try:
+                await asyncio.wait_for(self._finished.wait(), self.refresh_interval)
+            except asyncio.TimeoutError:
+                self._render()
+
+    def start(self) -> None:
+        if self.dashboard:
+            from rich.live import Live
+
+            # Логи печатаются над панелью, main.configuration пишет в текущий sys.stdout
+            self._live = Live(
+                self._render_dashboard(),
+                auto_refresh=False,
+                redirect_stdout=True,
+                redirect_stderr=True,
+            )
+            self._live.start()
+        self._renderer = asyncio.create_task(self._render_loop())
+
+    async def stop(self) -> None:
+        """Render the final state and stop refreshing"""
+        if self._finished.is_set():
+            return
+        self._finished.set()
+        self._render()
+        if self._live is not None:
+            self._live.stop()
+            self._live = None
+            logger.info(self.render_line())
 
 
 async def create_progress_tracker(
     total: int, description: str = "Progress"
 ) -> ProgressTracker:
-    return ProgressTracker(total=total, description=description)
+    from src.utils.config import get_config
+
+    try:
+        progress_config = get_config().PROGRESS
+        refresh_interval = progress_config.REFRESH_SECONDS
+        dashboard = progress_config.DASHBOARD and sys.stdout.isatty()
+    except Exception:
+        refresh_interval, dashboard = 10, False
+
+    tracker = ProgressTracker(
+        total=total,
+        description=description,
+        refresh_interval=refresh_interval,
+        dashboard=dashboard,
+    )
+    tracker.start()
+    return tracker
 
 
 async def process_item(tracker: ProgressTracker, item_id: int):
@@ -0,0 +1,180 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+
+from loguru import logger
+
+from src.utils.metrics import metrics
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@dataclass
+class Offender:
+    location: str
+    stack: str
+    count: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+def _blocking_location(frame) -> tuple[str, str]:
+    """
+    Returns the innermost project frame of the blocked loop thread as
+    "file:line in function" plus a short stack for the report.
+    """
+    stack = traceback.extract_stack(frame)
+    own = [
+        entry
+        for entry in stack
+        if entry.filename.startswith(PROJECT_ROOT)
+        and "site-packages" not in entry.filename
+        and entry.filename != __file__
+    ]
+    entry = own[-1] if own else stack[-1]
+    location = (
+        f"{os.path.relpath(entry.filename, PROJECT_ROOT)}:{entry.lineno} in {entry.name}"
+    )
+    return location, "".join(traceback.format_list(stack[-6:]))
+
+
+class LoopMonitor:
+    """
+    Measures event loop lag and finds code that blocks the loop.
+
+    A sampler coroutine sleeps for `interval` and records how late it wakes up
+    (event_loop_lag_seconds histogram). A watchdog thread notices when the
+    sampler is late by more than `threshold` and captures the stack of the
+    loop thread while it is still blocked, so the report points to the
+    blocking call itself rather than to the callback that scheduled it.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.5,
+        threshold: float = 0.1,
+        asyncio_debug: bool = False,
+        top: int = 10,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self.asyncio_debug = asyncio_debug
+        self.top = top
+
+        self.max_lag = 0.0
+        self.offenders: dict[str, Offender] = {}
+
+        self._loop_thread_id: int | None = None
+        self._last_tick = 0.0
+        self._captured_tick = 0.0
+        self._pending: Offender | None = None
+        self._stopped = threading.Event()
+        self._sampler: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        # asyncio logs "Executing <Handle> took X seconds" above this duration in debug mode
+        loop.slow_callback_duration = self.threshold
+        if self.asyncio_debug:
+            loop.set_debug(True)
+
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.perf_counter()
+        self._sampler = asyncio.create_task(self._sample())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._sampler:
+            self._sampler.cancel()
+            try:
+                await self._sampler
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog:
+            self._watchdog.join(timeout=5)
+        self.report()
+
+    async def _sample(self) -> None:
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(0.0, now - started_at - self.interval)
+
+            metrics.observe("event_loop_lag_seconds", lag)
+            self.max_lag = max(self.max_lag, lag)
+
+            offender = self._pending
+            if offender is not None:
+                self._pending = None
+                offender.count += 1
+                offender.total_seconds += lag
+                offender.max_seconds = max(offender.max_seconds, lag)
+
+            self._last_tick = now
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            last_tick = self._last_tick
+            if last_tick == self._captured_tick:
+                continue
+            if time.perf_counter() - last_tick < self.interval + self.threshold:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._captured_tick = last_tick
+
+            location, stack = _blocking_location(frame)
+            offender = self.offenders.get(location)
+            if offender is None:
+                offender = self.offenders[location] = Offender(location, stack)
+            self._pending = offender
+
+    def report(self) -> None:
+        """Log the worst blocking locations by total blocked time"""
+        if not self.offenders:
+            logger.info(
+                f"Event loop monitor: no blocking calls above {self.threshold}s, "
+                f"max lag {self.max_lag:.3f}s"
+            )
+            return
+
+        worst = sorted(
+            self.offenders.values(), key=lambda o: o.total_seconds, reverse=True
+        )[: self.top]
+        lines = [
+            f"{o.total_seconds:8.2f}s total | {o.max_seconds:6.2f}s max | {o.count:5d}x | {o.location}"
+            for o in worst
+        ]
+        logger.warning(
+            f"Event loop was blocked, max lag {self.max_lag:.3f}s. Worst offenders:\n"
+            + "\n".join(lines)
+        )
+        logger.debug(f"Stack of the worst offender:\n{worst[0].stack}")
+
+
+async def start_loop_monitor(monitor_config) -> LoopMonitor | None:
+    """Start a LoopMonitor from LOOP_MONITOR settings if it is enabled"""
+    if not monitor_config.ENABLED:
+        return None
+
+    monitor = LoopMonitor(
+        interval=monitor_config.INTERVAL,
+        threshold=monitor_config.SLOW_CALLBACK_THRESHOLD,
+        asyncio_debug=monitor_config.ASYNCIO_DEBUG,
+        top=monitor_config.TOP,
+    )
+    monitor.start()
+    return monitor
@@ -0,0 +1,229 @@
+import contextvars
+import json
+import math
+import os
+from datetime import datetime
+
+from loguru import logger
+
+
+# Name of the task the current coroutine is executing, used as a metrics label
+current_task: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_task", default="none"
+)
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, math.inf)
+
+_HELP = {
+    "tasks_total": "Executed tasks by result",
+    "task_duration_seconds": "Wall time of a task",
+    "retries_total": "Retries made by retry_async",
+    "retries_skipped_total": "Failures retry_async did not retry (fatal error or budget)",
+    "rpc_calls_total": "JSON-RPC calls made through Web3Custom",
+    "gas_used_total": "Gas used by confirmed transactions",
+    "tx_confirmation_seconds": "Time from sending a transaction to its receipt",
+    "event_loop_lag_seconds": "How late the event loop monitor woke up",
+    "circuit_transitions_total": "Circuit breaker state changes by endpoint",
+    "circuit_rejections_total": "Calls rejected by an open circuit breaker",
+}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def to_dict(self) -> dict:
+        return {"counts": self.counts, "sum": self.sum, "count": self.count}
+
+    def merge(self, data: dict) -> None:
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"])]
+        self.sum += data["sum"]
+        self.count += data["count"]
+
+
+class Metrics:
+    """
+    In-process counters and histograms keyed by metric name and labels.
+    All updates happen on the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.counters: dict[tuple, float] = {}
+        self.histograms: dict[tuple, Histogram] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = self._key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def total(self, name: str) -> float:
+        """Sum of a counter over all label values"""
+        return sum(value for (key, _), value in self.counters.items() if key == name)
+
+    def snapshot(self) -> dict:
+        """Picklable/JSON-friendly copy, e.g. to send from a shard to the parent"""
+        return {
+            "counters": [
+                [name, dict(labels), value]
+                for (name, labels), value in self.counters.items()
+            ],
+            "histograms": [
+                [name, dict(labels), histogram.to_dict()]
+                for (name, labels), histogram in self.histograms.items()
+            ],
+        }
+
+    def merge(self, snapshot: dict) -> None:
+        for name, labels, value in snapshot["counters"]:
+            self.inc(name, value, **labels)
+        for name, labels, data in snapshot["histograms"]:
+            key = self._key(name, labels)
+            if key not in self.histograms:
+                self.histograms[key] = Histogram()
+            self.histograms[key].merge(data)
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in Prometheus/OpenMetrics text format"""
+
+        def fmt_labels(labels: tuple, extra: tuple = ()) -> str:
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ""
+            body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+            return "{" + body + "}"
+
+        lines = []
+        seen = set()
+        for (name, labels), value in sorted(self.counters.items()):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP somnia_{name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE somnia_{name} counter")
+            lines.append(f"somnia_{name}{fmt_labels(labels)} {value}")
+
+        for (name, labels), histogram in sorted(
+            self.histograms.items(), key=lambda item: item[0]
+        ):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP somnia_{name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE somnia_{name} histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else str(bound)
+                lines.append(
+                    f"somnia_{name}_bucket{fmt_labels(labels, (('le', le),))} {cumulative}"
+                )
+            lines.append(f"somnia_{name}_sum{fmt_labels(labels)} {histogram.sum}")
+            lines.append(f"somnia_{name}_count{fmt_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> dict:
+        """Per-task success/failure counts, latency and RPC usage"""
+        tasks: dict[str, dict] = {}
+
+        def task_entry(task: str) -> dict:
+            return tasks.setdefault(
+                task,
+                {
+                    "success": 0,
+                    "failure": 0,
+                    "retries": 0,
+                    "rpc_calls": 0,
+                    "gas_used": 0,
+                    "avg_duration_seconds": None,
+                    "avg_confirmation_seconds": None,
+                },
+            )
+
+        for (name, labels), value in self.counters.items():
+            labels = dict(labels)
+            task = labels.get("task", "none")
+            if name == "tasks_total":
+                task_entry(task)[labels["status"]] += int(value)
+            elif name == "retries_total":
+                task_entry(task)["retries"] += int(value)
+            elif name == "rpc_calls_total":
+                task_entry(task)["rpc_calls"] += int(value)
+            elif name == "gas_used_total":
+                task_entry(task)["gas_used"] += int(value)
+
+        for (name, labels), histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            task = dict(labels).get("task", "none")
+            average = round(histogram.sum / histogram.count, 3)
+            if name == "task_duration_seconds":
+                task_entry(task)["avg_duration_seconds"] = average
+            elif name == "tx_confirmation_seconds":
+                task_entry(task)["avg_confirmation_seconds"] = average
+
+        return tasks
+
+
+metrics = Metrics()
+
+
+async def start_metrics_server(host: str, port: int):
+    """Serve /metrics for Prometheus. Returns the aiohttp runner to clean up"""
+    from aiohttp import web
+
+    async def handle_metrics(request):
+        return web.Response(
+            text=metrics.render_prometheus(),
+            content_type="text/plain",
+            charset="utf-8",
+        )
+
+    app = web.Application()
+    app.add_routes([web.get("/metrics", handle_metrics)])
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logger.info(f"Metrics available at http://{host}:{port}/metrics")
+    return runner
+
+
+def save_metrics_summary(directory: str = "data") -> str:
+    """Dump per-task summary and raw metrics to data/metrics_<timestamp>.json"""
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    file_path = os.path.join(directory, f"metrics_{timestamp}.json")
+
+    with open(file_path, "w", encoding="utf-8") as file:
+        json.dump(
+            {"tasks": metrics.summary(), "raw": metrics.snapshot()},
+            file,
+            indent=2,
+            default=str,
+        )
+
+    logger.info(f"Metrics summary exported to {file_path}")
+    return file_path
@@ -1,7 +1,6 @@
 import os
 from rich.console import Console
 from rich.text import Text
-from tabulate import tabulate
 from rich.table import Table
 from rich import box
 
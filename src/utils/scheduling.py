@@ -0,0 +1,216 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+from loguru import logger
+
+from src.utils.tracing import tracer
+
+
+class SlotLimiter:
+    """
+    Semaphore whose size is read on every acquire, so SETTINGS.THREADS
+    changed by a config reload applies to a running batch. A bigger size
+    takes effect on the next release, a smaller one as slots are released.
+    """
+
+    def __init__(self, size: Callable[[], int]):
+        self.size = size
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        while self._active >= self.size():
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # Пробуждение не использовано - отдаем его следующему
+                    self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self._active += 1
+
+    def release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.size() - self._active
+        for waiter in self._waiters:
+            if free <= 0:
+                break
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+
+class AccountSlot:
+    """One of SETTINGS.THREADS slots for active account work"""
+
+    def __init__(self, semaphore: asyncio.Semaphore | SlotLimiter):
+        self.semaphore = semaphore
+        self.held = False
+
+    async def acquire(self) -> None:
+        await self.semaphore.acquire()
+        self.held = True
+
+    def release(self) -> None:
+        if self.held:
+            self.held = False
+            self.semaphore.release()
+
+
+# Slot of the account the current coroutine works for, set by run_account_batch
+account_slot: contextvars.ContextVar[AccountSlot | None] = contextvars.ContextVar(
+    "account_slot", default=None
+)
+
+
+async def planned_pause(seconds: float, name: str, reacquire: bool = True) -> None:
+    """
+    Configured pause that gives the account's slot to another account while
+    sleeping, so THREADS limits active work rather than sleeping accounts.
+    With reacquire=False the slot stays free (the account has nothing left to do).
+    """
+    slot = account_slot.get()
+    if slot is None or not slot.held:
+        await tracer.sleep(seconds, name)
+        return
+
+    slot.release()
+    await tracer.sleep(seconds, name)
+    if reacquire:
+        with tracer.span("wait for slot", "schedule"):
+            await slot.acquire()
+
+
+@dataclass(slots=True)
+class Continuation:
+    """
+    What is left to do for a sleeping account. Only plain data is kept between
+    steps, sessions and web3 clients are created again when the account is due.
+    """
+
+    position: int
+    account: tuple
+    stage: str = "start"
+    tasks: deque = field(default_factory=deque)
+    total_tasks: int = 0
+    completed: list = field(default_factory=list)
+    failed: list = field(default_factory=list)
+    parks: dict = field(default_factory=dict)
+    stats_collected: bool = False
+    ok: bool = True
+
+
+class DelayedTaskEngine:
+    """
+    Runs account steps from a heap of (due time, continuation) with a pool
+    of workers. A step returns the delay until the account's next step or
+    None when the account is finished, so sleeping accounts cost one heap
+    entry instead of a suspended coroutine holding its whole object graph.
+
+    The pool size is read whenever a worker picks up a step, so THREADS
+    changed by a config reload grows or shrinks a running pool.
+    """
+
+    def __init__(
+        self,
+        workers: Callable[[], int],
+        step: Callable[[Continuation], Awaitable[float | None]],
+        on_done: Callable[[Continuation], Awaitable[None]],
+    ):
+        self.workers = workers
+        self.step = step
+        self.on_done = on_done
+
+        self._heap: list[tuple[float, int, Continuation]] = []
+        self._counter = itertools.count()
+        self._active = 0
+        self._changed = asyncio.Event()
+        self._running = 0
+        self._tasks: set[asyncio.Task] = set()
+
+    def schedule(self, continuation: Continuation, delay: float = 0) -> None:
+        heapq.heappush(
+            self._heap,
+            (time.monotonic() + delay, next(self._counter), continuation),
+        )
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _wait_for_change(self, timeout: float | None) -> None:
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def run(self, continuations: list[Continuation]) -> None:
+        for continuation in continuations:
+            self.schedule(continuation)
+        self._resize()
+        # Пул может вырасти, пока ждем, поэтому собираем задачи до конца
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    def _resize(self) -> bool:
+        """Start workers up to the current size, True if the caller should retire"""
+        size = max(1, self.workers())
+        while self._running < size:
+            self._running += 1
+            task = asyncio.create_task(self._worker())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._running > size:
+            self._running -= 1
+            return True
+        return False
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._heap:
+                if not self._active:
+                    self._running -= 1
+                    self._notify()
+                    return
+                await self._wait_for_change(None)
+                continue
+
+            if self._resize():
+                return
+
+            due_in = self._heap[0][0] - time.monotonic()
+            if due_in > 0:
+                await self._wait_for_change(due_in)
+                continue
+
+            _, _, continuation = heapq.heappop(self._heap)
+            self._active += 1
+            try:
+                delay = await self.step(continuation)
+            except Exception as e:
+                logger.error(f"{continuation.account[0]} | Account step failed: {e}")
+                continuation.ok = False
+                delay = None
+            finally:
+                self._active -= 1
+
+            if delay is None:
+                await self.on_done(continuation)
+                self._notify()
+            else:
+                self.schedule(continuation, delay)
@@ -1,124 +1,236 @@
+import csv
 from tabulate import tabulate
 from loguru import logger
-import pandas as pd
+import numpy as np
 from datetime import datetime
 import os
 
-from src.utils.config import Config, WalletInfo
-
-
-def print_wallets_stats(config: Config, excel_path="data/progress.xlsx"):
+from src.utils.config import Config, WalletStatsStore
+
+
+HEADERS = [
+    "№ Account",
+    "Wallet Address",
+    "Private Key",
+    "Balance (ETH)",
+    "Total Txs",
+]
+
+
+def _mask(private_key: str) -> str:
+    # Маскируем приватный ключ (последние 5 символов)
+    return "•" * 3 + private_key[-5:]
+
+
+def _columns(store: WalletStatsStore) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Zero-copy numpy views of the store's arrays"""
+    return (
+        np.frombuffer(store.indices, dtype=np.int64),
+        np.frombuffer(store.balances, dtype=np.float64),
+        np.frombuffer(store.transactions, dtype=np.int64),
+    )
+
+
+def _headers(store: WalletStatsStore) -> list[str]:
+    return HEADERS + list(store.token_balances)
+
+
+def _table(store: WalletStatsStore, positions) -> str:
+    tokens = list(store.token_balances.values())
+    rows = [
+        [
+            str(store.indices[pos]),  # Просто номер без ведущего нуля
+            store.addresses[pos],  # Полный адрес
+            _mask(store.private_keys[pos]),
+            f"{store.balances[pos]:.4f} ETH",
+            f"{store.transactions[pos]:,}",  # Форматируем число с разделителями
+            *(f"{column[pos]:.4f}" for column in tokens),
+        ]
+        for pos in positions
+    ]
+    return tabulate(
+        rows,
+        headers=_headers(store),
+        tablefmt="double_grid",  # Более красивые границы
+        stralign="center",  # Центрирование строк
+        numalign="center",  # Центрирование чисел
+    )
+
+
+def _export_rows(store: WalletStatsStore, order: np.ndarray):
+    tokens = list(store.token_balances.values())
+    for pos in order.tolist():
+        yield [
+            store.indices[pos],
+            store.addresses[pos],
+            _mask(store.private_keys[pos]),
+            round(store.balances[pos], 4),
+            store.transactions[pos],
+            *(column[pos] for column in tokens),
+        ]
+
+
+def _summary_rows(summary: dict) -> list[list]:
+    return [
+        [],
+        ["SUMMARY"],
+        ["Total", f"{summary['count']} wallets", "", round(summary["total_balance"], 4), summary["total_transactions"]],
+        ["Average", "", "", round(summary["avg_balance"], 4), round(summary["avg_transactions"], 1)],
+    ]
+
+
+def _write_csv(path: str, store: WalletStatsStore, order: np.ndarray, summary: dict) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(_headers(store))
+        writer.writerows(_export_rows(store, order))
+        writer.writerows(_summary_rows(summary))
+
+
+def _write_xlsx(path: str, store: WalletStatsStore, order: np.ndarray, summary: dict) -> None:
+    from openpyxl import Workbook
+
+    # write-only режим пишет строки сразу в файл, не держа ячейки в памяти
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Wallets")
+    sheet.append(_headers(store))
+    for row in _export_rows(store, order):
+        sheet.append(row)
+    for row in _summary_rows(summary):
+        sheet.append(row)
+    workbook.save(path)
+
+
+def _write_parquet(path: str, store: WalletStatsStore, order: np.ndarray) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    indices, balances, transactions = _columns(store)
+    table = pa.table(
+        {
+            "account_index": indices[order],
+            "address": [store.addresses[pos] for pos in order.tolist()],
+            "private_key": [_mask(store.private_keys[pos]) for pos in order.tolist()],
+            "balance": balances[order],
+            "transactions": transactions[order],
+            **{
+                symbol: np.frombuffer(column, dtype=np.float64)[order]
+                for symbol, column in store.token_balances.items()
+            },
+        }
+    )
+    pq.write_table(table, path)
+
+
+def export_wallets_stats(
+    store: WalletStatsStore, directory: str, file_format: str = "xlsx"
+) -> str:
+    """Write the statistics sorted by account index, returns the file path"""
+    indices, _, _ = _columns(store)
+    order = np.argsort(indices, kind="stable")
+    summary = summarize(store)
+
+    os.makedirs(directory, exist_ok=True)
+
+    if file_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            logger.warning("pyarrow is not installed, saving statistics as csv")
+            file_format = "csv"
+
+    # Формируем имя файла с датой и временем
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    file_path = os.path.join(directory, f"progress_{timestamp}.{file_format}")
+
+    if file_format == "parquet":
+        _write_parquet(file_path, store, order)
+    elif file_format == "csv":
+        _write_csv(file_path, store, order, summary)
+    else:
+        _write_xlsx(file_path, store, order, summary)
+    return file_path
+
+
+def summarize(store: WalletStatsStore) -> dict:
+    """Aggregates over all wallets computed on the columns"""
+    _, balances, transactions = _columns(store)
+    count = len(store)
+    return {
+        "count": count,
+        "total_balance": float(balances.sum()),
+        "total_transactions": int(transactions.sum()),
+        "avg_balance": float(balances.mean()) if count else 0.0,
+        "avg_transactions": float(transactions.mean()) if count else 0.0,
+        "median_balance": float(np.median(balances)) if count else 0.0,
+        "empty_wallets": int((balances == 0).sum()),
+        "token_totals": {
+            symbol: float(np.frombuffer(column, dtype=np.float64).sum())
+            for symbol, column in store.token_balances.items()
+        },
+    }
+
+
+def print_wallets_stats(
+    config: Config,
+    store: WalletStatsStore | None = None,
+    excel_path="data/progress.xlsx",
+):
     """
-    Выводит статистику по всем кошелькам в виде таблицы и сохраняет в Excel файл
+    Выводит статистику по всем кошелькам и сохраняет отчет в файл
 
     Args:
-        config: Конфигурация с данными кошельков
-        excel_path: Путь для сохранения Excel файла (по умолчанию "data/progress.xlsx")
+        config: Конфигурация (настройки отчета)
+        store: Статистика кошельков (по умолчанию собранная stats_collector)
+        excel_path: Путь, в директорию которого сохраняется отчет (по умолчанию "data/progress.xlsx")
     """
     try:
-        # Сортируем кошельки по индексу
-        sorted_wallets = sorted(config.WALLETS.wallets, key=lambda x: x.account_index)
-
-        # Подготавливаем данные для таблицы
-        table_data = []
-        total_balance = 0
-        total_transactions = 0
-
-        for wallet in sorted_wallets:
-            # Маскируем приватный ключ (последние 5 символов)
-            masked_key = "•" * 3 + wallet.private_key[-5:]
-
-            total_balance += wallet.balance
-            total_transactions += wallet.transactions
-
-            row = [
-                str(wallet.account_index),  # Просто номер без ведущего нуля
-                wallet.address,  # Полный адрес
-                masked_key,
-                f"{wallet.balance:.4f} ETH",
-                f"{wallet.transactions:,}",  # Форматируем число с разделителями
-            ]
-            table_data.append(row)
-
-        # Если есть данные - выводим таблицу и статистику
-        if table_data:
-            # Создаем заголовки для таблицы
-            headers = [
-                "№ Account",
-                "Wallet Address",
-                "Private Key",
-                "Balance (ETH)",
-                "Total Txs",
-            ]
-
-            # Формируем таблицу с улучшенным форматированием
-            table = tabulate(
-                table_data,
-                headers=headers,
-                tablefmt="double_grid",  # Более красивые границы
-                stralign="center",  # Центрирование строк
-                numalign="center",  # Центрирование чисел
-            )
+        if store is None:
+            from src.utils.stats_collector import stats_collector
 
-            # Считаем средние значения
-            wallets_count = len(sorted_wallets)
-            avg_balance = total_balance / wallets_count
-            avg_transactions = total_transactions / wallets_count
-
-            # Выводим таблицу и статистику
-            logger.info(
-                f"\n{'='*50}\n"
-                f"         Wallets Statistics ({wallets_count} wallets)\n"
-                f"{'='*50}\n"
-                f"{table}\n"
-                f"{'='*50}\n"
-                f"{'='*50}"
-            )
+            store = stats_collector.store
+        if not len(store):
+            logger.info("\nNo wallet statistics available")
+            return
 
-            logger.info(f"Average balance: {avg_balance:.4f} ETH")
-            logger.info(f"Average transactions: {avg_transactions:.1f}")
-            logger.info(f"Total balance: {total_balance:.4f} ETH")
-            logger.info(f"Total transactions: {total_transactions:,}")
-
-            # Экспорт в Excel
-            # Создаем DataFrame для Excel
-            df = pd.DataFrame(table_data, columns=headers)
-
-            # Добавляем итоговую статистику
-            summary_data = [
-                ["", "", "", "", ""],
-                ["SUMMARY", "", "", "", ""],
-                [
-                    "Total",
-                    f"{wallets_count} wallets",
-                    "",
-                    f"{total_balance:.4f} ETH",
-                    f"{total_transactions:,}",
-                ],
-                [
-                    "Average",
-                    "",
-                    "",
-                    f"{avg_balance:.4f} ETH",
-                    f"{avg_transactions:.1f}",
-                ],
-            ]
-            summary_df = pd.DataFrame(summary_data, columns=headers)
-            df = pd.concat([df, summary_df], ignore_index=True)
-
-            # Создаем директорию, если она не существует
-            os.makedirs(os.path.dirname(excel_path), exist_ok=True)
-
-            # Формируем имя файла с датой и временем
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            filename = f"progress_{timestamp}.xlsx"
-            file_path = os.path.join(os.path.dirname(excel_path), filename)
-
-            # Сохраняем в Excel
-            df.to_excel(file_path, index=False)
-            logger.info(f"Statistics exported to {file_path}")
+        stats_config = config.STATS
+        indices, balances, _ = _columns(store)
+        summary = summarize(store)
+        wallets_count = summary["count"]
+
+        if wallets_count <= stats_config.CONSOLE_ROWS:
+            table = _table(store, np.argsort(indices, kind="stable").tolist())
         else:
-            logger.info("\nNo wallet statistics available")
+            # Для больших запусков - только кошельки с наибольшим и наименьшим балансом
+            by_balance = np.argsort(balances, kind="stable")
+            top = stats_config.TOP
+            table = (
+                f"Top {top} by balance:\n{_table(store, by_balance[::-1][:top].tolist())}\n"
+                f"Bottom {top} by balance:\n{_table(store, by_balance[:top].tolist())}"
+            )
+
+        logger.info(
+            f"\n{'='*50}\n"
+            f"         Wallets Statistics ({wallets_count} wallets)\n"
+            f"{'='*50}\n"
+            f"{table}\n"
+            f"{'='*50}\n"
+            f"{'='*50}"
+        )
+
+        logger.info(f"Average balance: {summary['avg_balance']:.4f} ETH")
+        logger.info(f"Median balance: {summary['median_balance']:.4f} ETH")
+        logger.info(f"Average transactions: {summary['avg_transactions']:.1f}")
+        logger.info(f"Total balance: {summary['total_balance']:.4f} ETH")
+        logger.info(f"Total transactions: {summary['total_transactions']:,}")
+        logger.info(f"Wallets with zero balance: {summary['empty_wallets']}")
+        for symbol, total in summary["token_totals"].items():
+            logger.info(f"Total {symbol}: {total:.4f}")
+
+        file_path = export_wallets_stats(
+            store, os.path.dirname(excel_path), stats_config.FORMAT.lower()
+        )
+        logger.info(f"Statistics exported to {file_path}")
 
     except Exception as e:
         logger.error(f"Error while printing statistics: {e}")
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import Optional
+
+from loguru import logger
+
+from src.utils.config import WalletInfo, WalletStatsStore
+
+
+class StatsCollector:
+    """
+    Single owner of the wallet statistics of the run.
+
+    Accounts submit their WalletInfo to a bounded queue; one consumer task
+    writes it into the columnar store, one row per account index (a retried
+    account replaces its row instead of adding a duplicate). Changed rows
+    are flushed to the accounts database every FLUSH_INTERVAL seconds and
+    once more on stop, so a crashed run keeps what it collected. The
+    database keeps native balance and tx count only; token balances of the
+    scanner stay in the in-memory store and its report.
+    """
+
+    def __init__(self):
+        self.store = WalletStatsStore()
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumer: Optional[asyncio.Task] = None
+        self._flusher: Optional[asyncio.Task] = None
+        # account_index -> WalletInfo, еще не сохраненные в базу
+        self._dirty: dict[int, WalletInfo] = {}
+        self._persist = False
+        self._db = None
+
+    @property
+    def running(self) -> bool:
+        return self._consumer is not None and not self._consumer.done()
+
+    def record(self, wallet: WalletInfo) -> None:
+        """Store the statistics right away (outside of a started collector)"""
+        self.store.upsert(wallet)
+        if self._persist:
+            self._dirty[wallet.account_index] = wallet
+
+    async def submit(self, wallet: WalletInfo) -> None:
+        """Queue the statistics, waits only if the queue is full"""
+        if not self.running:
+            self.record(wallet)
+            return
+        await self._queue.put(wallet)
+
+    def merge(self, store: WalletStatsStore) -> None:
+        """Add statistics collected elsewhere (a shard process)"""
+        if not len(self.store) and not self._persist:
+            # Склейка по колонкам, без построчного upsert
+            self.store.extend(store)
+            return
+        for position in range(len(store)):
+            wallet = store.row(position)
+            self.store.upsert(wallet, store.tokens_of(position))
+            if self._persist:
+                self._dirty[wallet.account_index] = wallet
+
+    def start(self, queue_size: int = 10000, flush_interval: float = 0) -> None:
+        """
+        Start the consumer. Statistics are saved to the database on stop and,
+        with flush_interval > 0, periodically while running.
+        """
+        if self.running:
+            return
+        self._persist = True
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._consumer = asyncio.create_task(self._consume())
+        if flush_interval > 0:
+            self._flusher = asyncio.create_task(self._flush_loop(flush_interval))
+
+    async def stop(self) -> None:
+        """Drain the queue and flush what is left"""
+        if self._consumer is not None:
+            await self._queue.join()
+            self._consumer.cancel()
+            self._consumer = None
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        if self._persist:
+            await self.flush()
+            self._persist = False
+        self._queue = None
+
+    def reset(self) -> None:
+        self.store = WalletStatsStore()
+        self._dirty.clear()
+
+    async def _consume(self) -> None:
+        while True:
+            wallet = await self._queue.get()
+            try:
+                self.record(wallet)
+            except Exception as e:
+                logger.error(f"Failed to record wallet stats: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _flush_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._dirty:
+            return
+        wallets = list(self._dirty.values())
+        self._dirty.clear()
+        try:
+            if self._db is None:
+                from src.model.database.instance import Database, WalletStat
+
+                db = Database()
+                await db.init_tables(WalletStat)
+                self._db = db
+            await self._db.save_wallet_stats(wallets, time.time())
+            logger.debug(f"Saved statistics of {len(wallets)} wallets")
+        except Exception as e:
+            logger.warning(f"Failed to save wallet statistics: {e}")
+            # Повторим при следующем сбросе, если аккаунт не обновился
+            for wallet in wallets:
+                self._dirty.setdefault(wallet.account_index, wallet)
+
+
+stats_collector = StatsCollector()
@@ -0,0 +1,125 @@
+import importlib
+import random
+from typing import Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+
+# Виды шагов скомпилированного плана
+FIXED = "fixed"  # задачи подряд, как написаны
+CHOICE = "choice"  # [ ] - одна случайная
+SHUFFLE = "shuffle"  # ( ) - все в случайном порядке
+
+
+class TaskPlanError(ValueError):
+    """tasks.py doesn't describe a valid plan"""
+
+
+class TaskPlan:
+    """
+    TASKS presets of tasks.py compiled once into a flat tuple of steps.
+    Consecutive plain tasks are merged into one FIXED step, so generating
+    a wallet's task list is a few list operations per bracket group.
+    """
+
+    __slots__ = ("presets", "steps", "names", "_checked")
+
+    def __init__(self, presets: List[str], steps: Tuple[Tuple[str, Tuple[str, ...]], ...]):
+        self.presets = presets
+        self.steps = steps
+        self.names = frozenset(name for _, names in steps for name in names)
+        self._checked = False
+
+    @classmethod
+    def compile(cls, module) -> "TaskPlan":
+        """Build the plan from a tasks module, reporting every problem at once"""
+        presets = getattr(module, "TASKS", None)
+        if not isinstance(presets, (list, tuple)):
+            raise TaskPlanError("No TASKS list found in tasks.py")
+
+        errors = []
+        steps = []
+        fixed = []
+
+        def flush_fixed():
+            if fixed:
+                steps.append((FIXED, tuple(fixed)))
+                fixed.clear()
+
+        for preset in presets:
+            items = getattr(module, preset, None) if isinstance(preset, str) else None
+            if not isinstance(items, (list, tuple)):
+                errors.append(f"TASKS: {preset!r} is not a task list defined in tasks.py")
+                continue
+
+            for item in items:
+                if isinstance(item, str):
+                    fixed.append(item)
+                    continue
+                if (
+                    not isinstance(item, (list, tuple))
+                    or not item
+                    or not all(isinstance(name, str) for name in item)
+                ):
+                    errors.append(f"{preset}: {item!r} is not a task name, [list] or (tuple) of names")
+                    continue
+                flush_fixed()
+                steps.append((CHOICE if isinstance(item, list) else SHUFFLE, tuple(item)))
+        flush_fixed()
+
+        if errors:
+            raise TaskPlanError("Invalid tasks.py:\n" + "\n".join(errors))
+        return cls(list(presets), tuple(steps))
+
+    def generate(self, rng: random.Random = random) -> List[str]:
+        """Task list of one wallet: [ ] groups pick one task, ( ) groups are shuffled"""
+        planned = []
+        for kind, names in self.steps:
+            if kind == FIXED:
+                planned.extend(names)
+            elif kind == CHOICE:
+                planned.append(rng.choice(names))
+            else:
+                shuffled = list(names)
+                rng.shuffle(shuffled)
+                planned.extend(shuffled)
+        return planned
+
+    def unknown(self, known: Iterable[str]) -> List[str]:
+        known = set(known)
+        return sorted(name for name in self.names if name.lower() not in known)
+
+    def check(self) -> None:
+        """Raise TaskPlanError if the plan has tasks the bot can't execute"""
+        if self._checked:
+            return
+        from src.model.task_registry import SKIP_TASK, task_registry
+
+        known = task_registry.names() | {SKIP_TASK}
+        unknown = self.unknown(known)
+        if unknown:
+            raise TaskPlanError(
+                f"Unknown tasks in tasks.py: {', '.join(unknown)}. "
+                f"Available: {', '.join(sorted(known))}"
+            )
+        self._checked = True
+
+
+def load_task_plan(module_name: str = "tasks") -> TaskPlan:
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        raise ImportError(f"Could not import {module_name}.py: {e}") from e
+    return TaskPlan.compile(module)
+
+
+def check_task_plan(plan: Optional[TaskPlan]) -> bool:
+    """check() with the problem logged, for callers that stop instead of raising"""
+    if plan is None:
+        return True
+    try:
+        plan.check()
+        return True
+    except TaskPlanError as e:
+        logger.error(str(e))
+        return False
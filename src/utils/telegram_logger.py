@@ -1,15 +1,209 @@
 import asyncio
-from aiogram import Bot
-from aiogram.enums import ParseMode
+import html
+import re
+import time
+from loguru import logger
+from src.utils.circuit_breaker import get_breaker
 from src.utils.config import Config
 
 
+# Максимальная длина сообщения Telegram
+MESSAGE_LIMIT = 4096
+# Telegram allows about one message per second to the same chat
+CHAT_INTERVAL = 1.0
+DIGEST_SEPARATOR = "\n\n➖➖➖➖➖\n\n"
+
+
+TAG = re.compile(r"<[^>]*>")
+
+
+def _split_line(line: str, limit: int) -> list[str]:
+    """
+    A line longer than the limit is sent as plain text: cutting it could
+    leave a tag or an entity half in one message and half in the next
+    """
+    pieces = []
+    current = ""
+    for char in html.unescape(TAG.sub("", line)):
+        char = html.escape(char, quote=False)
+        if len(current) + len(char) > limit:
+            pieces.append(current)
+            current = ""
+        current += char
+    pieces.append(current)
+    return pieces
+
+
+def _split_message(message: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    """Pieces of a message within the limit, cut between lines so HTML tags stay whole"""
+    if len(message) <= limit:
+        return [message]
+
+    pieces = []
+    current = None
+    for line in message.split("\n"):
+        for part in _split_line(line, limit) if len(line) > limit else [line]:
+            if current is not None and len(current) + 1 + len(part) > limit:
+                pieces.append(current)
+                current = None
+            current = part if current is None else f"{current}\n{part}"
+    if current is not None:
+        pieces.append(current)
+    return pieces
+
+
+def pack_messages(messages: list[str], limit: int = MESSAGE_LIMIT) -> list[str]:
+    """Join messages into as few Telegram messages as the length limit allows"""
+    chunks = []
+    current = ""
+    for message in messages:
+        *full, message = _split_message(message, limit)
+        if current and (full or len(current) + len(DIGEST_SEPARATOR) + len(message) > limit):
+            chunks.append(current)
+            current = ""
+        # Части длинного сообщения уходят отдельно, к остальным не приклеиваются
+        chunks.extend(full)
+        current = f"{current}{DIGEST_SEPARATOR}{message}" if current else message
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TelegramNotifier:
+    """
+    One bot session for the whole run. Messages are queued without waiting
+    and sent every DIGEST_INTERVAL seconds, packed into as few Telegram
+    messages as possible, with at most one message per second to a chat.
+    """
+
+    def __init__(self):
+        self._config: Config | None = None
+        self._bot = None
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._stopping: asyncio.Event | None = None
+        self._last_sent: dict[int, float] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, config: Config) -> None:
+        if self.running:
+            return
+        self._config = config
+        self._queue = asyncio.Queue(maxsize=config.TELEGRAM.QUEUE_SIZE)
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run(config.TELEGRAM.DIGEST_INTERVAL))
+
+    def notify(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning("Telegram queue is full, message dropped")
+
+    async def stop(self) -> None:
+        """Send what is queued and close the bot session"""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self._close()
+
+    async def send_now(self, config: Config, message: str) -> None:
+        """Send outside of a run, when there is no background notifier"""
+        self._config = config
+        try:
+            await self._flush([message])
+        finally:
+            await self._close()
+
+    async def _run(self, interval: float) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+            await self._flush(self._drain())
+
+    def _drain(self) -> list[str]:
+        messages = []
+        while not self._queue.empty():
+            messages.append(self._queue.get_nowait())
+        return messages
+
+    async def _flush(self, messages: list[str]) -> None:
+        for chunk in pack_messages(messages):
+            await self._send(chunk)
+
+    async def _send(self, text: str) -> None:
+        # aiogram is only needed when SEND_TELEGRAM_LOGS is enabled
+        from aiogram import Bot
+
+        breaker = get_breaker("telegram")
+        if not breaker.allow():
+            logger.warning("Telegram is unavailable, message skipped (circuit open)")
+            return
+
+        if self._bot is None:
+            self._bot = Bot(token=self._config.SETTINGS.TELEGRAM_BOT_TOKEN)
+
+        # Каждому пользователю отдельно: ошибка одного чата не мешает остальным
+        delivered = failed = 0
+        for user_id in self._config.SETTINGS.TELEGRAM_USERS_IDS:
+            try:
+                await self._send_to(user_id, text)
+                delivered += 1
+            except Exception as e:
+                failed += 1
+                logger.error(f"Failed to send Telegram message to {user_id}: {e}")
+
+        # Telegram недоступен, только если не дошло никому
+        if delivered or not failed:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+
+    async def _send_to(self, user_id: int, text: str) -> None:
+        from aiogram.enums import ParseMode
+        from aiogram.exceptions import TelegramRetryAfter
+
+        wait = self._last_sent.get(user_id, 0) + CHAT_INTERVAL - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        try:
+            await self._bot.send_message(
+                chat_id=user_id, text=text, parse_mode=ParseMode.HTML
+            )
+        except TelegramRetryAfter as e:
+            # Лимит Telegram: ждем сколько сказано и повторяем один раз
+            await asyncio.sleep(e.retry_after)
+            await self._bot.send_message(
+                chat_id=user_id, text=text, parse_mode=ParseMode.HTML
+            )
+        self._last_sent[user_id] = time.monotonic()
+
+    async def _close(self) -> None:
+        if self._bot is not None:
+            try:
+                await self._bot.session.close()
+            finally:
+                self._bot = None
+
+
+telegram_notifier = TelegramNotifier()
+
+
+async def start_telegram_notifier(config: Config) -> TelegramNotifier | None:
+    if not config.SETTINGS.SEND_TELEGRAM_LOGS:
+        return None
+    telegram_notifier.start(config)
+    return telegram_notifier
+
+
 async def send_telegram_message(config: Config, message: str) -> None:
-    """Send a message to Telegram users using the bot token from config."""
-    bot = Bot(token=config.SETTINGS.TELEGRAM_BOT_TOKEN)
-
-    for user_id in config.SETTINGS.TELEGRAM_USERS_IDS:
-        await bot.send_message(chat_id=user_id, text=message, parse_mode=ParseMode.HTML)
-        await asyncio.sleep(1)
-        
-    await bot.session.close()
+    """Queue a message for the next Telegram digest (sent right away outside of a run)"""
+    if telegram_notifier.running:
+        telegram_notifier.notify(message)
+        return
+    await telegram_notifier.send_now(config, message)
@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+from loguru import logger
+
+from src.utils.metrics import current_task
+
+
+# Index of the account the current coroutine works for, used as the trace track
+current_account: contextvars.ContextVar[int] = contextvars.ContextVar(
+    "current_account", default=0
+)
+
+_NOOP_SPAN = nullcontext()
+
+
+class Tracer:
+    """
+    Collects spans in Chrome trace event format (chrome://tracing, ui.perfetto.dev).
+
+    Every account is shown as its own track, spans are tagged with the task name.
+    Disabled by default: span() then returns a shared no-op context manager and
+    HTTP sessions are not wrapped at all.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.max_events = 0
+        self.events: list[dict] = []
+        # perf_counter is per process, shift it to wall time so shard traces line up
+        self._epoch = time.time() - time.perf_counter()
+
+    def configure(self, tracing_config) -> None:
+        self.enabled = tracing_config.ENABLED
+        self.max_events = tracing_config.MAX_EVENTS
+
+    def span(self, name: str, category: str, **args):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return self._span(name, category, args)
+
+    @contextmanager
+    def _span(self, name: str, category: str, args: dict):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            if not self.max_events or len(self.events) < self.max_events:
+                args["task"] = current_task.get()
+                self.events.append(
+                    {
+                        "name": name,
+                        "cat": category,
+                        "ph": "X",
+                        "ts": (started_at + self._epoch) * 1e6,
+                        "dur": (time.perf_counter() - started_at) * 1e6,
+                        "pid": os.getpid(),
+                        "tid": current_account.get(),
+                        "args": args,
+                    }
+                )
+
+    async def sleep(self, seconds: float, name: str = "pause") -> None:
+        """asyncio.sleep recorded as a "pause" span"""
+        with self.span(name, "pause", seconds=seconds):
+            await asyncio.sleep(seconds)
+
+    def save(self, directory: str = "logs") -> str | None:
+        """Write collected spans to logs/trace_<timestamp>.json"""
+        if not self.events:
+            return None
+
+        os.makedirs(directory, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        file_path = os.path.join(directory, f"trace_{timestamp}.json")
+
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"traceEvents": self.events, "displayTimeUnit": "ms"},
+                file,
+                default=str,
+            )
+
+        logger.info(
+            f"Trace with {len(self.events)} spans exported to {file_path} "
+            f"(open it in https://ui.perfetto.dev)"
+        )
+        return file_path
+
+
+tracer = Tracer()
+
+
+class TracedClient:
+    """Wraps an HTTP session so every request is recorded as an "http" span"""
+
+    _METHODS = ("request", "get", "post", "put", "patch", "delete", "head", "options")
+
+    def __init__(self, session):
+        object.__setattr__(self, "_session", session)
+
+    def __getattr__(self, name):
+        attribute = getattr(self._session, name)
+        if name not in self._METHODS:
+            return attribute
+
+        async def traced(*args, **kwargs):
+            url = kwargs.get("url") or (args[-1] if args else "")
+            with tracer.span(f"{name.upper()} {str(url).split('?')[0]}", "http"):
+                return await attribute(*args, **kwargs)
+
+        return traced
+
+    def __setattr__(self, name, value):
+        setattr(self._session, name, value)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Тесты запускаются из корня проекта или из tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
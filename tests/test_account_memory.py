@@ -0,0 +1,73 @@
+import asyncio
+import os
+import tracemalloc
+
+import pytest
+
+for module in ("web3", "eth_account", "primp", "loguru", "sqlalchemy", "rich"):
+    pytest.importorskip(module)
+
+from src.model.onchain.web3_custom import Web3Custom  # noqa: E402
+from src.model.somnia_network.connect_socials import ConnectSocials  # noqa: E402
+from src.model.somnia_network.faucet import FaucetService  # noqa: E402
+from src.model.somnia_network.ping_pong_swaps import PingPongSwaps  # noqa: E402
+from src.model.somnia_network.send_random_tokens import RandomTokenSender  # noqa: E402
+from src.model.start import Start  # noqa: E402
+from src.utils.config import Config  # noqa: E402
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ACCOUNTS = 100
+# Память одного аккаунта после initialize и создания сервисов, без сетевых клиентов
+ACCOUNT_MEMORY_BUDGET = 64 * 1024
+
+
+class StubWeb3:
+    """Stands in for AsyncWeb3, no provider and no HTTP session"""
+
+    __slots__ = ()
+
+
+async def stub_connect_web3(self) -> None:
+    self.web3 = StubWeb3()
+
+
+def private_key(index: int) -> str:
+    return "0x" + f"{index + 1:064x}"
+
+
+async def run_account(config: Config, index: int) -> Start:
+    start = Start(index, "", private_key(index), config, "", "")
+    assert await start.initialize()
+    for service in (FaucetService, PingPongSwaps, ConnectSocials, RandomTokenSender):
+        start.somnia_instance._service(service)
+    return start
+
+
+def test_account_memory_budget(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(Web3Custom, "connect_web3", stub_connect_web3)
+    config = Config.load(os.path.join(ROOT, "config.yaml"))
+
+    async def run():
+        # Первый аккаунт прогревает ленивые импорты и кэши модулей
+        warmup = await run_account(config, ACCOUNTS)
+
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            accounts = [await run_account(config, index) for index in range(ACCOUNTS)]
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert len(accounts) == ACCOUNTS and warmup is not None
+        # Ни одна учетная запись не открыла HTTP сессию
+        assert all(account.somnia_instance._session is None for account in accounts)
+        return (peak - baseline) / ACCOUNTS
+
+    per_account = asyncio.run(run())
+    assert per_account < ACCOUNT_MEMORY_BUDGET, (
+        f"{per_account / 1024:.1f} KiB per account, budget "
+        f"{ACCOUNT_MEMORY_BUDGET / 1024:.0f} KiB"
+    )
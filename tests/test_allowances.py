@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("sqlalchemy")
+
+from src.model.onchain.allowances import AllowanceCache  # noqa: E402
+
+
+WALLET = "0x" + "aa" * 20
+TOKEN = "0x" + "01" * 20
+ROUTER = "0x" + "02" * 20
+
+
+def memory_cache() -> AllowanceCache:
+    cache = AllowanceCache()
+    # Только память процесса, без data/accounts.db
+    cache._persistent = False
+    return cache
+
+
+def test_spend_subtracts_and_stops_at_zero():
+    async def run():
+        cache = memory_cache()
+        await cache.set(WALLET, TOKEN, ROUTER, 100)
+
+        await cache.spend(WALLET, TOKEN, ROUTER, 30)
+        assert await cache.get(WALLET, TOKEN, ROUTER) == 70
+        await cache.spend(WALLET, TOKEN, ROUTER, 500)
+        assert await cache.get(WALLET, TOKEN, ROUTER) == 0
+
+    asyncio.run(run())
+
+
+def test_spend_of_unknown_allowance_stays_unknown():
+    async def run():
+        cache = memory_cache()
+        await cache.spend(WALLET, TOKEN, ROUTER, 30)
+        # 0 значило бы "нужен approve", а None - "прочитать allowance() с чейна"
+        assert await cache.get(WALLET, TOKEN, ROUTER) is None
+
+    asyncio.run(run())
+
+
+def test_forget_after_failed_swap():
+    async def run():
+        cache = memory_cache()
+        await cache.set(WALLET, TOKEN, ROUTER, 100)
+        await cache.forget(WALLET, TOKEN, ROUTER)
+        assert await cache.get(WALLET, TOKEN, ROUTER) is None
+        # Повторный forget ничего не ломает
+        await cache.forget(WALLET, TOKEN, ROUTER)
+
+    asyncio.run(run())
+
+
+def test_allowances_are_per_spender_and_wallet():
+    async def run():
+        cache = memory_cache()
+        other = "0x" + "bb" * 20
+        await cache.set(WALLET, TOKEN, ROUTER, 100)
+
+        assert await cache.get(WALLET, TOKEN, other) is None
+        assert await cache.get(other, TOKEN, ROUTER) is None
+
+    asyncio.run(run())
@@ -0,0 +1,73 @@
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("yaml")
+
+from src.utils.circuit_breaker import (  # noqa: E402
+    CircuitBreaker,
+    CircuitOpenError,
+    circuit_rejections,
+    task_is_parked,
+)
+
+
+def test_opens_after_failure_threshold():
+    breaker = CircuitBreaker("rpc", failure_threshold=3, recovery_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_consecutive_failures():
+    breaker = CircuitBreaker("rpc", failure_threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("rpc", failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    # recovery_timeout прошел: один пробный вызов, остальные ждут
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_zero_threshold_disables_breaker():
+    breaker = CircuitBreaker("rpc", failure_threshold=0)
+    for _ in range(100):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_check_raises_and_parks_current_task():
+    breaker = CircuitBreaker("rpc", failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+
+    token = circuit_rejections.set(set())
+    try:
+        assert not task_is_parked()
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+        assert circuit_rejections.get() == {"rpc"}
+        assert task_is_parked()
+    finally:
+        circuit_rejections.reset(token)
@@ -0,0 +1,166 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("web3")
+pytest.importorskip("loguru")
+
+from src.model.projects.swaps.quickswap.quotes import (  # noqa: E402
+    MAX_BLOCK_AGE,
+    Q96,
+    PoolState,
+    PoolStateCache,
+    quote_exact_input,
+)
+
+
+POOL = "0x" + "ab" * 20
+TOKEN_A = "0x" + "01" * 20
+TOKEN_B = "0x" + "02" * 20
+# sqrt(2000) * 2**96: 2000 token1 за один token0
+SQRT_PRICE_2000 = 3543191142285914205922034323214
+
+# (slot0.sqrtPriceX96, liquidity, fee, amount_in, zero_for_one, amountOut of the pool)
+QUOTE_FIXTURES = [
+    # Uniswap v3-core SwapMath.spec "exact amount in that is fully spent in one for zero"
+    (Q96, 2 * 10**18, 600, 10**18, False, 666399946655997866),
+    # The same pool the other way: the new price is rounded up, the output down
+    (Q96, 2 * 10**18, 600, 10**18, True, 666399946655997866),
+    # Deep pool: a new price rounded down would quote 99700000000000574819
+    (Q96, 10**35, 3000, 10**20, True, 99699999999999312642),
+    # v3-core SwapMath.spec "entire input amount taken as fee"
+    (2413, 1985041575832132834610021537970, 1872, 10, False, 0),
+    (SQRT_PRICE_2000, 10**21, 3000, 10**16, True, 19931113275564208832),
+    (SQRT_PRICE_2000, 10**21, 3000, 2 * 10**19, False, 9965556637782104),
+]
+
+
+@pytest.mark.parametrize(
+    "sqrt_price, liquidity, fee, amount_in, zero_for_one, expected", QUOTE_FIXTURES
+)
+def test_quote_exact_input_matches_pool(
+    sqrt_price, liquidity, fee, amount_in, zero_for_one, expected
+):
+    state = PoolState(fee=fee, sqrt_price_x96=sqrt_price, liquidity=liquidity, tick=0, block=1)
+    assert quote_exact_input(state, amount_in, zero_for_one) == expected
+
+
+def test_quote_exact_input_empty_pool():
+    state = PoolState(fee=3000, sqrt_price_x96=Q96, liquidity=0, tick=0, block=1)
+    assert quote_exact_input(state, 10**18, True) == 0
+
+
+class FakeEth:
+    def __init__(self, block: int):
+        self.block = block
+
+    @property
+    async def block_number(self) -> int:
+        return self.block
+
+
+class FakeWeb3:
+    def __init__(self, block: int = 100):
+        self.eth = FakeEth(block)
+
+
+def make_cache(reads: list, delay: float = 0) -> PoolStateCache:
+    """Cache whose RPC reads are replaced with counters"""
+    cache = PoolStateCache(block_ttl=0)
+
+    async def pool_address(web3, token0, token1, fee):
+        return POOL
+
+    async def read_state(web3, pool_address, fee, block):
+        reads.append(block)
+        await asyncio.sleep(delay)
+        return PoolState(fee=fee, sqrt_price_x96=Q96, liquidity=10**18, tick=0, block=block)
+
+    cache._pool_address = pool_address
+    cache._read_state = read_state
+    return cache
+
+
+def test_state_reused_until_max_block_age():
+    async def run():
+        reads = []
+        cache = make_cache(reads)
+        web3 = FakeWeb3(block=100)
+
+        await cache.get_state(web3, TOKEN_A, TOKEN_B, 3000)
+        web3.eth.block = 100 + MAX_BLOCK_AGE
+        state = await cache.get_state(web3, TOKEN_A, TOKEN_B, 3000)
+        assert reads == [100]
+        assert state.block == 100
+
+        web3.eth.block = 100 + MAX_BLOCK_AGE + 1
+        state = await cache.get_state(web3, TOKEN_A, TOKEN_B, 3000)
+        assert reads == [100, 100 + MAX_BLOCK_AGE + 1]
+        assert state.block == 100 + MAX_BLOCK_AGE + 1
+
+    asyncio.run(run())
+
+
+def test_concurrent_get_state_reads_pool_once():
+    async def run():
+        reads = []
+        cache = make_cache(reads, delay=0.01)
+        web3 = FakeWeb3()
+
+        states = await asyncio.gather(
+            *[cache.get_state(web3, TOKEN_A, TOKEN_B, 3000) for _ in range(50)]
+        )
+        assert len(reads) == 1
+        assert all(state is states[0] for state in states)
+
+    asyncio.run(run())
+
+
+def test_failed_read_is_shared_and_not_cached():
+    async def run():
+        reads = []
+        cache = make_cache(reads, delay=0.01)
+        web3 = FakeWeb3()
+
+        async def failing_read(web3, pool_address, fee, block):
+            reads.append(block)
+            await asyncio.sleep(0.01)
+            raise ConnectionError("rpc down")
+
+        cache._read_state = failing_read
+        results = await asyncio.gather(
+            *[cache.get_state(web3, TOKEN_A, TOKEN_B, 3000) for _ in range(10)],
+            return_exceptions=True,
+        )
+        assert len(reads) == 1
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert not cache._inflight
+
+    asyncio.run(run())
+
+
+def test_cancelled_reader_does_not_hang_waiters():
+    async def run():
+        reads = []
+        cache = make_cache(reads, delay=0.05)
+        web3 = FakeWeb3()
+
+        reader = asyncio.create_task(cache.get_state(web3, TOKEN_A, TOKEN_B, 3000))
+        await asyncio.sleep(0.01)
+        waiters = [
+            asyncio.create_task(cache.get_state(web3, TOKEN_A, TOKEN_B, 3000))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.01)
+        # Один из ожидающих отменен, второй продолжает ждать
+        waiters[0].cancel()
+        reader.cancel()
+
+        state = await asyncio.wait_for(waiters[1], 1)
+        assert state.block == 100
+        assert waiters[0].cancelled() and reader.cancelled()
+        # Прерванное чтение повторил оставшийся ожидающий
+        assert len(reads) == 2
+        assert not cache._inflight
+
+    asyncio.run(run())
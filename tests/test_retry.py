@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("loguru")
+pytest.importorskip("yaml")
+
+import src.utils.decorators as decorators  # noqa: E402
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError  # noqa: E402
+from src.utils.decorators import RetryBudget, classify_error, retry_async  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def unlimited_budget(monkeypatch):
+    # Без config.yaml: бюджет повторов без ограничений
+    monkeypatch.setattr(decorators, "_budget", RetryBudget(0, 0))
+
+
+@pytest.mark.parametrize(
+    "error, kind",
+    [
+        (Exception("execution reverted: STF"), "fatal"),
+        (ValueError("Insufficient funds for gas * price + value"), "fatal"),
+        (Exception("already known"), "fatal"),
+        (Exception("429 Too Many Requests"), "throttled"),
+        (Exception("Read timed out"), "throttled"),
+        (asyncio.TimeoutError(), "throttled"),
+        (ConnectionError("connection reset by peer"), "retryable"),
+    ],
+)
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+
+
+def make_flaky(errors: list):
+    calls = []
+
+    @retry_async(attempts=3, delay=0.001)
+    async def flaky():
+        calls.append(len(calls))
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return flaky, calls
+
+
+def test_retries_until_success():
+    flaky, calls = make_flaky([ConnectionError("reset"), ConnectionError("reset")])
+    assert asyncio.run(flaky()) == "ok"
+    assert len(calls) == 3
+
+
+def test_fatal_error_is_not_retried():
+    flaky, calls = make_flaky([Exception("execution reverted")])
+    with pytest.raises(Exception, match="execution reverted"):
+        asyncio.run(flaky())
+    assert len(calls) == 1
+
+
+def test_open_circuit_is_not_retried():
+    breaker = CircuitBreaker("rpc", failure_threshold=1)
+    flaky, calls = make_flaky([CircuitOpenError(breaker)])
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(flaky())
+    assert len(calls) == 1
+
+
+def test_nested_retry_is_not_multiplied():
+    calls = []
+
+    @retry_async(attempts=3, delay=0.001)
+    async def inner():
+        calls.append(1)
+        raise ConnectionError("reset")
+
+    @retry_async(attempts=3, delay=0.001)
+    async def outer():
+        return await inner()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(outer())
+    assert len(calls) == 3
+
+
+def test_retry_budget_per_account_and_global():
+    budget = RetryBudget(account_budget=2, global_per_minute=0)
+    assert budget.try_acquire(1) is None
+    assert budget.try_acquire(1) is None
+    assert budget.try_acquire(1) == "account"
+    assert budget.try_acquire(2) is None
+
+    budget = RetryBudget(account_budget=0, global_per_minute=2)
+    assert budget.try_acquire(1) is None
+    assert budget.try_acquire(2) is None
+    assert budget.try_acquire(3) == "global"
@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("loguru")
+
+from src.utils.scheduling import (  # noqa: E402
+    AccountSlot,
+    Continuation,
+    DelayedTaskEngine,
+    SlotLimiter,
+    account_slot,
+    planned_pause,
+)
+
+
+def test_slot_limiter_caps_active_work():
+    async def run():
+        limiter = SlotLimiter(lambda: 2)
+        active = peak = 0
+
+        async def work():
+            nonlocal active, peak
+            await limiter.acquire()
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            limiter.release()
+
+        await asyncio.gather(*[work() for _ in range(6)])
+        assert peak == 2
+        assert limiter._active == 0
+
+    asyncio.run(run())
+
+
+def test_slot_limiter_release_wakes_waiter():
+    async def run():
+        limiter = SlotLimiter(lambda: 1)
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter._active == 1
+
+    asyncio.run(run())
+
+
+def test_slot_limiter_cancelled_waiter_passes_wakeup_on():
+    async def run():
+        limiter = SlotLimiter(lambda: 1)
+        await limiter.acquire()
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Первого будят и сразу отменяют - слот должен достаться второму
+        limiter.release()
+        first.cancel()
+        await asyncio.wait_for(second, 1)
+        assert first.cancelled()
+        assert limiter._active == 1
+
+    asyncio.run(run())
+
+
+def test_slot_limiter_reads_size_on_release():
+    async def run():
+        size = 1
+        limiter = SlotLimiter(lambda: size)
+        await limiter.acquire()
+        waiters = [asyncio.create_task(limiter.acquire()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        size = 3
+        limiter.release()
+        await asyncio.sleep(0.01)
+        assert sum(waiter.done() for waiter in waiters) == 3
+        assert limiter._active == 3
+
+    asyncio.run(run())
+
+
+def test_planned_pause_gives_slot_away_and_reacquires():
+    async def run():
+        limiter = SlotLimiter(lambda: 1)
+        order = []
+
+        async def account(name: str, pause: float):
+            slot = AccountSlot(limiter)
+            account_slot.set(slot)
+            await slot.acquire()
+            order.append(f"{name} start")
+            if pause:
+                await planned_pause(pause, "pause between actions")
+                assert slot.held
+            order.append(f"{name} end")
+            slot.release()
+
+        sleeping = asyncio.create_task(account("a", 0.02))
+        await asyncio.sleep(0)
+        await asyncio.gather(sleeping, account("b", 0))
+        # b работает, пока a спит, хотя слот один
+        assert order == ["a start", "b start", "b end", "a end"]
+        assert limiter._active == 0
+
+    asyncio.run(run())
+
+
+def test_planned_pause_without_reacquire_keeps_slot_free():
+    async def run():
+        limiter = SlotLimiter(lambda: 1)
+        slot = AccountSlot(limiter)
+        account_slot.set(slot)
+        await slot.acquire()
+
+        await planned_pause(0, "pause", reacquire=False)
+        assert not slot.held
+        assert limiter._active == 0
+
+    asyncio.run(run())
+
+
+def test_delayed_task_engine_runs_steps_in_due_order():
+    async def run():
+        steps = []
+        done = []
+
+        async def step(continuation: Continuation):
+            steps.append(continuation.position)
+            continuation.total_tasks += 1
+            # У первого аккаунта два шага с паузой между ними
+            if continuation.position == 0 and continuation.total_tasks == 1:
+                return 0.02
+            return None
+
+        async def on_done(continuation: Continuation):
+            done.append(continuation.position)
+
+        engine = DelayedTaskEngine(lambda: 1, step, on_done)
+        await asyncio.wait_for(
+            engine.run([Continuation(position=i, account=(i,)) for i in range(3)]), 1
+        )
+        assert steps == [0, 1, 2, 0]
+        assert done == [1, 2, 0]
+
+    asyncio.run(run())
+
+
+def test_delayed_task_engine_limits_workers_and_survives_failures():
+    async def run():
+        active = peak = 0
+        finished = []
+
+        async def step(continuation: Continuation):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            if continuation.position == 1:
+                raise RuntimeError("step failed")
+            return None
+
+        async def on_done(continuation: Continuation):
+            finished.append((continuation.position, continuation.ok))
+
+        engine = DelayedTaskEngine(lambda: 2, step, on_done)
+        await asyncio.wait_for(
+            engine.run([Continuation(position=i, account=(i,)) for i in range(5)]), 1
+        )
+        assert peak == 2
+        assert sorted(finished) == [(0, True), (1, False), (2, True), (3, True), (4, True)]
+
+    asyncio.run(run())
@@ -0,0 +1,103 @@
+import asyncio
+
+from src.utils.single_flight import SingleFlight
+
+
+def make_fetch(calls: list, result="state", delay: float = 0.01, error=None):
+    async def fetch():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return fetch
+
+
+def test_concurrent_callers_share_one_fetch():
+    async def run():
+        calls = []
+        flight = SingleFlight()
+        fetch = make_fetch(calls)
+
+        results = await asyncio.gather(*[flight.run("pool", fetch) for _ in range(20)])
+        assert calls == ["state"]
+        assert results == ["state"] * 20
+        assert len(flight) == 0
+
+    asyncio.run(run())
+
+
+def test_different_keys_fetch_separately():
+    async def run():
+        calls = []
+        flight = SingleFlight()
+
+        await asyncio.gather(
+            flight.run("a", make_fetch(calls, "a")),
+            flight.run("b", make_fetch(calls, "b")),
+        )
+        assert sorted(calls) == ["a", "b"]
+
+    asyncio.run(run())
+
+
+def test_exception_is_shared_and_not_kept():
+    async def run():
+        calls = []
+        flight = SingleFlight()
+        fetch = make_fetch(calls, error=ConnectionError("rpc down"))
+
+        results = await asyncio.gather(
+            *[flight.run("pool", fetch) for _ in range(5)], return_exceptions=True
+        )
+        assert len(calls) == 1
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert "pool" not in flight
+
+        # Следующий вызов читает заново
+        assert await flight.run("pool", make_fetch(calls)) == "state"
+        assert len(calls) == 2
+
+    asyncio.run(run())
+
+
+def test_cancelled_owner_hands_fetch_to_waiter():
+    async def run():
+        calls = []
+        flight = SingleFlight()
+        fetch = make_fetch(calls, delay=0.05)
+
+        owner = asyncio.create_task(flight.run("pool", fetch))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(flight.run("pool", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        # Один из ожидающих отменен вместе с читающим, второй продолжает ждать
+        waiters[0].cancel()
+        owner.cancel()
+
+        assert await asyncio.wait_for(waiters[1], 1) == "state"
+        assert owner.cancelled() and waiters[0].cancelled()
+        assert len(calls) == 2
+        assert len(flight) == 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_does_not_cancel_fetch():
+    async def run():
+        calls = []
+        flight = SingleFlight()
+        fetch = make_fetch(calls, delay=0.05)
+
+        owner = asyncio.create_task(flight.run("pool", fetch))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(flight.run("pool", fetch))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+
+        assert await asyncio.wait_for(owner, 1) == "state"
+        assert waiter.cancelled()
+        assert len(calls) == 1
+
+    asyncio.run(run())